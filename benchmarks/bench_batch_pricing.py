@@ -0,0 +1,42 @@
+"""
+Compares scalar apply_promotion calls with apply_promotion_batch on a large batch.
+
+The batch methods are pure Python, so the gain comes only from skipping
+the per-row method call and Product attribute lookup. Expect around
+1.2-2x, not the order of magnitude a compiled array kernel would give.
+"""
+import random
+import time
+
+from products import Product
+from promotions import PercentageDiscount, SecondItemHalfPrice, Buy2Get1Free
+
+ROWS = 1_000_000
+
+
+def main():
+    rng = random.Random(42)
+    prices = [round(rng.uniform(1, 2000), 2) for _ in range(ROWS)]
+    quantities = [rng.randint(1, 10) for _ in range(ROWS)]
+    products = [Product("Item", price=price, quantity=1) for price in prices]
+
+    print(f"{'promotion':>20} | {'scalar s':>8} | {'batch s':>8} | {'speedup':>7}")
+    for promotion in (PercentageDiscount("30% off", percent=30),
+                      SecondItemHalfPrice("Second item at half price"),
+                      Buy2Get1Free("Buy 2, get 1 free")):
+        start = time.perf_counter()
+        scalar = [promotion.apply_promotion(product, quantity)
+                  for product, quantity in zip(products, quantities)]
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = promotion.apply_promotion_batch(prices, quantities)
+        batch_time = time.perf_counter() - start
+
+        assert batch == scalar
+        print(f"{type(promotion).__name__:>20} | {scalar_time:>8.3f} | {batch_time:>8.3f} | "
+              f"{scalar_time / batch_time:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
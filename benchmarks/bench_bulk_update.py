@@ -0,0 +1,51 @@
+"""
+Compares a nightly supplier update applied product by product against
+one Store.bulk_update call.
+
+Per-product calls pay for a notification, a snapshot version and a
+price cache invalidation each time. The bulk update pays for those once
+per batch.
+"""
+import random
+import time
+
+from products import Product
+from store import Store, StockUpdate
+
+CATALOG_SIZES = (10_000, 100_000)
+UPDATED_SHARE = 0.5
+
+
+def build(size: int) -> tuple[Store, list[StockUpdate]]:
+    """Returns a fresh store and a seeded update touching part of its products."""
+    store = Store([Product(f"SKU-{i}", price=10, quantity=100) for i in range(size)])
+    rng = random.Random(size)
+    updates = [StockUpdate(f"SKU-{i}", rng.randint(-50, 50), round(rng.uniform(5, 15), 2))
+               for i in rng.sample(range(size), int(size * UPDATED_SHARE))]
+    return store, updates
+
+
+def one_by_one(store: Store, updates: list[StockUpdate]) -> None:
+    for name, delta, price, _ in updates:
+        product = store.get_product(name)
+        product.set_quantity(product.quantity + delta)
+        product.set_price(price)
+
+
+def main():
+    print(f"{'catalog size':>12} | {'updates':>8} | {'one by one s':>12} | {'bulk s':>8}")
+    for size in CATALOG_SIZES:
+        store, updates = build(size)
+        start = time.perf_counter()
+        one_by_one(store, updates)
+        single = time.perf_counter() - start
+
+        store, updates = build(size)
+        start = time.perf_counter()
+        store.bulk_update(updates)
+        bulk = time.perf_counter() - start
+        print(f"{size:>12} | {len(updates):>8} | {single:>12.3f} | {bulk:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
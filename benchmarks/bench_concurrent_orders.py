@@ -0,0 +1,51 @@
+"""
+Reports Store.order throughput as the number of threads grows, and checks
+that concurrent orders never oversell.
+"""
+import random
+import threading
+import time
+
+from products import Product
+from store import Store
+
+CATALOG_SIZE = 10_000
+ORDERS_PER_THREAD = 5_000
+LINES_PER_ORDER = 3
+THREAD_COUNTS = (1, 2, 4, 8, 16)
+
+
+def bench(thread_count: int) -> float:
+    """Runs the workload with the given number of threads and returns orders per second."""
+    catalog = [Product(f"SKU-{i}", price=10, quantity=1_000) for i in range(CATALOG_SIZE)]
+    store = Store(catalog)
+    initial = store.get_total_quantity()
+    sold = [0] * thread_count
+
+    def worker(index):
+        rng = random.Random(index)
+        for _ in range(ORDERS_PER_THREAD):
+            lines = [(product, 1) for product in rng.sample(catalog, LINES_PER_ORDER)]
+            sold[index] += int(store.order(lines) // 10)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert initial - store.get_total_quantity() == sum(sold), "stock and sales disagree"
+    assert all(product.get_quantity() >= 0 for product in catalog), "oversold"
+    return thread_count * ORDERS_PER_THREAD / elapsed
+
+
+def main():
+    print(f"{'threads':>7} | {'orders/s':>10}")
+    for thread_count in THREAD_COUNTS:
+        print(f"{thread_count:>7} | {bench(thread_count):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
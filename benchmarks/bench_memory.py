@@ -0,0 +1,125 @@
+"""
+Compares the memory footprint of the slotted Product classes with the
+previous dict-based ones, and measures what a Store adds per product on
+top of the slotted catalog (indexes, snapshot, listener registration).
+
+Each variant is measured in a fresh interpreter, reporting bytes per
+object (tracemalloc) and the resident set size after building the catalog.
+
+Usage: python -m benchmarks.bench_memory [--count N]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+from products import Product, NonStockedProduct, LimitedProduct
+from promotions import PercentageDiscount
+from store import Store
+
+
+class LegacyProduct:
+    """Dict-based Product, as it was before __slots__."""
+
+    def __init__(self, name, price, quantity, promotion=None):
+        self.name = name
+        self.price = price
+        self.quantity = quantity
+        self.active = quantity > 0
+        self.promotion = promotion
+
+
+class LegacyNonStockedProduct(LegacyProduct):
+    def __init__(self, name, price):
+        super().__init__(name, price, quantity=float('inf'))
+
+
+class LegacyLimitedProduct(LegacyProduct):
+    def __init__(self, name, price, quantity, maximum):
+        super().__init__(name, price, quantity)
+        self.maximum = maximum
+
+
+class LegacyPercentageDiscount:
+    def __init__(self, name, percent):
+        self.name = name
+        self.percent = percent
+
+
+# The catalog alone, dict-based and slotted, then the slotted catalog loaded into a Store.
+VARIANTS = ("legacy", "slotted", "store")
+
+
+def build(variant: str, count: int) -> list:
+    """Builds a catalog of the given size; every tenth product has a promotion."""
+    names = [f"SKU-{i}" for i in range(count)]
+    catalog = []
+    if variant == "legacy":
+        for i, name in enumerate(names):
+            kind = i % 3
+            if kind == 0:
+                product = LegacyProduct(name, 10.0, 100)
+            elif kind == 1:
+                product = LegacyNonStockedProduct(name, 10.0)
+            else:
+                product = LegacyLimitedProduct(name, 10.0, 100, 2)
+            if i % 10 == 0:
+                # One promotion object per assignment, as before
+                product.promotion = LegacyPercentageDiscount("10% off", 10)
+            catalog.append(product)
+    else:
+        for i, name in enumerate(names):
+            kind = i % 3
+            if kind == 0:
+                product = Product(name, 10.0, 100)
+            elif kind == 1:
+                product = NonStockedProduct(name, 10.0)
+            else:
+                product = LimitedProduct(name, 10.0, 100, 2)
+            if i % 10 == 0:
+                product.set_promotion(PercentageDiscount.shared("10% off", percent=10))
+            catalog.append(product)
+    return catalog
+
+
+def measure(variant: str, count: int) -> dict:
+    """Measures one variant in this process."""
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    catalog = build("slotted" if variant == "store" else variant, count)
+    store = Store(catalog) if variant == "store" else None
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Name strings are identical in every variant, so leave them out
+    name_bytes = sum(sys.getsizeof(product.name) for product in catalog)
+    return {
+        "variant": variant,
+        "count": count,
+        "bytes_per_object": (current - baseline - name_bytes) / count,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--variant", choices=VARIANTS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(measure(args.variant, args.count)))
+        return
+
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_memory", "--variant", variant, "--count", str(args.count)],
+            check=True, capture_output=True, text=True).stdout
+        result = json.loads(output)
+        print(f"{variant:>8}: {result['bytes_per_object']:.1f} bytes/object, "
+              f"max RSS {result['max_rss_kib'] / 1024:.1f} MiB for {result['count']} products")
+
+
+if __name__ == "__main__":
+    main()
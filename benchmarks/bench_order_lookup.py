@@ -0,0 +1,45 @@
+"""
+Measures Store.order latency as the catalog grows.
+
+With the name index the per-order cost should stay flat regardless of
+catalog size. The lines of each order are spread across the catalog, so
+every order changes the same number of snapshot chunks at every size.
+"""
+import time
+
+from products import Product
+from store import Store
+
+CATALOG_SIZES = (1_000, 10_000, 100_000, 1_000_000, 3_000_000)
+ORDERS = 2_000
+LINES_PER_ORDER = 5
+
+
+def bench_order_latency(catalog_size: int) -> float:
+    """Returns the mean latency of one order, in microseconds, for a catalog of the given size."""
+    catalog = [Product(f"SKU-{i}", price=10, quantity=10 ** 9) for i in range(catalog_size)]
+    store = Store(catalog)
+    # Spread orders over the whole catalog, including its tail, and the
+    # lines of one order a fifth of the catalog apart.
+    step = max(1, catalog_size // ORDERS)
+    stride = catalog_size // LINES_PER_ORDER
+    orders = [
+        [(catalog[(i * step + line * stride) % catalog_size], 1) for line in range(LINES_PER_ORDER)]
+        for i in range(ORDERS)
+    ]
+
+    start = time.perf_counter()
+    for shopping_list in orders:
+        store.order(shopping_list)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(orders) * 1e6
+
+
+def main():
+    print(f"{'catalog size':>12} | {'us / order':>10}")
+    for size in CATALOG_SIZES:
+        print(f"{size:>12} | {bench_order_latency(size):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
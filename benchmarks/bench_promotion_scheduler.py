@@ -0,0 +1,56 @@
+"""
+Measures the cost of one promotion transition as the number of scheduled
+windows grows.
+
+Transitions are popped from a heap, so the cost per start or expiry
+should grow only logarithmically with the number of windows.
+"""
+import random
+import time
+
+from products import Product
+from promotion_scheduler import PromotionScheduler
+from promotions import PercentageDiscount
+
+WINDOW_COUNTS = (1_000, 10_000, 100_000, 1_000_000)
+TICKS = 1_000
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def bench_transitions(windows: int) -> float:
+    """Returns the mean cost of one transition, in microseconds, with the given number of windows."""
+    rng = random.Random(windows)
+    clock = _Clock()
+    scheduler = PromotionScheduler(clock)
+    products = [Product(f"SKU-{i}", price=10, quantity=100) for i in range(min(windows, 100_000))]
+    sale = PercentageDiscount("Flash", percent=20)
+    horizon = 1_000_000.0
+    for i in range(windows):
+        start = rng.uniform(0, horizon)
+        scheduler.schedule(products[i % len(products)], sale, start, start + rng.uniform(1, 1_000))
+
+    transitions = 0
+    start = time.perf_counter()
+    # Tick through a slice of the horizon; roughly the same share of windows is due each tick
+    for tick in range(1, TICKS + 1):
+        clock.now = horizon * 0.1 * tick / TICKS
+        transitions += scheduler.run_pending()
+    elapsed = time.perf_counter() - start
+    return elapsed / max(transitions, 1) * 1e6
+
+
+def main():
+    print(f"{'windows':>10} | {'us / transition':>15}")
+    for windows in WINDOW_COUNTS:
+        print(f"{windows:>10} | {bench_transitions(windows):>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures Store.search latency as the catalog grows.
+
+Names mix a few shared brand and category words with unique model codes,
+so queries exercise both long postings (a common word) and wide prefix
+ranges (a short model-code prefix). Type-ahead queries should stay well
+under a millisecond regardless of catalog size, including the first query
+after a product with new tokens is added.
+
+Usage:
+    python -m benchmarks.bench_search
+"""
+import gc
+import random
+import time
+
+from products import Product
+from store import Store
+
+CATALOG_SIZES = (10_000, 100_000, 1_000_000)
+QUERIES = 2_000
+LIMIT = 10
+
+BRANDS = ("Apple", "Bose", "Google", "Lenovo", "Samsung", "Sony", "Dell", "Asus")
+CATEGORIES = ("Laptop", "Earbuds", "Phone", "Monitor", "Tablet", "Camera", "Speaker", "Charger")
+
+
+def generate_names(size: int, seed: int = 0) -> list[str]:
+    """Returns reproducible product names such as "Sony Camera X4821-17"."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(BRANDS)} {rng.choice(CATEGORIES)} {rng.choice('ABCDEFGHJKMNPRSTVXZ')}{i}-{rng.randint(1, 99)}"
+            for i in range(size)]
+
+
+def generate_queries(names: list[str], count: int, seed: int = 1) -> list[str]:
+    """Returns type-ahead queries: truncated words of random catalog names."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = rng.choice(names).split()
+        chosen = rng.sample(words, rng.randint(1, 2))
+        queries.append(" ".join(word[:rng.randint(1, len(word))] for word in chosen))
+    return queries
+
+
+def bench_search(size: int) -> tuple[float, float, float, float]:
+    """
+    Returns index build time in seconds, mean and p99 query latency in
+    microseconds, and the mean latency of adding a product and querying.
+    """
+    names = generate_names(size)
+    start = time.perf_counter()
+    store = Store([Product(name, price=10, quantity=1) for name in names])
+    store.search("warm up")  # builds the sorted token tables
+    build = time.perf_counter() - start
+    # Move the catalog out of the collector's way, as a long-running server
+    # would after loading, so full collections do not land on timed queries.
+    gc.collect()
+    gc.freeze()
+
+    latencies = []
+    for query in generate_queries(names, QUERIES):
+        before = time.perf_counter()
+        store.search(query, limit=LIMIT)
+        latencies.append(time.perf_counter() - before)
+
+    # Each added name brings a new model-code token
+    added = [Product(name, price=10, quantity=1) for name in generate_names(QUERIES // 10, seed=2)]
+    before = time.perf_counter()
+    for product, query in zip(added, generate_queries(names, len(added))):
+        store.add_product(product)
+        store.search(query, limit=LIMIT)
+    add_and_query = (time.perf_counter() - before) / len(added)
+    gc.unfreeze()
+    latencies.sort()
+    mean = sum(latencies) / len(latencies)
+    return build, mean * 1e6, latencies[int(len(latencies) * 0.99) - 1] * 1e6, add_and_query * 1e6
+
+
+def main():
+    print(f"{'catalog size':>12} | {'build s':>8} | {'mean us':>8} | {'p99 us':>8} | {'add+query us':>12}")
+    for size in CATALOG_SIZES:
+        build, mean, p99, add_and_query = bench_search(size)
+        print(f"{size:>12} | {build:>8.2f} | {mean:>8.1f} | {p99:>8.1f} | {add_and_query:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
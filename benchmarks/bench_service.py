@@ -0,0 +1,129 @@
+"""
+Load-test client for the asyncio order service (see service.py).
+
+Opens a number of connections, keeps up to a pipeline depth of requests
+in flight on each, and reports requests per second and latency
+percentiles. A request's latency runs from writing it to reading its
+response. By default it starts a service on a seeded catalog in this
+process; pass --port to load an already running one instead, such as
+``python main.py --serve``.
+
+Usage:
+    python -m benchmarks.bench_service --connections 16 --depth 8 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+from benchmarks.catalog import generate_catalog
+from benchmarks.run import percentile
+from service import OrderService
+from store import Store
+
+# Relative weights of the request kinds sent.
+DEFAULT_MIX = {'quote': 4, 'order': 2, 'list': 2, 'total': 2}
+
+
+def make_request(rng: random.Random, names: list[str], mix: dict[str, int], request_id: int) -> bytes:
+    """Returns one encoded request of a kind drawn from the mix."""
+    op = rng.choices(list(mix), weights=list(mix.values()))[0]
+    request = {'id': request_id, 'op': op}
+    if op in ('quote', 'order'):
+        request['lines'] = [{'product': rng.choice(names), 'quantity': rng.randint(1, 3)}
+                            for _ in range(rng.randint(1, 5))]
+    elif op == 'list':
+        request['page'] = rng.randrange(max(1, len(names) // 20))
+    return json.dumps(request).encode("utf-8") + b"\n"
+
+
+async def run_connection(host: str, port: int, names: list[str], mix: dict[str, int], depth: int,
+                         deadline: float, seed: int, latencies: list[float]) -> int:
+    """Drives one pipelined connection until the deadline; returns the number of failed requests."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = deque()
+    window = asyncio.Semaphore(depth)
+    clock = time.perf_counter
+
+    async def send():
+        request_id = 0
+        while clock() < deadline:
+            await window.acquire()
+            request_id += 1
+            sent.append(clock())
+            writer.write(make_request(rng, names, mix, request_id))
+            await writer.drain()
+        writer.write_eof()
+
+    sender = asyncio.create_task(send())
+    failures = 0
+    async for line in reader:
+        latencies.append(clock() - sent.popleft())
+        failures += not json.loads(line)['ok']
+        window.release()
+    await sender
+    writer.close()
+    return failures
+
+
+async def load(host: str, port: int, names: list[str], args) -> dict:
+    """Runs every connection for the configured time and summarizes the results."""
+    latencies: list[float] = []
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    failures = await asyncio.gather(*(
+        run_connection(host, port, names, DEFAULT_MIX, args.depth, deadline, args.seed + i, latencies)
+        for i in range(args.connections)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'failed': sum(failures),
+        'requests_per_s': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+        'p999_ms': percentile(latencies, 0.999) * 1e3,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1e3,
+    }
+
+
+async def main_async(args) -> dict:
+    if args.port:
+        # An external service; product names default to the demo catalog in main.py
+        return await load(args.host, args.port, args.products, args)
+    catalog = generate_catalog(args.size, seed=args.seed)
+    service = OrderService(Store(catalog), max_workers=args.workers, pipeline_depth=args.depth)
+    host, port = await service.start("127.0.0.1", 0)
+    try:
+        return await load(host, port, [product.name for product in catalog], args)
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the order service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="Port of a running service; 0 starts one here.")
+    parser.add_argument("--products", nargs="+",
+                        default=["MacBook Air M2", "Bose QuietComfort Earbuds", "Google Pixel 7",
+                                 "Windows License", "Shipping"],
+                        help="Product names to order from a running service.")
+    parser.add_argument("--size", type=int, default=10_000, help="Catalog size of the in-process service.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--depth", type=int, default=8, help="Requests in flight per connection.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(main_async(args))
+    print(f"{result['requests']} requests ({result['failed']} failed) in {args.seconds:.1f}s: "
+          f"{result['requests_per_s']:.0f} req/s, p50 {result['p50_ms']:.2f}ms, "
+          f"p99 {result['p99_ms']:.2f}ms, p99.9 {result['p999_ms']:.2f}ms, max {result['max_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures aggregate read throughput of the shared-memory inventory as
+reader processes are added.
+
+Each reader opens the block by name and looks up random products for a
+fixed time, while the store process keeps placing orders. Reads never
+touch the store, so throughput should grow with the reader count up to
+the number of CPU cores.
+
+Usage:
+    python -m benchmarks.bench_shared_reads
+"""
+import multiprocessing
+import os
+import random
+import time
+
+from products import Product
+from shared_inventory import InventoryReader, SharedInventory
+from store import Store
+
+CATALOG_SIZE = 10_000
+READERS = (1, 2, 4, 8)
+SECONDS = 2.0
+
+
+def _reader(block_name: str, names: list[str], seconds: float, seed: int, results) -> None:
+    """Reads random products until the time is up, then reports the read count."""
+    rng = random.Random(seed)
+    picks = [rng.choice(names) for _ in range(4096)]
+    reads = 0
+    with InventoryReader(block_name) as reader:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for name in picks:
+                reader.quantity(name)
+            reads += len(picks)
+    results.put(reads)
+
+
+def bench_readers(inventory: SharedInventory, store: Store, names: list[str], readers: int) -> float:
+    """Returns the aggregate reads per second of the given number of reader processes."""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [context.Process(target=_reader, args=(inventory.name, names, SECONDS, seed, results))
+                 for seed in range(readers)]
+    for process in processes:
+        process.start()
+    # Keep the writer busy while the readers run
+    products = store.get_all_products()
+    rng = random.Random(readers)
+    deadline = time.perf_counter() + SECONDS
+    while time.perf_counter() < deadline:
+        store.order([(rng.choice(products), 1)])
+    total = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return total / SECONDS
+
+
+def main():
+    catalog = [Product(f"SKU-{i}", price=10, quantity=10 ** 9) for i in range(CATALOG_SIZE)]
+    store = Store(catalog)
+    names = [product.name for product in catalog]
+    print(f"{os.cpu_count()} CPU(s)")
+    print(f"{'readers':>7} | {'reads / s':>12} | {'per reader':>12}")
+    with SharedInventory(store) as inventory:
+        for readers in READERS:
+            throughput = bench_readers(inventory, store, names, readers)
+            print(f"{readers:>7} | {throughput:>12,.0f} | {throughput / readers:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
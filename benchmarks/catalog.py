@@ -0,0 +1,67 @@
+"""
+Seeded synthetic catalogs and order streams for the benchmarks.
+"""
+import random
+from typing import Iterator
+
+from products import Product, NonStockedProduct, LimitedProduct
+from promotions import PercentageDiscount, SecondItemHalfPrice, Buy2Get1Free
+
+# Share of Product, NonStockedProduct and LimitedProduct in a catalog.
+DEFAULT_MIX = (0.8, 0.1, 0.1)
+
+PROMOTIONS = (
+    PercentageDiscount.shared("10% off", percent=10),
+    PercentageDiscount.shared("30% off", percent=30),
+    SecondItemHalfPrice.shared("Second item at half price"),
+    Buy2Get1Free.shared("Buy 2, get 1 free"),
+)
+
+
+def generate_catalog(size: int, mix: tuple[float, float, float] = DEFAULT_MIX,
+                     promotion_coverage: float = 0.2, seed: int = 0) -> list[Product]:
+    """
+    Builds a reproducible catalog.
+
+    Args:
+        size: Number of products.
+        mix: Relative weights of Product, NonStockedProduct and LimitedProduct.
+        promotion_coverage: Fraction of products that get one of the shared promotions.
+        seed: Random seed.
+    """
+    rng = random.Random(seed)
+    stocked, non_stocked, _ = mix
+    total = sum(mix)
+    stocked_cut = stocked / total
+    non_stocked_cut = stocked_cut + non_stocked / total
+    catalog = []
+    for i in range(size):
+        name = f"SKU-{i:08d}"
+        price = round(rng.uniform(1, 2000), 2)
+        kind = rng.random()
+        if kind < stocked_cut:
+            product = Product(name, price, rng.randint(0, 1000))
+        elif kind < non_stocked_cut:
+            product = NonStockedProduct(name, price)
+        else:
+            product = LimitedProduct(name, price, rng.randint(0, 1000), maximum=rng.randint(1, 5))
+        if rng.random() < promotion_coverage:
+            product.set_promotion(rng.choice(PROMOTIONS))
+        catalog.append(product)
+    return catalog
+
+
+def generate_orders(catalog: list[Product], count: int, max_lines: int = 5, max_quantity: int = 3,
+                    skew: float = 3.0, seed: int = 1) -> Iterator[list[tuple[Product, int]]]:
+    """
+    Yields a reproducible stream of shopping lists.
+
+    Product popularity follows a power law: ``skew`` 1 is uniform, larger
+    values concentrate traffic on the head of the catalog, as in real
+    order logs.
+    """
+    rng = random.Random(seed)
+    size = len(catalog)
+    for _ in range(count):
+        yield [(catalog[int(size * rng.random() ** skew)], rng.randint(1, max_quantity))
+               for _ in range(rng.randint(1, max_lines))]
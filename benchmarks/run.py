@@ -0,0 +1,115 @@
+"""
+Benchmark suite: builds seeded catalogs, replays order traffic against
+them and writes throughput, latency percentiles and memory to JSON.
+
+Usage:
+    python -m benchmarks.run --sizes 10 10000 1000000 --orders 20000 --output bench_results.json
+"""
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+from benchmarks.catalog import DEFAULT_MIX, generate_catalog, generate_orders
+from price_cache import PRICE_CACHE
+from store import Store
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Returns the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def timed(operation, calls) -> dict:
+    """Runs operation(*args) for each args tuple and summarizes throughput and latency."""
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for args in calls:
+        before = clock()
+        operation(*args)
+        latencies.append(clock() - before)
+    elapsed = clock() - start
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'throughput_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_us': percentile(latencies, 0.50) * 1e6,
+        'p99_us': percentile(latencies, 0.99) * 1e6,
+        'max_us': (latencies[-1] if latencies else 0.0) * 1e6,
+    }
+
+
+def run_size(size: int, args) -> dict:
+    """Runs every scenario against one catalog size."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    catalog = generate_catalog(size, tuple(args.mix), args.promotion_coverage, args.seed)
+    store = Store(catalog)
+    build_seconds = time.perf_counter() - start
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    orders = list(generate_orders(catalog, args.orders, skew=args.skew, seed=args.seed + 1))
+    PRICE_CACHE.clear()
+    results = {
+        'size': size,
+        'build_seconds': build_seconds,
+        'build_peak_bytes': build_peak,
+        'order': timed(store.place_order, ((shopping_list,) for shopping_list in orders)),
+        'get_total_quantity': timed(store.get_total_quantity, (() for _ in range(args.orders))),
+    }
+    results['price_cache'] = PRICE_CACHE.stats()
+
+    promoted = [p for p in catalog if p.promotion is not None][:args.orders] or catalog[:1]
+    results['apply_promotion'] = timed(
+        lambda product: product.promotion.apply_promotion(product, 3) if product.promotion else None,
+        ((promoted[i % len(promoted)],) for i in range(args.orders)))
+
+    buyable = [p for p in catalog if p.is_active()]
+    results['product_buy'] = timed(
+        lambda product: product.buy(1) if product.get_quantity() > 0 else None,
+        ((buyable[i % len(buyable)],) for i in range(args.orders)) if buyable else ())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the store benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--orders", type=int, default=10_000, help="Orders replayed per catalog size.")
+    parser.add_argument("--mix", type=float, nargs=3, default=list(DEFAULT_MIX),
+                        metavar=("STOCKED", "NON_STOCKED", "LIMITED"))
+    parser.add_argument("--promotion-coverage", type=float, default=0.2)
+    parser.add_argument("--skew", type=float, default=3.0, help="Popularity skew; 1 is uniform.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    report = {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'parameters': vars(args),
+        'results': [],
+    }
+    for size in args.sizes:
+        result = run_size(size, args)
+        report['results'].append(result)
+        order = result['order']
+        print(f"{size:>10} products: {order['throughput_per_s']:>9.0f} orders/s, "
+              f"p50 {order['p50_us']:.1f}us, p99 {order['p99_us']:.1f}us, "
+              f"build peak {result['build_peak_bytes'] / 2 ** 20:.1f} MiB")
+    report['max_rss_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Cart-wide promotions evaluated over a whole order.
+
+Product promotions (see promotions.py) price one product at a time. Cart
+rules span products:
+
+* Bundle -- a set of products sold together at a fixed price.
+* BuyXGetY -- buying some units of one product discounts units of another.
+* SpendAndSave -- an amount off once the cart reaches a spending threshold.
+
+The engine indexes bundle and buy-x-get-y rules by the product names they
+involve, so pricing a cart only looks at rules whose products are all in
+it. It then picks how often to apply each candidate rule so the cart is
+cheapest. A unit goes to at most one rule. Units no rule takes are priced
+as before, through Product.price_for and so through the product's own
+promotion. A product promotion therefore behaves as a single-product rule
+competing for the same units. The best spending threshold is applied last,
+to the resulting subtotal.
+"""
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from math import prod
+from typing import NamedTuple
+
+from products import Product
+
+# Largest number of rule combinations searched exhaustively; larger carts
+# are priced greedily, one best application at a time.
+MAX_COMBINATIONS = 4096
+
+
+class CartRule(ABC):
+    """
+    A rule that sells a fixed set of units, across one or more products,
+    at a price of its own. It may apply to a cart any number of times.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        """Initializes the rule with a name."""
+        self.name = name
+
+    @abstractmethod
+    def units(self) -> dict[str, int]:
+        """Returns the units of each product name one application takes."""
+
+    @abstractmethod
+    def application_price(self, prices: dict[str, float]) -> float:
+        """Returns the price of one application, given the unit price of each product name."""
+
+    def max_applications(self, quantities: dict[str, int]) -> int:
+        """Returns how many times the rule fits the given quantities by product name."""
+        return min(quantities.get(name, 0) // units for name, units in self.units().items())
+
+    def __str__(self) -> str:
+        """Returns the name of the rule."""
+        return self.name
+
+
+class Bundle(CartRule):
+    """Sells a set of products together at a fixed price."""
+    __slots__ = ('items', 'price')
+
+    def __init__(self, name: str, items: dict[str, int], price: float):
+        """
+        Initializes a bundle.
+
+        Args:
+            name (str): The name of the rule.
+            items (dict[str, int]): Units of each product name in one bundle.
+            price (float): Price of one bundle.
+
+        Raises:
+            ValueError: If the bundle is empty, a unit count is not positive or the price is negative.
+        """
+        if not items or min(items.values()) <= 0 or price < 0:
+            raise ValueError("Invalid bundle details.")
+        super().__init__(name)
+        self.items = dict(items)
+        self.price = price
+
+    def units(self) -> dict[str, int]:
+        """Returns the units of each product in one bundle."""
+        return self.items
+
+    def application_price(self, prices: dict[str, float]) -> float:
+        """Returns the bundle price."""
+        return self.price
+
+
+class BuyXGetY(CartRule):
+    """For every buy_quantity units of one product, get_quantity units of another come at a discount."""
+    __slots__ = ('buy', 'buy_quantity', 'get', 'get_quantity', 'percent')
+
+    def __init__(self, name: str, buy: str, get: str, buy_quantity: int = 1, get_quantity: int = 1,
+                 percent: float = 100):
+        """
+        Initializes a buy-x-get-y rule.
+
+        Args:
+            name (str): The name of the rule.
+            buy (str): Name of the product to buy.
+            get (str): Name of the discounted product; must differ from buy.
+            buy_quantity (int): Units of buy per application.
+            get_quantity (int): Discounted units of get per application.
+            percent (float): Discount on the get units; 100 makes them free.
+
+        Raises:
+            ValueError: If the products are the same, a quantity is not positive or percent is out of range.
+        """
+        if buy == get or buy_quantity <= 0 or get_quantity <= 0 or not 0 < percent <= 100:
+            raise ValueError("Invalid buy-x-get-y details.")
+        super().__init__(name)
+        self.buy = buy
+        self.get = get
+        self.buy_quantity = buy_quantity
+        self.get_quantity = get_quantity
+        self.percent = percent
+
+    def units(self) -> dict[str, int]:
+        """Returns the bought and discounted units of one application."""
+        return {self.buy: self.buy_quantity, self.get: self.get_quantity}
+
+    def application_price(self, prices: dict[str, float]) -> float:
+        """Returns full price for the bought units plus the discounted price of the others."""
+        discounted = prices[self.get] * self.get_quantity
+        return prices[self.buy] * self.buy_quantity + discounted - discounted * (self.percent / 100)
+
+
+class SpendAndSave:
+    """Takes a fixed amount off a cart whose subtotal reaches a threshold."""
+    __slots__ = ('name', 'threshold', 'saving')
+
+    def __init__(self, name: str, threshold: float, saving: float):
+        """
+        Initializes a spend-and-save rule.
+
+        Raises:
+            ValueError: If the saving is not positive or exceeds the threshold.
+        """
+        if saving <= 0 or saving > threshold:
+            raise ValueError("Invalid spend-and-save details.")
+        self.name = name
+        self.threshold = threshold
+        self.saving = saving
+
+    def __str__(self) -> str:
+        """Returns the name of the rule."""
+        return self.name
+
+
+class CartPrice(NamedTuple):
+    """Price of a cart: the total and the name and application count of each rule used."""
+    total: float
+    applied: list[tuple[str, int]]
+
+
+class CartPromotionEngine:
+    """
+    Holds the cart rules and prices carts with the cheapest combination of them.
+
+    Rule sets are replaced rather than modified, so pricing reads them
+    without locking while rules are added or removed.
+
+    Attributes:
+        version: Incremented whenever a rule is added or removed.
+    """
+
+    def __init__(self, rules=()):
+        """Initializes the engine with optional CartRule and SpendAndSave rules."""
+        self._lock = threading.Lock()
+        self.version = 0
+        # Product name -> rules involving it.
+        self._by_product: dict[str, tuple[CartRule, ...]] = {}
+        # Spend-and-save rules, and a table of their thresholds in ascending
+        # order paired with the rule saving the most at each threshold.
+        self._thresholds: tuple[SpendAndSave, ...] = ()
+        self._threshold_table: tuple[tuple[float, ...], tuple[SpendAndSave, ...]] = ((), ())
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule) -> None:
+        """Adds a CartRule or SpendAndSave rule."""
+        with self._lock:
+            if isinstance(rule, SpendAndSave):
+                self._set_thresholds(self._thresholds + (rule,))
+            else:
+                by_product = dict(self._by_product)
+                for name in rule.units():
+                    by_product[name] = by_product.get(name, ()) + (rule,)
+                self._by_product = by_product
+            self.version += 1
+
+    def remove_rule(self, rule) -> None:
+        """Removes a rule previously added."""
+        with self._lock:
+            if isinstance(rule, SpendAndSave):
+                self._set_thresholds(tuple(r for r in self._thresholds if r is not rule))
+            else:
+                by_product = dict(self._by_product)
+                for name in rule.units():
+                    remaining = tuple(r for r in by_product.get(name, ()) if r is not rule)
+                    if remaining:
+                        by_product[name] = remaining
+                    else:
+                        by_product.pop(name, None)
+                self._by_product = by_product
+            self.version += 1
+
+    def _set_thresholds(self, rules: tuple[SpendAndSave, ...]) -> None:
+        """Replaces the spend-and-save rules and rebuilds the threshold table."""
+        thresholds = tuple(sorted(rules, key=lambda r: r.threshold))
+        best_up_to = []
+        for rule in thresholds:
+            best_up_to.append(rule if not best_up_to or rule.saving > best_up_to[-1].saving else best_up_to[-1])
+        self._thresholds = thresholds
+        self._threshold_table = (tuple(rule.threshold for rule in thresholds), tuple(best_up_to))
+
+    def candidates(self, quantities: dict[str, int]) -> list[CartRule]:
+        """Returns the rules that fit the given quantities by product name at least once."""
+        by_product = self._by_product
+        seen = set()
+        rules = []
+        for name in quantities:
+            for rule in by_product.get(name, ()):
+                if id(rule) not in seen:
+                    seen.add(id(rule))
+                    if rule.max_applications(quantities) > 0:
+                        rules.append(rule)
+        return rules
+
+    def price(self, lines: list[tuple[Product, int]]) -> CartPrice:
+        """
+        Prices a cart with the cheapest combination of rules.
+
+        Args:
+            lines: (product, quantity) pairs; repeated products are combined.
+
+        Returns:
+            CartPrice: The total and the rules used.
+
+        Raises:
+            ValueError: If a product cannot be priced for its quantity.
+        """
+        products: dict[str, Product] = {}
+        quantities: dict[str, int] = {}
+        for product, quantity in lines:
+            products[product.name] = product
+            quantities[product.name] = quantities.get(product.name, 0) + quantity
+        prices = {name: product.price for name, product in products.items()}
+
+        leftover_cache: dict[tuple[str, int], float] = {}
+
+        def leftover_price(name: str, units: int) -> float:
+            """Prices units no rule took, through the product's own promotion."""
+            if units == 0:
+                return 0.0
+            key = (name, units)
+            price = leftover_cache.get(key)
+            if price is None:
+                # Product.price_for skips LimitedProduct's per-line maximum: lines
+                # of the same product are combined here, and each was checked on its own.
+                price = leftover_cache[key] = Product.price_for(products[name], units)
+            return price
+
+        rules = self.candidates(quantities)
+        plan = _search(rules, quantities, prices, leftover_price) if rules else []
+        remaining = dict(quantities)
+        total = 0.0
+        applied = []
+        for rule, times in plan:
+            if times:
+                for name, units in rule.units().items():
+                    remaining[name] -= units * times
+                total += rule.application_price(prices) * times
+                applied.append((rule.name, times))
+        total += sum(leftover_price(name, units) for name, units in remaining.items())
+
+        threshold_values, best_up_to = self._threshold_table
+        index = bisect_right(threshold_values, total)
+        if index:
+            best = best_up_to[index - 1]
+            total -= best.saving
+            applied.append((best.name, 1))
+        return CartPrice(total, applied)
+
+
+def _search(rules: list[CartRule], quantities: dict[str, int], prices: dict[str, float],
+            leftover_price) -> list[tuple[CartRule, int]]:
+    """
+    Chooses how many times to apply each rule so the cart is cheapest.
+
+    Small problems are searched exhaustively; larger ones greedily take the
+    single application that saves the most until none saves anything.
+    """
+    application_prices = [rule.application_price(prices) for rule in rules]
+    limits = [rule.max_applications(quantities) for rule in rules]
+
+    def cost(times: list[int]) -> float:
+        remaining = dict(quantities)
+        total = 0.0
+        for rule, count, price in zip(rules, times, application_prices):
+            if count:
+                total += price * count
+                for name, units in rule.units().items():
+                    remaining[name] -= units * count
+        if min(remaining.values()) < 0:
+            return float('inf')
+        return total + sum(leftover_price(name, units) for name, units in remaining.items())
+
+    if prod(limit + 1 for limit in limits) <= MAX_COMBINATIONS:
+        best_times, best_cost = [0] * len(rules), cost([0] * len(rules))
+        times = [0] * len(rules)
+
+        def visit(index: int, remaining: dict[str, int]) -> None:
+            nonlocal best_times, best_cost
+            if index == len(rules):
+                total = cost(times)
+                if total < best_cost:
+                    best_times, best_cost = list(times), total
+                return
+            rule = rules[index]
+            # Only as many applications as the units left by earlier rules allow
+            for count in range(rule.max_applications(remaining), -1, -1):
+                times[index] = count
+                taken = {name: units * count for name, units in rule.units().items()}
+                visit(index + 1, {name: left - taken.get(name, 0) for name, left in remaining.items()})
+            times[index] = 0
+
+        visit(0, quantities)
+        return list(zip(rules, best_times))
+
+    times = [0] * len(rules)
+    current = cost(times)
+    while True:
+        best_index, best_cost = None, current
+        for index, limit in enumerate(limits):
+            if times[index] < limit:
+                times[index] += 1
+                total = cost(times)
+                times[index] -= 1
+                if total < best_cost:
+                    best_index, best_cost = index, total
+        if best_index is None:
+            return list(zip(rules, times))
+        times[best_index] += 1
+        current = best_cost
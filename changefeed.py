@@ -0,0 +1,259 @@
+"""
+Change-data-capture feed for a store.
+
+A ChangeFeed subscribes to Store.subscribe and turns inventory
+notifications into a stream of ChangeEvents:
+
+* quantity -- the stock changed by ``delta``; ``value`` is the new quantity;
+* activate / deactivate;
+* promotion -- ``value`` is the new promotion's name, or None;
+* price -- ``value`` is the new price;
+* add / remove -- a product joined or left the store;
+* low_stock -- the quantity fell below the product's low-stock threshold;
+* bulk -- one Store.bulk_update; ``delta`` is the net stock change and
+  ``value`` a tuple of BulkChange, one per changed product. A bulk update
+  publishes no separate activate / deactivate events; each BulkChange
+  carries the product's active flag instead.
+
+Events fan out to any number of subscriptions. Each subscription has a
+bounded queue and is drained in batches, either from a thread (get_batch)
+or from an asyncio task (get_batch_async, or ``async for``). Events are
+published while the store's state lock is held, so a slow consumer must
+never hold up the store. When a queue is full the oldest event is dropped
+and counted instead. A consumer that sees ``dropped`` grow can resync
+from Store.snapshot().
+"""
+import asyncio
+import itertools
+import threading
+from collections import deque
+from typing import Iterable, NamedTuple, Optional
+
+from products import Product
+
+# Default capacity of a subscription queue.
+MAX_QUEUED = 10_000
+
+
+class ChangeEvent(NamedTuple):
+    """One inventory change; see the module docstring for the kinds."""
+    sequence: int
+    kind: str
+    name: str
+    delta: int
+    value: object
+
+
+class BulkChange(NamedTuple):
+    """The state of one product after a bulk update, and how its stock changed."""
+    name: str
+    delta: int
+    quantity: int
+    active: bool
+    price: float
+    promotion: Optional[str]
+
+
+class Subscription:
+    """
+    A bounded queue of change events for one consumer.
+
+    Use it from threads with get_batch, or from one asyncio event loop with
+    get_batch_async or ``async for batch in subscription``.
+    """
+
+    def __init__(self, feed: 'ChangeFeed', max_queued: int, kinds: Optional[frozenset[str]]):
+        self._feed = feed
+        self._kinds = kinds
+        self._events: deque[ChangeEvent] = deque(maxlen=max_queued)
+        self._condition = threading.Condition()
+        # Event loop and asyncio.Event woken on new events, for async consumers.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+        self.dropped = 0
+        self.closed = False
+
+    def _push(self, event: ChangeEvent) -> None:
+        """Queues an event, dropping the oldest one if the queue is full."""
+        if self._kinds is not None and event.kind not in self._kinds:
+            return
+        with self._condition:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._condition.notify()
+            loop = self._loop
+        if loop is not None:
+            self._wake(loop)
+
+    def _wake(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Wakes the async consumer, unless its event loop has already closed."""
+        try:
+            loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass
+
+    def _take(self, max_items: int) -> list[ChangeEvent]:
+        """Removes up to max_items queued events; the caller holds the condition."""
+        events = self._events
+        return [events.popleft() for _ in range(min(max_items, len(events)))]
+
+    def get_batch(self, max_items: int = 100, timeout: Optional[float] = None) -> list[ChangeEvent]:
+        """
+        Returns up to max_items events, waiting up to timeout seconds for the first.
+
+        Returns:
+            The events in publication order; empty on timeout or once closed.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._events or self.closed, timeout)
+            return self._take(max_items)
+
+    async def get_batch_async(self, max_items: int = 100) -> list[ChangeEvent]:
+        """Returns up to max_items events, waiting for the first; empty once closed."""
+        if self._loop is None:
+            ready = asyncio.Event()
+            with self._condition:
+                self._ready, self._loop = ready, asyncio.get_running_loop()
+        while True:
+            # Clear before checking, so an event pushed in between still wakes us
+            self._ready.clear()
+            with self._condition:
+                if self._events or self.closed:
+                    return self._take(max_items)
+            await self._ready.wait()
+
+    def __aiter__(self) -> 'Subscription':
+        return self
+
+    async def __anext__(self) -> list[ChangeEvent]:
+        batch = await self.get_batch_async()
+        if not batch:
+            raise StopAsyncIteration
+        return batch
+
+    def close(self) -> None:
+        """Stops delivery; waiting consumers receive their remaining events, then empty batches."""
+        self._feed._unsubscribe(self)
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+            loop = self._loop
+        if loop is not None:
+            self._wake(loop)
+
+
+class ChangeFeed:
+    """Publishes a store's inventory changes to subscriptions."""
+
+    def __init__(self, store: 'Store', low_stock_threshold: Optional[int] = None):
+        """
+        Attaches the feed to a store.
+
+        Args:
+            store: The store to watch.
+            low_stock_threshold: Quantity below which a low_stock event is
+                published for every product, unless overridden per product.
+        """
+        self.store = store
+        self.low_stock_threshold = low_stock_threshold
+        self._thresholds: dict[str, int] = {}
+        self._subscriptions: tuple[Subscription, ...] = ()
+        self._sequence = itertools.count(1)
+        with store.inventory_lock():
+            # Last quantity seen per product, to turn new quantities into deltas
+            self._quantities = {id(product): product.get_quantity() for product in store.get_all_products()}
+            store.subscribe(self._on_change)
+
+    def set_low_stock_threshold(self, name: str, threshold: Optional[int]) -> None:
+        """Sets the low-stock threshold for one product name; None restores the default."""
+        with self.store.inventory_lock():
+            if threshold is None:
+                self._thresholds.pop(name, None)
+            else:
+                self._thresholds[name] = threshold
+
+    def subscribe(self, max_queued: int = MAX_QUEUED, kinds: Optional[Iterable[str]] = None) -> Subscription:
+        """
+        Returns a new subscription receiving every later event.
+
+        Args:
+            max_queued: Queue capacity; the oldest events are dropped beyond it.
+            kinds: Event kinds to receive; all kinds by default.
+
+        Raises:
+            ValueError: If max_queued is not positive.
+        """
+        if max_queued <= 0:
+            raise ValueError("Queue size must be greater than zero.")
+        subscription = Subscription(self, max_queued, frozenset(kinds) if kinds is not None else None)
+        with self.store.inventory_lock():
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self.store.inventory_lock():
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    def close(self) -> None:
+        """Detaches the feed from the store and closes every subscription."""
+        self.store.unsubscribe(self._on_change)
+        for subscription in self._subscriptions:
+            subscription.close()
+
+    def _emit(self, kind: str, name: str, delta: int = 0, value: object = None) -> None:
+        event = ChangeEvent(next(self._sequence), kind, name, delta, value)
+        for subscription in self._subscriptions:
+            subscription._push(event)
+
+    def _on_change(self, event: str, product: Product) -> None:
+        """Store subscriber; runs under the store's state lock."""
+        if event == 'bulk':
+            self._on_bulk(product)
+            return
+        key = id(product)
+        name = product.name
+        if event == 'quantity':
+            quantity = product.get_quantity()
+            previous = self._quantities.get(key, quantity)
+            if quantity == previous:
+                return
+            self._quantities[key] = quantity
+            self._emit('quantity', name, quantity - previous, quantity)
+            self._check_low_stock(name, previous, quantity)
+        elif event == 'active':
+            self._emit('activate' if product.is_active() else 'deactivate', name)
+        elif event == 'promotion':
+            promotion = product.get_promotion()
+            self._emit('promotion', name, 0, str(promotion) if promotion is not None else None)
+        elif event == 'price':
+            self._emit('price', name, 0, product.price)
+        elif event == 'add':
+            quantity = self._quantities[key] = product.get_quantity()
+            self._emit('add', name, 0, quantity)
+        elif event == 'remove':
+            self._quantities.pop(key, None)
+            self._emit('remove', name)
+
+    def _on_bulk(self, products: tuple[Product, ...]) -> None:
+        """Publishes one bulk event for a Store.bulk_update, then any low-stock crossings it caused."""
+        changes = []
+        crossings = []
+        for product in products:
+            quantity = product.get_quantity()
+            previous = self._quantities.get(id(product), quantity)
+            self._quantities[id(product)] = quantity
+            promotion = product.get_promotion()
+            changes.append(BulkChange(product.name, quantity - previous, quantity, product.is_active(),
+                                      product.price, str(promotion) if promotion is not None else None))
+            if quantity < previous:
+                crossings.append((product.name, previous, quantity))
+        self._emit('bulk', '', sum(change.delta for change in changes), tuple(changes))
+        for name, previous, quantity in crossings:
+            self._check_low_stock(name, previous, quantity)
+
+    def _check_low_stock(self, name: str, previous: int, quantity: int) -> None:
+        """Publishes a low_stock event if the quantity just fell below the product's threshold."""
+        threshold = self._thresholds.get(name, self.low_stock_threshold)
+        if threshold is not None and quantity < threshold <= previous:
+            self._emit('low_stock', name, 0, quantity)
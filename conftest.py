@@ -0,0 +1,51 @@
+"""
+Shared test data: the demo catalog of main.py, as fixtures.
+
+Tests call the ``catalog`` or ``make_store`` factory for fresh products and
+pass only what they change: which products, their quantities, promotions.
+"""
+from typing import Optional
+
+import pytest
+from products import Product, NonStockedProduct, LimitedProduct
+from store import Store
+
+# Products in a catalog when no names are given; "Google Pixel 7" is available by name.
+DEFAULT_NAMES = ("MacBook Air M2", "Bose QuietComfort Earbuds", "Windows License", "Shipping")
+
+
+def build_catalog(*names: str, quantities: Optional[dict[str, int]] = None,
+                  promotions: Optional[dict[str, 'Promotion']] = None) -> list[Product]:
+    """
+    Builds fresh demo products.
+
+    Args:
+        names: Products to include, in this order; DEFAULT_NAMES when empty.
+        quantities: Stock by product name, replacing the demo quantity.
+        promotions: Promotion by product name.
+    """
+    quantities = quantities or {}
+    products = {product.name: product for product in (
+        Product("MacBook Air M2", price=1450, quantity=quantities.get("MacBook Air M2", 100)),
+        Product("Bose QuietComfort Earbuds", price=250, quantity=quantities.get("Bose QuietComfort Earbuds", 500)),
+        Product("Google Pixel 7", price=500, quantity=quantities.get("Google Pixel 7", 250)),
+        NonStockedProduct("Windows License", price=125),
+        LimitedProduct("Shipping", price=10, quantity=quantities.get("Shipping", 250), maximum=1),
+    )}
+    chosen = [products[name] for name in names or DEFAULT_NAMES]
+    for product in chosen:
+        if promotions and product.name in promotions:
+            product.set_promotion(promotions[product.name])
+    return chosen
+
+
+@pytest.fixture
+def catalog():
+    """Returns build_catalog, for fresh demo products."""
+    return build_catalog
+
+
+@pytest.fixture
+def make_store():
+    """Returns a factory for stores holding fresh demo products; it takes build_catalog's arguments."""
+    return lambda *names, **changes: Store(build_catalog(*names, **changes))
@@ -0,0 +1,138 @@
+"""
+Bulk catalog loading from CSV, JSONL and the binary catalog format.
+
+Feeds are parsed in chunks into plain record rows (see records.py),
+validated a whole chunk at a time with the same rules as the Product
+constructors, and turned into Product objects only when a chunk is
+materialized. Store.from_csv, Store.from_jsonl and Store.from_binary
+use these to build stores that serve requests while the rest of the
+feed is still being materialized.
+
+CSV feeds have a header with ``name,price,quantity`` and optionally
+``kind`` (stocked, non_stocked or limited) and ``maximum``. JSONL feeds
+use the same field names, one product object per line.
+"""
+import csv
+import json
+from itertools import islice
+from typing import Iterable, Iterator
+
+from products import Product
+from records import STOCKED, NON_STOCKED, LIMITED, ProductRow, build_product, iter_catalog_rows
+
+# Rows parsed, validated and materialized together.
+CHUNK_SIZE = 10_000
+
+# Most invalid rows listed in one error message.
+_MAX_REPORTED_ERRORS = 10
+
+_KINDS = {"": STOCKED, "stocked": STOCKED, "non_stocked": NON_STOCKED, "limited": LIMITED}
+
+
+def _row_from_fields(fields: dict) -> ProductRow:
+    """Converts one CSV or JSONL record into record fields, without validating values."""
+    kind = _KINDS[str(fields.get("kind") or "").strip().lower()]
+    quantity = -1 if kind == NON_STOCKED else int(fields.get("quantity") or 0)
+    maximum = int(fields.get("maximum") or 0)
+    # New products are active when they have stock, as in Product.__init__
+    active = kind == NON_STOCKED or quantity > 0
+    return kind, str(fields.get("name") or ""), float(fields["price"]), quantity, maximum, active
+
+
+def parse_csv(path: str) -> Iterator[ProductRow]:
+    """Yields record fields from a CSV feed."""
+    with open(path, newline="", encoding="utf-8") as file:
+        for number, fields in enumerate(csv.DictReader(file), start=2):
+            try:
+                yield _row_from_fields(fields)
+            except (KeyError, ValueError, TypeError) as e:
+                raise ValueError(f"Invalid product on line {number}: {e!r}") from e
+
+
+def parse_jsonl(path: str) -> Iterator[ProductRow]:
+    """Yields record fields from a JSONL feed, skipping blank lines."""
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+                yield _row_from_fields(record)
+            except (KeyError, ValueError, TypeError) as e:
+                raise ValueError(f"Invalid product on line {number}: {e!r}") from e
+
+
+def validate_rows(rows: list[ProductRow], first_index: int = 0) -> None:
+    """
+    Validates a chunk of rows with the rules of the Product constructors.
+
+    Raises:
+        ValueError: Listing every invalid row of the chunk (by 0-based feed index).
+    """
+    invalid = [
+        first_index + index
+        for index, (kind, name, price, quantity, maximum, _) in enumerate(rows)
+        if not name or price < 0 or (kind != NON_STOCKED and quantity < 0)
+        or (kind == LIMITED and maximum <= 0)
+    ]
+    if invalid:
+        shown = ", ".join(map(str, invalid[:_MAX_REPORTED_ERRORS]))
+        more = f" and {len(invalid) - _MAX_REPORTED_ERRORS} more" if len(invalid) > _MAX_REPORTED_ERRORS else ""
+        raise ValueError(f"Invalid product details in rows {shown}{more}.")
+
+
+def chunked(rows: Iterable[ProductRow], chunk_size: int = CHUNK_SIZE) -> Iterator[list[ProductRow]]:
+    """Groups rows into lists of at most chunk_size."""
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def validate(rows: Iterable[ProductRow], chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Validates a whole feed chunk by chunk without building any products.
+
+    Returns:
+        int: The number of rows.
+    """
+    count = 0
+    for chunk in chunked(rows, chunk_size):
+        validate_rows(chunk, count)
+        count += len(chunk)
+    return count
+
+
+def product_chunks(rows: Iterable[ProductRow], chunk_size: int = CHUNK_SIZE,
+                   validated: bool = False) -> Iterator[list[Product]]:
+    """Yields lists of products built from the rows, validating each chunk first unless already done."""
+    first_index = 0
+    for chunk in chunked(rows, chunk_size):
+        if not validated:
+            validate_rows(chunk, first_index)
+        first_index += len(chunk)
+        yield [build_product(row) for row in chunk]
+
+
+def _parser_for(fmt: str):
+    """Returns the row parser for a feed format."""
+    try:
+        return {"csv": parse_csv, "jsonl": parse_jsonl, "binary": iter_catalog_rows}[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown catalog format: {fmt}") from None
+
+
+def load_chunks(path: str, fmt: str, chunk_size: int = CHUNK_SIZE,
+                validate_first: bool = True) -> Iterator[list[Product]]:
+    """
+    Returns a lazy iterator of product chunks for a feed.
+
+    With validate_first, the whole feed is parsed and validated up front,
+    without building products, so a bad row fails the load immediately
+    instead of surfacing when its chunk is materialized later.
+    """
+    parse = _parser_for(fmt)
+    if validate_first:
+        validate(parse(path), chunk_size)
+    return product_chunks(parse(path), chunk_size, validated=validate_first)
@@ -1,13 +1,74 @@
+import argparse
+import asyncio
+import json
+
 import store
 import products
 import promotions
+import persistence
+import replay
+import service
+
+# Directory holding the store's snapshot and write-ahead log.
+DATA_DIRECTORY = "store_data"
+
+# Number of products listed per page.
+PAGE_SIZE = 20
+
+# Most search matches offered when a product is picked by name.
+SEARCH_RESULTS = 10
+
+
+def page_count(store, page_size=PAGE_SIZE):
+    """Returns the number of product pages, at least one."""
+    return max(1, -(-store.get_product_count() // page_size))
+
 
+def display_products(store, page=0, page_size=PAGE_SIZE):
+    """
+    Displays one page of products, numbered by their position in the whole store.
 
-def display_products(store):
-    """Displays all products in the store."""
-    products_list = store.get_all_products()
-    for i, product in enumerate(products_list):
+    Only the requested page is rendered, and each product's line is cached
+    by Product.show until the product changes.
+    """
+    first = page * page_size
+    for i, product in enumerate(store.get_products_page(page, page_size), start=first):
         print(f"{i + 1}. {product.show()}")
+    pages = page_count(store, page_size)
+    if pages > 1:
+        print(f"-- Page {page + 1} of {pages} --")
+
+
+def list_products(store):
+    """Lists the store page by page until the user stops or the last page is shown."""
+    pages = page_count(store)
+    for page in range(pages):
+        display_products(store, page)
+        if page + 1 < pages and input("Press Enter for more, or q to stop: ").strip().lower() == "q":
+            break
+
+
+def find_product(store, query):
+    """
+    Looks up products by name prefix and lets the user pick one.
+
+    Returns:
+        The chosen product, or None if nothing matched or nothing was chosen.
+    """
+    matches = store.search(query, limit=SEARCH_RESULTS)
+    if not matches:
+        print(f"\nNo products match '{query}'.\n")
+        return None
+    if len(matches) == 1:
+        print(f"Found: {matches[0].show()}")
+        return matches[0]
+    for i, product in enumerate(matches):
+        print(f"  {i + 1}) {product.show()}")
+    try:
+        choice = int(input("Which match do you want? ")) - 1
+    except ValueError:
+        return None
+    return matches[choice] if 0 <= choice < len(matches) else None
 
 
 def start(store):
@@ -28,7 +89,7 @@ def start(store):
         choice = input("Please choose a number: ")
 
         if choice == "1":
-            display_products(store)
+            list_products(store)
 
         elif choice == "2":
             total_quantity = store.get_total_quantity()
@@ -36,25 +97,38 @@ def start(store):
 
         elif choice == "3":
             shopping_list = []
+            page = 0
             while True:
-                display_products(store)
+                display_products(store, page)
+                pages = page_count(store)
+                prompt = "\nWhich product # or name do you want? " if pages == 1 \
+                    else "\nWhich product # or name do you want? (n/p for next/previous page) "
+
+                product_input = input(prompt).strip()
+                if product_input.lower() in ("n", "p") and pages > 1:
+                    page = (page + (1 if product_input.lower() == "n" else -1)) % pages
+                    continue
+
+                if product_input.isdigit():
+                    selected_product = store.get_product_at(int(product_input) - 1)
+                    if selected_product is None:
+                        print("\nInvalid product choice. Please try again.\n")
+                        continue
+                else:
+                    # Anything else is a name search; word prefixes are enough
+                    selected_product = find_product(store, product_input)
+                    if selected_product is None:
+                        continue
 
                 try:
-                    product_choice = int(input("\nWhich product # do you want? ")) - 1
                     quantity_choice = int(input("What amount do you want? "))
                 except ValueError:
                     print("\nInvalid input. Please enter numbers only.")
                     continue
-
-                products_list = store.get_all_products()
-                if not (0 <= product_choice < len(products_list)):
-                    print("\nInvalid product choice. Please try again.\n")
-                    continue
                 if quantity_choice <= 0:
                     print("\nQuantity must be valid. Please try again.\n")
                     continue
 
-                selected_product = products_list[product_choice]
                 shopping_list.append((selected_product, quantity_choice))
 
                 another_product = input("Do you want to buy another product? (yes/no): \n").strip().lower()
@@ -73,7 +147,40 @@ def start(store):
             print("Invalid choice. Please try again.")
 
 
+def non_negative_int(text: str) -> int:
+    """argparse type for counts where 0 means off."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}")
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return value
+
+
+def parse_args(argv=None):
+    """Parses the command line; without --replay or --serve the interactive menu starts."""
+    parser = argparse.ArgumentParser(description="Best Buy store.")
+    parser.add_argument("--replay", metavar="ORDERS",
+                        help="Replay a JSONL or CSV order log headlessly instead of starting the menu.")
+    parser.add_argument("--results", metavar="PATH", default="replay_results.jsonl",
+                        help="Where to write per-order replay results (default: %(default)s).")
+    parser.add_argument("--format", choices=("jsonl", "csv"),
+                        help="Order log format; guessed from the file extension by default.")
+    parser.add_argument("--progress-every", type=non_negative_int, default=10_000,
+                        help="Report replay progress every N orders, or never with 0 (default: %(default)s).")
+    parser.add_argument("--in-memory", action="store_true",
+                        help=f"Start from the initial stock and persist nothing to {DATA_DIRECTORY}, "
+                             "e.g. for load-test replays.")
+    parser.add_argument("--serve", action="store_true",
+                        help="Serve the store over a local TCP socket instead of starting the menu.")
+    service.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
     # Setup initial stock of inventory
     product_list = [
         products.Product("MacBook Air M2", price=1450, quantity=100),
@@ -84,17 +191,41 @@ if __name__ == "__main__":
     ]
 
     # Create promotion catalog
-    second_half_price = promotions.SecondItemHalfPrice("Second item at half price")
-    third_one_free = promotions.Buy2Get1Free("Buy 2, get 1 free")
-    thirty_percent = promotions.PercentageDiscount("30% off", percent=30)
-
-    # Add promotions to products
-    product_list[0].set_promotion(second_half_price)  # MacBook Air gets Second Item Half Price
-    product_list[1].set_promotion(third_one_free)  # Bose gets Buy 2, Get 1 Free
-    product_list[3].set_promotion(thirty_percent)  # Windows License gets 30% off
-
-    # Initialize store with products
-    best_buy = store.Store(product_list)
-
-    # Start the store app
-    start(best_buy)
+    second_half_price = promotions.SecondItemHalfPrice.shared("Second item at half price")
+    third_one_free = promotions.Buy2Get1Free.shared("Buy 2, get 1 free")
+    thirty_percent = promotions.PercentageDiscount.shared("30% off", percent=30)
+
+    if args.in_memory:
+        best_buy, journal = store.Store(product_list), None
+    else:
+        # Load the store from disk, seeding it with the initial stock on first run
+        best_buy, journal = persistence.open_store(DATA_DIRECTORY, seed=product_list)
+
+    # Add promotions to products; promotions are configuration and are not persisted
+    catalog_promotions = {
+        "MacBook Air M2": second_half_price,  # MacBook Air gets Second Item Half Price
+        "Bose QuietComfort Earbuds": third_one_free,  # Bose gets Buy 2, Get 1 Free
+        "Windows License": thirty_percent,  # Windows License gets 30% off
+    }
+    for product in best_buy.get_all_products():
+        if product.name in catalog_promotions:
+            product.set_promotion(catalog_promotions[product.name])
+
+    try:
+        if args.replay:
+            # Headless mode: stream the order log through the store
+            summary = replay.replay_file(best_buy, args.replay, args.results, args.format, args.progress_every)
+            print(json.dumps(summary))
+        elif args.serve:
+            # Headless mode: answer list, quote, order and total requests (see service.py)
+            try:
+                asyncio.run(service.serve(best_buy, args.host, args.port, max_workers=args.workers,
+                                          pipeline_depth=args.pipeline_depth))
+            except KeyboardInterrupt:
+                pass
+        else:
+            # Start the store app
+            start(best_buy)
+    finally:
+        if journal is not None:
+            journal.close()
@@ -0,0 +1,187 @@
+"""
+Optional hot-path instrumentation.
+
+Instrumentation is off until enable() is called. Instrumented code reads
+the module-level REGISTRY once per call and skips all bookkeeping while it
+is None, so the disabled cost is a single global lookup.
+"""
+import os
+import threading
+from bisect import bisect_left
+from typing import Optional
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4,
+                   5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1)
+
+# Number of SKUs tracked by the hot-item sketch.
+HOT_ITEMS = 100
+
+_PREFIX = "bestbuy"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Records one observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, fraction: float) -> float:
+        """Returns the upper bound of the bucket holding the given quantile."""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return 0.0
+
+
+class HotItems:
+    """
+    Bounded heavy-hitter sketch (Space-Saving): tracks the top SKUs by units
+    sold in constant memory. Counts of tracked items may be overestimated
+    by at most the smallest tracked count.
+    """
+    __slots__ = ('capacity', 'counts')
+
+    def __init__(self, capacity: int = HOT_ITEMS):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+
+    def add(self, sku: str, amount: int = 1) -> None:
+        """Adds units sold for a SKU."""
+        counts = self.counts
+        if sku in counts:
+            counts[sku] += amount
+        elif len(counts) < self.capacity:
+            counts[sku] = amount
+        else:
+            # Replace the least-counted item, inheriting its count
+            victim = min(counts, key=counts.__getitem__)
+            counts[sku] = counts.pop(victim) + amount
+
+    def top(self, n: int = 10) -> list[tuple[str, int]]:
+        """Returns the n hottest SKUs with their estimated counts."""
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+class Registry:
+    """Counters, per-operation latency histograms and hot-item tracking."""
+
+    def __init__(self, hot_items: int = HOT_ITEMS):
+        """Initializes an empty registry."""
+        self._lock = threading.Lock()
+        self.counters: dict[tuple[str, tuple], float] = {}
+        self.latencies: dict[str, Histogram] = {}
+        self.hot_items = HotItems(hot_items)
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Increments a counter, optionally labelled."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Records the latency of one operation."""
+        with self._lock:
+            histogram = self.latencies.get(operation)
+            if histogram is None:
+                histogram = self.latencies[operation] = Histogram()
+            histogram.observe(seconds)
+
+    def sold(self, sku: str, quantity: int) -> None:
+        """Records units sold for hot-item tracking."""
+        with self._lock:
+            self.hot_items.add(sku, quantity)
+
+    def snapshot(self) -> dict:
+        """Returns a point-in-time copy of every metric as plain data."""
+        with self._lock:
+            return {
+                'counters': {
+                    name + (_format_labels(labels) if labels else ''): value
+                    for (name, labels), value in self.counters.items()
+                },
+                'latency': {
+                    operation: {
+                        'count': histogram.count,
+                        'sum_seconds': histogram.sum,
+                        'p50_seconds': histogram.quantile(0.5),
+                        'p99_seconds': histogram.quantile(0.99),
+                    }
+                    for operation, histogram in self.latencies.items()
+                },
+                'hot_items': self.hot_items.top(len(self.hot_items.counts)),
+            }
+
+    def to_prometheus(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {_PREFIX}_{name} counter")
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        label_set = _format_labels(labels) if labels else ""
+                        lines.append(f"{_PREFIX}_{name}{label_set} {value}")
+
+            metric = f"{_PREFIX}_operation_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for operation, histogram in sorted(self.latencies.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f'{metric}_bucket{{operation="{operation}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{operation="{operation}"}} {histogram.sum}')
+                lines.append(f'{metric}_count{{operation="{operation}"}} {histogram.count}')
+
+            metric = f"{_PREFIX}_hot_item_units"
+            lines.append(f"# TYPE {metric} gauge")
+            for sku, count in self.hot_items.top(len(self.hot_items.counts)):
+                lines.append(f"{metric}{_format_labels((('sku', sku),))} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically writes the Prometheus text format to a file, e.g. for a node-exporter textfile collector."""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            file.write(self.to_prometheus())
+        os.replace(temporary, path)
+
+
+def _format_labels(labels: tuple) -> str:
+    """Formats (name, value) pairs as a Prometheus label set."""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+# The active registry, or None while instrumentation is disabled.
+REGISTRY: Optional[Registry] = None
+
+
+def enable(hot_items: int = HOT_ITEMS) -> Registry:
+    """Turns instrumentation on with a fresh registry and returns it."""
+    global REGISTRY
+    REGISTRY = Registry(hot_items)
+    return REGISTRY
+
+
+def disable() -> None:
+    """Turns instrumentation off."""
+    global REGISTRY
+    REGISTRY = None
@@ -0,0 +1,151 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from products import Product
+from store import Store, OrderResult
+
+# Default size cap and collection window of a batch.
+MAX_BATCH = 256
+MAX_WAIT = 0.002
+
+_STOP = object()
+
+
+class OrderBatcher:
+    """
+    Group-commits orders placed against a Store.
+
+    Shopping lists submitted from any thread are queued and settled by a
+    single worker in batches. Within a batch, demand is allocated to
+    orders strictly in arrival order, and each product's stock is written
+    once for the whole batch instead of once per order line. Every caller
+    still gets its own OrderResult, identical to what Store.place_order
+    would have returned had the orders run one after another.
+    """
+
+    def __init__(self, store: Store, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT):
+        """
+        Initializes the batcher and starts its worker thread.
+
+        Args:
+            store (Store): The store to settle orders against.
+            max_batch (int): Maximum number of orders per batch.
+            max_wait (float): Seconds to wait for more orders after the first one arrives.
+
+        Raises:
+            ValueError: If max_batch is not positive or max_wait is negative.
+        """
+        if max_batch <= 0 or max_wait < 0:
+            raise ValueError("Invalid batching parameters.")
+        self.store = store
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.SimpleQueue()
+        # Guards _closed and enqueueing, so nothing is queued behind _STOP
+        self._lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="order-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, shopping_list: list[tuple[Product, int]]) -> 'Future[OrderResult]':
+        """
+        Queues a shopping list and returns a future for its OrderResult.
+
+        Raises:
+            RuntimeError: If the batcher is closed.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The order batcher is closed.")
+            self._queue.put((list(shopping_list), future))
+        return future
+
+    def order(self, shopping_list: list[tuple[Product, int]]) -> float:
+        """Places an order through the batcher and returns its total, like Store.order."""
+        result = self.submit(shopping_list).result()
+        for error in result.errors:
+            print(error)
+        return result.total
+
+    def close(self) -> None:
+        """Settles every queued order and stops the worker thread."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._worker.join()
+
+    def __enter__(self) -> 'OrderBatcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        """Worker loop: collect a batch, settle it, repeat until stopped."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._settle(batch)
+        self._fail_leftovers()
+
+    def _fail_leftovers(self) -> None:
+        """Fails any order still queued once the worker stops, so no caller waits forever."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                item[1].set_exception(RuntimeError("The order batcher is closed."))
+
+    def _settle(self, batch: list) -> None:
+        """Allocates stock to a batch of orders in arrival order and commits it."""
+        try:
+            names = [requested_product.name for shopping_list, _ in batch
+                     for requested_product, _ in shopping_list]
+            with self.store.lock_products(names):
+                results, remaining = self._allocate(batch)
+                for product, quantity in remaining.items():
+                    product.set_quantity(quantity)
+            self.store.acknowledge()
+        except Exception as e:  # Never leave a caller waiting forever
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _allocate(self, batch: list) -> tuple[list[OrderResult], dict[Product, int]]:
+        """
+        Prices every line and allocates stock first come, first served.
+
+        Returns:
+            The result of each order and the remaining stock of every stocked
+            product the batch sold from.
+        """
+        results = []
+        remaining: dict[Product, int] = {}
+        for shopping_list, _ in batch:
+            lines, _, sold = self.store.allocate(shopping_list, remaining)
+            total_price = sum(line.price for line in lines)
+            errors = [line.error for line in lines if line.error is not None]
+            results.append(OrderResult(self.store.cart_total(sold, total_price), errors))
+        return results, remaining
@@ -0,0 +1,405 @@
+"""
+Durable inventory: a binary write-ahead log of stock mutations plus
+periodic snapshots.
+
+On disk a store directory holds two files:
+
+* ``snapshot.bin`` -- a binary catalog (see records.py) whose header
+  holds the sequence number of the last change it reflects.
+* ``wal.bin`` -- framed records (length, CRC32, payload) for every change
+  made after the snapshot. A torn final frame is detected by its CRC and
+  discarded on replay.
+
+Log records carry absolute values (the new quantity, active flag or price),
+so replaying a record that the snapshot already reflects is harmless.
+Promotions are configuration rather than stock and are not persisted;
+attach them again after loading.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from products import Product, NonStockedProduct
+from records import (encode_product, decode_product, build_product, write_catalog,
+                     catalog_sequence, iter_catalog_rows)
+from store import Store
+
+SNAPSHOT_FILE = "snapshot.bin"
+WAL_FILE = "wal.bin"
+
+# fsync policies for the write-ahead log.
+FSYNC_ALWAYS = "always"
+FSYNC_BATCH = "batch"
+FSYNC_NONE = "none"
+
+_FRAME = struct.Struct("<II")
+_RECORD = struct.Struct("<QB")
+_QUANTITY = struct.Struct("<q")
+_FLAG = struct.Struct("<B")
+_PRICE = struct.Struct("<d")
+
+_OP_ADD, _OP_REMOVE, _OP_QUANTITY, _OP_ACTIVE, _OP_PRICE = 1, 2, 3, 4, 5
+
+
+def write_snapshot(path: str, products: Iterable[Product], sequence: int = 0) -> None:
+    """Atomically writes a snapshot of the given products."""
+    write_catalog(path, products, sequence)
+
+
+def read_snapshot(path: str) -> tuple[list[Product], int]:
+    """
+    Reads a snapshot through a memory map.
+
+    Returns:
+        The products and the sequence number of the last change they reflect.
+
+    Raises:
+        ValueError: If the file is not a snapshot.
+    """
+    return [build_product(row) for row in iter_catalog_rows(path)], catalog_sequence(path)
+
+
+def read_log(path: str) -> Iterator[tuple[int, int, bytes]]:
+    """Yields (sequence, op, body) for every intact record of a write-ahead log."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        offset = 0
+        while offset + _FRAME.size <= len(view):
+            length, checksum = _FRAME.unpack_from(view, offset)
+            payload = view[offset + _FRAME.size:offset + _FRAME.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break  # Torn tail from an interrupted write
+            sequence, op = _RECORD.unpack_from(payload, 0)
+            yield sequence, op, payload[_RECORD.size:]
+            offset += _FRAME.size + length
+
+
+class Journal:
+    """
+    Store subscriber that appends every stock mutation to a write-ahead log.
+
+    The subscriber runs under the store's state lock, so it only encodes
+    records and queues them. A writer thread writes and syncs whatever has
+    queued up, so concurrent orders share one write and one fsync (group
+    commit) and no disk I/O happens under the state lock. Snapshots hold
+    the state lock only to note where they start (see snapshot).
+
+    fsync policies:
+        ``always`` -- every write is fsynced, and Store.place_order,
+                      checkout and bulk_update return only once their
+                      records are on disk.
+        ``batch``  -- fsync once ``fsync_every`` records are pending or
+                      ``fsync_interval`` seconds have passed since the last sync.
+        ``none``   -- flush to the OS, never fsync.
+    """
+
+    def __init__(self, directory: str, store: Store, sequence: int = 0, fsync: str = FSYNC_BATCH,
+                 fsync_every: int = 64, fsync_interval: float = 0.05,
+                 snapshot_every: Optional[int] = None):
+        """
+        Initializes the journal, starts its writer thread and subscribes it to the store.
+
+        Args:
+            directory (str): Directory holding the snapshot and log.
+            store (Store): The store to journal.
+            sequence (int): Sequence number of the last change already on disk.
+            fsync (str): One of FSYNC_ALWAYS, FSYNC_BATCH or FSYNC_NONE.
+            fsync_every (int): Pending records that force an fsync in batch mode.
+            fsync_interval (float): Seconds after which batch mode forces an fsync.
+            snapshot_every (Optional[int]): Take a snapshot after this many records, if set.
+
+        Raises:
+            ValueError: If the fsync policy is unknown.
+        """
+        if fsync not in (FSYNC_ALWAYS, FSYNC_BATCH, FSYNC_NONE):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.directory = directory
+        self.store = store
+        self.sequence = sequence
+        self.fsync = fsync
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        # Guards the sequence, the queued frames and the progress counters.
+        # Lock order: store state lock, then this, then _io_lock.
+        self._condition = threading.Condition()
+        # Guards the file; held by the writer while it writes or syncs.
+        self._io_lock = threading.Lock()
+        self._frames: list[bytes] = []
+        # Highest sequence number synced to disk, or covered by a snapshot
+        self._synced = sequence
+        self._force = False
+        self._stopping = False
+        self._stopped = False
+        self._unsynced = 0
+        self._since_snapshot = 0
+        self._last_sync = time.monotonic()
+        # One snapshot at a time; taken before any other lock.
+        self._snapshot_lock = threading.Lock()
+        # Frames written while a snapshot is being taken, kept in the log that replaces the current one
+        self._carried: Optional[list[bytes]] = None
+        # Background thread taking a snapshot_every snapshot, if one is running
+        self._snapshotter: Optional[threading.Thread] = None
+        # Sequence number of the last record each thread queued, for wait()
+        self._local = threading.local()
+        self._file = open(os.path.join(directory, WAL_FILE), "ab")
+        self._writer = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._writer.start()
+        store.subscribe(self._on_change)
+        if fsync == FSYNC_ALWAYS:
+            store.add_ack_hook(self.wait)
+
+    def _on_change(self, event: str, product: Product) -> None:
+        """Store subscriber that turns inventory events into log records."""
+        if event == "bulk":
+            self._append_many([record for changed in product for record in self._state_records(changed)])
+            return
+        name = product.name.encode("utf-8")
+        if event == "quantity":
+            if isinstance(product, NonStockedProduct):
+                return
+            self._append(_OP_QUANTITY, _QUANTITY.pack(product.quantity) + name)
+        elif event == "active":
+            self._append(_OP_ACTIVE, _FLAG.pack(product.is_active()) + name)
+        elif event == "price":
+            self._append(_OP_PRICE, _PRICE.pack(product.price) + name)
+        elif event == "add":
+            self._append(_OP_ADD, encode_product(product))
+        elif event == "remove":
+            self._append(_OP_REMOVE, name)
+
+    @staticmethod
+    def _state_records(product: Product) -> list[tuple[int, bytes]]:
+        """Returns the records restoring a product's quantity, active flag and price."""
+        name = product.name.encode("utf-8")
+        records = [] if isinstance(product, NonStockedProduct) else [
+            (_OP_QUANTITY, _QUANTITY.pack(product.quantity) + name)]
+        records.append((_OP_ACTIVE, _FLAG.pack(product.is_active()) + name))
+        records.append((_OP_PRICE, _PRICE.pack(product.price) + name))
+        return records
+
+    def _append(self, op: int, body: bytes) -> None:
+        """Frames one record and queues it for the writer."""
+        self._append_many([(op, body)])
+
+    def _append_many(self, records: list[tuple[int, bytes]]) -> None:
+        """Frames several records and queues them for the writer, to be written together."""
+        if not records:
+            return
+        with self._condition:
+            for op, body in records:
+                self.sequence += 1
+                payload = _RECORD.pack(self.sequence, op) + body
+                self._frames.append(_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._local.sequence = self.sequence
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        """Writer loop: write what has queued up, sync it as the policy says, repeat until stopped."""
+        try:
+            while True:
+                with self._condition:
+                    while not (self._frames or self._force or self._stopping):
+                        timeout = self.fsync_interval if self.fsync == FSYNC_BATCH and self._unsynced else None
+                        if not self._condition.wait(timeout):
+                            break  # The batch interval passed with records still unsynced
+                    frames, self._frames = self._frames, []
+                    last = self.sequence
+                    force, self._force = self._force, False
+                    stopping = self._stopping
+                synced = self._write(frames, force or stopping)
+                with self._condition:
+                    if synced:
+                        self._synced = max(self._synced, last)
+                    self._since_snapshot += len(frames)
+                    self._condition.notify_all()
+                if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+                    self._start_snapshot()
+                if stopping:
+                    return
+        finally:
+            with self._condition:
+                self._stopped = True
+                self._condition.notify_all()
+
+    def _write(self, frames: list[bytes], force: bool) -> bool:
+        """Writes frames and applies the fsync policy; returns whether everything written is synced."""
+        with self._io_lock:
+            if frames:
+                self._file.write(b"".join(frames))
+                self._unsynced += len(frames)
+                if self._carried is not None:
+                    self._carried.extend(frames)
+            if force or (self.fsync == FSYNC_ALWAYS and frames) or (
+                    self.fsync == FSYNC_BATCH and self._unsynced and (
+                        self._unsynced >= self.fsync_every
+                        or time.monotonic() - self._last_sync >= self.fsync_interval)):
+                self._sync()
+                return True
+            if self.fsync == FSYNC_NONE and self._unsynced >= self.fsync_every:
+                self._file.flush()
+                self._unsynced = 0
+            return False
+
+    def _sync(self) -> None:
+        """Flushes and fsyncs the log. Must be called with the I/O lock held."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def wait(self) -> None:
+        """
+        Blocks until every record the calling thread has queued is synced.
+
+        Registered with the store under the ``always`` policy, so orders wait
+        here after releasing the store's locks; orders waiting together
+        share the writer's next fsync.
+        """
+        target = getattr(self._local, 'sequence', 0)
+        with self._condition:
+            self._condition.wait_for(lambda: self._synced >= target or self._stopped)
+
+    def flush(self) -> None:
+        """Forces every queued record to disk."""
+        with self._condition:
+            target = self.sequence
+            self._force = True
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: self._synced >= target or self._stopped)
+
+    def snapshot(self) -> None:
+        """
+        Writes a snapshot of the whole store and truncates the log behind it.
+
+        Only the start of the snapshot holds the store's state lock: it takes
+        the current inventory version and sequence number, and drops the
+        queued records, which the snapshot covers. Products are then encoded
+        and written without any lock, from their live values. An order still
+        in progress may have numbered records that its published version
+        does not show yet, but the live values do. A value newer than the
+        snapshot's sequence number comes with a newer record, which replay
+        applies on top. Once the snapshot is on disk, the log is replaced by
+        one holding just the records written in the meantime.
+        """
+        with self._snapshot_lock:
+            with self.store.inventory_lock(), self._condition:
+                products = self.store.snapshot()
+                sequence = self.sequence
+                self._frames = []
+                self._since_snapshot = 0
+                with self._io_lock:
+                    self._carried = []
+
+            try:
+                write_snapshot(os.path.join(self.directory, SNAPSHOT_FILE),
+                               (state.product for state in products), sequence)
+            except BaseException:
+                with self._io_lock:
+                    self._carried = None
+                raise
+
+            path = os.path.join(self.directory, WAL_FILE)
+            temporary = f"{path}.tmp"
+            with self._io_lock:
+                carried, self._carried = self._carried, None
+                with open(temporary, "wb") as file:
+                    file.writelines(carried)
+                    file.flush()
+                    os.fsync(file.fileno())
+                self._file.close()
+                os.replace(temporary, path)
+                self._file = open(path, "ab")
+                self._unsynced = 0
+                self._last_sync = time.monotonic()
+            with self._condition:
+                self._synced = max(self._synced, sequence)
+                self._condition.notify_all()
+
+    def _start_snapshot(self) -> None:
+        """Takes a snapshot on a background thread, unless one is already running."""
+        if self._snapshotter is None or not self._snapshotter.is_alive():
+            self._snapshotter = threading.Thread(target=self.snapshot, name="journal-snapshot", daemon=True)
+            self._snapshotter.start()
+
+    def close(self) -> None:
+        """Detaches the journal from the store, then writes and syncs every queued record."""
+        self.store.unsubscribe(self._on_change)
+        if self.fsync == FSYNC_ALWAYS:
+            self.store.remove_ack_hook(self.wait)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._writer.join()
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        with self._io_lock:
+            self._file.close()
+
+
+def replay(products: list[Product], sequence: int, log_path: str) -> int:
+    """
+    Applies the log records newer than ``sequence`` to a product list in place.
+
+    Returns:
+        int: The sequence number of the last record applied.
+    """
+    by_name = {product.name: product for product in products}
+    for record_sequence, op, body in read_log(log_path):
+        if record_sequence <= sequence:
+            continue
+        sequence = record_sequence
+        if op == _OP_ADD:
+            product, _ = decode_product(body)
+            products.append(product)
+            by_name[product.name] = product
+        elif op == _OP_REMOVE:
+            product = by_name.pop(body.decode("utf-8"), None)
+            if product is not None:
+                products.remove(product)
+        elif op == _OP_QUANTITY:
+            (quantity,) = _QUANTITY.unpack_from(body)
+            product = by_name.get(body[_QUANTITY.size:].decode("utf-8"))
+            if product is not None:
+                product.quantity = quantity
+        elif op == _OP_ACTIVE:
+            (active,) = _FLAG.unpack_from(body)
+            product = by_name.get(body[_FLAG.size:].decode("utf-8"))
+            if product is not None:
+                product.active = bool(active)
+        elif op == _OP_PRICE:
+            (price,) = _PRICE.unpack_from(body)
+            product = by_name.get(body[_PRICE.size:].decode("utf-8"))
+            if product is not None:
+                product.price = price
+    return sequence
+
+
+def open_store(directory: str, seed: Iterable[Product] = (), **policy) -> tuple[Store, Journal]:
+    """
+    Opens a durable store, creating it from ``seed`` if the directory is empty.
+
+    The latest snapshot is memory-mapped and only the log written after it
+    is replayed. Keyword arguments are passed on to Journal.
+
+    Returns:
+        The store and the journal recording its changes.
+    """
+    os.makedirs(directory, exist_ok=True)
+    snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+    if os.path.exists(snapshot_path):
+        products, sequence = read_snapshot(snapshot_path)
+        sequence = replay(products, sequence, os.path.join(directory, WAL_FILE))
+    else:
+        products, sequence = list(seed), 0
+
+    store = Store(products)
+    journal = Journal(directory, store, sequence, **policy)
+    # Start from a clean snapshot so the next restart replays nothing old.
+    journal.snapshot()
+    return store, journal
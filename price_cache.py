@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Default number of (promotion, unit price) tables kept, and quantities per table.
+MAX_ENTRIES = 4096
+TABLE_SIZE = 16
+
+
+class PriceCache:
+    """
+    Bounded LRU cache of promotion price tables.
+
+    Each entry maps a (promotion, promotion parameters, unit price) key to
+    the totals for quantities 1..table_size, computed in one call to
+    apply_promotion_batch, so the cached prices are exactly what
+    apply_promotion returns. Larger quantities are priced directly and
+    counted as misses.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, table_size: int = TABLE_SIZE):
+        """
+        Initializes an empty cache.
+
+        Raises:
+            ValueError: If max_entries or table_size is not positive.
+        """
+        self._lock = threading.Lock()
+        self._tables: OrderedDict[tuple, list[float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.configure(max_entries, table_size)
+
+    def configure(self, max_entries: int, table_size: int) -> None:
+        """
+        Resizes the cache. Changing the table size drops every entry.
+
+        Raises:
+            ValueError: If max_entries or table_size is not positive.
+        """
+        if max_entries <= 0 or table_size <= 0:
+            raise ValueError("Cache sizes must be greater than zero.")
+        with self._lock:
+            if getattr(self, 'table_size', table_size) != table_size:
+                self._tables.clear()
+            self.max_entries = max_entries
+            self.table_size = table_size
+            while len(self._tables) > max_entries:
+                self._tables.popitem(last=False)
+
+    def price(self, promotion: 'Promotion', product: 'Product', quantity: int) -> float:
+        """
+        Returns promotion.apply_promotion(product, quantity), from the cache when possible.
+
+        Promotions that are not marked cacheable are always priced directly.
+        """
+        if not promotion.cacheable:
+            return promotion.apply_promotion(product, quantity)
+
+        key = (promotion, promotion.parameters(), product.price)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None and 0 < quantity <= len(table):
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return table[quantity - 1]
+            self.misses += 1
+
+        if table is None:
+            size = self.table_size
+            table = promotion.apply_promotion_batch([product.price] * size, range(1, size + 1))
+            with self._lock:
+                self._tables[key] = table
+                if len(self._tables) > self.max_entries:
+                    self._tables.popitem(last=False)
+        if 0 < quantity <= len(table):
+            return table[quantity - 1]
+        return promotion.apply_promotion(product, quantity)
+
+    def discard(self, promotion: Optional['Promotion'], price: float) -> None:
+        """Drops the table for a promotion at a unit price, if cached."""
+        if promotion is None or not promotion.cacheable:
+            return
+        with self._lock:
+            self._tables.pop((promotion, promotion.parameters(), price), None)
+
+    def discard_many(self, keys) -> None:
+        """Drops the tables for many (promotion, unit price) pairs under a single lock acquisition."""
+        keys = [(promotion, promotion.parameters(), price)
+                for promotion, price in keys if promotion is not None and promotion.cacheable]
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._tables.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._tables.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counters and the current number of entries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._tables),
+                'max_entries': self.max_entries,
+                'table_size': self.table_size,
+            }
+
+
+# Process-wide cache used by Product.price_for.
+PRICE_CACHE = PriceCache()
+
+
+def configure(max_entries: int = MAX_ENTRIES, table_size: int = TABLE_SIZE) -> None:
+    """Resizes the process-wide price cache."""
+    PRICE_CACHE.configure(max_entries, table_size)
@@ -0,0 +1,312 @@
+from array import array
+from itertools import compress
+from typing import Iterable, Iterator, Optional
+
+from price_cache import PRICE_CACHE
+from products import Product, NonStockedProduct, LimitedProduct, UNLIMITED
+
+# Values of the ``kinds`` column.
+STOCKED = 0
+NON_STOCKED = 1
+LIMITED = 2
+
+
+class ProductTable:
+    """
+    Columnar inventory storage.
+
+    Each product is a row spread over contiguous typed arrays instead of a
+    Python object with its own ``__dict__``. Non-stocked rows store a
+    quantity of zero so the quantity column stays integral and can be
+    summed directly; removed rows are tombstoned (``names[row] is None``)
+    so row numbers stay stable.
+    """
+
+    def __init__(self):
+        """Initializes an empty table."""
+        self.names: list[Optional[str]] = []
+        self.prices = array('d')
+        # Whether each price was given as an int, so views return it as one like the Product did
+        self.int_prices = array('b')
+        self.quantities = array('q')
+        self.active = array('b')
+        self.kinds = array('b')
+        self.maximums = array('q')
+        # Promotions are sparse, so only rows that have one are stored.
+        self.promotions: dict[int, 'Promotion'] = {}
+        self._rows: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Returns the number of live rows."""
+        return len(self._rows)
+
+    def append(self, name: str, price: float, quantity: int, kind: int = STOCKED,
+               maximum: int = 0, promotion: Optional['Promotion'] = None) -> int:
+        """
+        Appends a row, applying the same validation as the Product classes.
+
+        Returns:
+            int: The new row number.
+
+        Raises:
+            ValueError: If the details are invalid or the name is already in the table.
+        """
+        if kind == NON_STOCKED:
+            quantity = 0
+        if not name or price < 0 or quantity < 0:
+            raise ValueError("Invalid product details.")
+        if kind == LIMITED and maximum <= 0:
+            raise ValueError("Maximum purchase limit must be greater than zero.")
+        if name in self._rows:
+            raise ValueError(f"Product {name} is already in the table.")
+
+        row = len(self.names)
+        self.names.append(name)
+        self.prices.append(price)
+        self.int_prices.append(isinstance(price, int))
+        self.quantities.append(quantity)
+        self.active.append(kind == NON_STOCKED or quantity > 0)
+        self.kinds.append(kind)
+        self.maximums.append(maximum if kind == LIMITED else 0)
+        if promotion is not None:
+            self.promotions[row] = promotion
+        self._rows[name] = row
+        return row
+
+    def append_product(self, product: Product) -> int:
+        """Copies a Product object into a new row and returns the row number."""
+        if isinstance(product, NonStockedProduct):
+            kind, quantity, maximum = NON_STOCKED, 0, 0
+        elif isinstance(product, LimitedProduct):
+            kind, quantity, maximum = LIMITED, product.quantity, product.maximum
+        else:
+            kind, quantity, maximum = STOCKED, product.quantity, 0
+        row = self.append(product.name, product.price, quantity, kind, maximum, product.promotion)
+        self.active[row] = product.is_active()
+        return row
+
+    def remove(self, row: int) -> None:
+        """Tombstones a row."""
+        name = self.names[row]
+        if name is None:
+            return
+        del self._rows[name]
+        self.names[row] = None
+        self.quantities[row] = 0
+        self.active[row] = False
+        self.promotions.pop(row, None)
+
+    def find(self, name: str) -> Optional[int]:
+        """Returns the row number for a product name, or None."""
+        return self._rows.get(name)
+
+    def live_rows(self) -> Iterator[int]:
+        """Yields the row numbers of all live rows, in insertion order."""
+        return iter(self._rows.values())
+
+    def active_rows(self) -> Iterator[int]:
+        """Yields the row numbers of all active rows, in insertion order."""
+        return compress(range(len(self.active)), self.active)
+
+    def total_quantity(self) -> int:
+        """Returns the total quantity of all active stockable rows."""
+        # Non-stocked and removed rows hold zero, so only the active mask is needed.
+        return sum(compress(self.quantities, self.active))
+
+    def buy(self, row: int, quantity: int) -> float:
+        """
+        Buys a quantity from a row, mirroring the rules of the Product classes.
+
+        Returns:
+            float: Total price after promotion.
+
+        Raises:
+            ValueError: If quantity is invalid, exceeds the limit or exceeds stock.
+        """
+        kind = self.kinds[row]
+        if kind == LIMITED and quantity > self.maximums[row]:
+            raise ValueError("Cannot purchase more than the maximum allowed quantity.")
+        if quantity <= 0:
+            raise ValueError("Quantity to buy should be greater than zero.")
+        if kind != NON_STOCKED and quantity > self.quantities[row]:
+            raise ValueError("Not enough quantity available.")
+
+        promotion = self.promotions.get(row)
+        total_price = PRICE_CACHE.price(promotion, ProductView(self, row), quantity) \
+            if promotion else self.prices[row] * quantity
+
+        if kind != NON_STOCKED:
+            self.quantities[row] -= quantity
+            if self.quantities[row] == 0:
+                self.active[row] = False
+        return total_price
+
+
+class ProductView:
+    """
+    A lightweight, on-demand view of one table row that exposes the Product API.
+    """
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: ProductTable, row: int):
+        """Initializes a view over the given row."""
+        self._table = table
+        self._row = row
+
+    def __eq__(self, other) -> bool:
+        """Views are equal when they point at the same row of the same table."""
+        return isinstance(other, ProductView) and other._table is self._table and other._row == self._row
+
+    def __hash__(self) -> int:
+        """Hashes on table identity and row."""
+        return hash((id(self._table), self._row))
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._row]
+
+    @property
+    def price(self) -> float:
+        price = self._table.prices[self._row]
+        return int(price) if self._table.int_prices[self._row] else price
+
+    @property
+    def quantity(self):
+        if self._table.kinds[self._row] == NON_STOCKED:
+            return UNLIMITED
+        return self._table.quantities[self._row]
+
+    @property
+    def maximum(self) -> Optional[int]:
+        if self._table.kinds[self._row] != LIMITED:
+            return None
+        return self._table.maximums[self._row]
+
+    @property
+    def promotion(self) -> Optional['Promotion']:
+        return self._table.promotions.get(self._row)
+
+    def get_quantity(self):
+        """Returns the product quantity."""
+        return self.quantity
+
+    def set_quantity(self, quantity: int) -> None:
+        """Sets product quantity and deactivates if zero or negative."""
+        if self._table.kinds[self._row] == NON_STOCKED:
+            return
+        self._table.quantities[self._row] = quantity
+        if quantity <= 0:
+            self.deactivate()
+
+    def is_active(self) -> bool:
+        """Returns whether the product is active."""
+        return bool(self._table.active[self._row])
+
+    def activate(self) -> None:
+        """Activates the product."""
+        self._table.active[self._row] = True
+
+    def deactivate(self) -> None:
+        """Deactivates the product."""
+        self._table.active[self._row] = False
+
+    def get_promotion(self) -> Optional['Promotion']:
+        """Returns the applied promotion, if any."""
+        return self.promotion
+
+    def set_promotion(self, promotion: Optional['Promotion']) -> None:
+        """Sets a promotion for the product."""
+        if promotion is None:
+            self._table.promotions.pop(self._row, None)
+        else:
+            self._table.promotions[self._row] = promotion
+
+    def show(self) -> str:
+        """Returns the same string representation as the matching Product class."""
+        promotion = self.promotion
+        promotion_info = f"Promotion: {promotion}" if promotion else "No promotion"
+        text = (f"{self.name}, Price: {self.price}, "
+                f"Quantity: {self.quantity}, {promotion_info}")
+        kind = self._table.kinds[self._row]
+        if kind == NON_STOCKED:
+            text = f"{text}, Unlimited stock"
+        elif kind == LIMITED:
+            text = f"{text}, Max purchase limit: {self.maximum}"
+        return text
+
+    def buy(self, quantity: int) -> float:
+        """Buys a specified quantity, applying the promotion if any."""
+        return self._table.buy(self._row, quantity)
+
+
+class TableStore:
+    """
+    A Store backed by a ProductTable, for catalogs too large for one object per SKU.
+
+    It exposes the same API as ``store.Store``; products handed out are
+    ProductView objects created on demand.
+    """
+
+    def __init__(self, product_list: Iterable[Product] = ()):
+        """Initializes a TableStore, copying the given products into columns."""
+        self.table = ProductTable()
+        for product in product_list:
+            self.add_product(product)
+
+    def add_product(self, product: Product):
+        """Adds a product to the store's inventory."""
+        self.table.append_product(product)
+
+    def remove_product(self, product):
+        """Removes the product with the same name from the store's inventory."""
+        row = self.table.find(product.name)
+        if row is not None:
+            self.table.remove(row)
+
+    def get_product(self, name: str) -> Optional[ProductView]:
+        """Returns a view of the active product with the given name, or None."""
+        row = self.table.find(name)
+        if row is None or not self.table.active[row]:
+            return None
+        return ProductView(self.table, row)
+
+    def get_total_quantity(self) -> int:
+        """Returns the total quantity of all active stockable products."""
+        return self.table.total_quantity()
+
+    def get_all_active_products(self) -> list[ProductView]:
+        """Returns views of all active products in the store."""
+        return [ProductView(self.table, row) for row in self.table.active_rows()]
+
+    def get_all_products(self) -> list[ProductView]:
+        """Returns views of all products, active or inactive, in the store."""
+        return [ProductView(self.table, row) for row in self.table.live_rows()]
+
+    def order(self, shopping_list: list[tuple[Product, int]]) -> float:
+        """Processes an order and returns the total price.
+
+        Args:
+            shopping_list: A list of tuples, where each tuple contains a product and its quantity.
+
+        Returns:
+            The total price of the order.
+        """
+        table = self.table
+        total_price = 0.0
+        for requested_product, quantity in shopping_list:
+            row = table.find(requested_product.name)
+
+            if row is None or not table.active[row]:
+                print(f"Product {requested_product.name} is not available.")
+                continue
+
+            if quantity <= 0:
+                print(f"Invalid quantity for {requested_product.name}.")
+                continue
+
+            try:
+                total_price += table.buy(row, quantity)
+            except ValueError as e:
+                print(f"Error with product {requested_product.name}: {e}")
+
+        return total_price
@@ -1,7 +1,29 @@
-from typing import Optional
+import sys
+from time import perf_counter
+from typing import Callable, Optional
+
+import metrics
+from price_cache import PRICE_CACHE
+
+
+class _UnlimitedQuantity(int):
+    """Integer sentinel for the stock of products that are not tracked."""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return 'UNLIMITED'
+
+    __str__ = __repr__
+
+
+# Quantity of a NonStockedProduct. It is an int larger than any real stock
+# level, so quantities stay integers and comparisons need no special case.
+UNLIMITED = _UnlimitedQuantity(sys.maxsize)
 
 
 class Product:
+    __slots__ = ('name', 'price', 'quantity', 'active', 'promotion', 'version', '_listeners', '_rendered')
+
     def __init__(self, name: str, price: float, quantity: int, promotion: Optional['Promotion'] = None):
         """
         Initializes a Product with name, price, quantity, and promotion.
@@ -23,6 +45,34 @@ class Product:
         self.quantity = quantity
         self.active = quantity > 0
         self.promotion = promotion
+        # Incremented on every change notified through this API; lets callers
+        # such as the quote cache tell whether a product changed since they read it.
+        self.version = 0
+        # A tuple, replaced on change, keeps unobserved products small and
+        # lets notifications iterate without copying.
+        self._listeners: tuple[Callable[['Product', str], None], ...] = ()
+        # Cached show() output, cleared whenever a change is notified.
+        self._rendered: Optional[str] = None
+
+    def add_listener(self, listener: Callable[['Product', str], None]) -> None:
+        """
+        Registers a callback invoked as listener(product, attribute) after
+        the quantity, active flag, price or promotion changes through this API.
+        """
+        self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener: Callable[['Product', str], None]) -> None:
+        """Unregisters a callback previously passed to add_listener."""
+        listeners = list(self._listeners)
+        listeners.remove(listener)
+        self._listeners = tuple(listeners)
+
+    def _notify(self, attribute: str) -> None:
+        """Tells every listener that the given attribute has changed."""
+        self.version += 1
+        self._rendered = None
+        for listener in self._listeners:
+            listener(self, attribute)
 
     def get_quantity(self) -> int:
         """Returns the product quantity."""
@@ -31,6 +81,7 @@ class Product:
     def set_quantity(self, quantity: int) -> None:
         """Sets product quantity and deactivates if zero or negative."""
         self.quantity = quantity
+        self._notify('quantity')
         if self.quantity <= 0:
             self.deactivate()
 
@@ -40,11 +91,15 @@ class Product:
 
     def activate(self) -> None:
         """Activates the product."""
-        self.active = True
+        if not self.active:
+            self.active = True
+            self._notify('active')
 
     def deactivate(self) -> None:
         """Deactivates the product."""
-        self.active = False
+        if self.active:
+            self.active = False
+            self._notify('active')
 
     def get_promotion(self) -> Optional['Promotion']:
         """Returns the applied promotion, if any."""
@@ -52,15 +107,82 @@ class Product:
 
     def set_promotion(self, promotion: Optional['Promotion']) -> None:
         """Sets a promotion for the product."""
+        PRICE_CACHE.discard(self.promotion, self.price)
+        self.promotion = promotion
+        self._notify('promotion')
+
+    def set_price(self, price: float) -> None:
+        """
+        Sets the product price.
+
+        Raises:
+            ValueError: If price is negative.
+        """
+        if price < 0:
+            raise ValueError("Price cannot be negative.")
+        PRICE_CACHE.discard(self.promotion, self.price)
+        self.price = price
+        self._notify('price')
+
+    def _apply_update(self, quantity: int, price: float, promotion: Optional['Promotion']) -> None:
+        """
+        Sets quantity, price and promotion at once without notifying listeners.
+
+        Used by Store.bulk_update, which validates the values beforehand and
+        publishes a single event for the whole batch. A change of quantity
+        reactivates a product with stock and deactivates one without.
+        """
+        if quantity != self.quantity:
+            self.quantity = quantity
+            self.active = quantity > 0
+        self.price = price
         self.promotion = promotion
+        self.version += 1
+        self._rendered = None
 
     def show(self) -> str:
-        """Returns a string representation of the product."""
+        """Returns a string representation of the product, cached until its quantity, price or promotion changes."""
+        rendered = self._rendered
+        if rendered is None:
+            rendered = self._rendered = self._render()
+        return rendered
+
+    def _render(self) -> str:
+        """Builds the string representation of the product."""
         promotion_info = f"Promotion: {self.promotion}" \
             if self.promotion else "No promotion"
         return (f"{self.name}, Price: {self.price}, "
                 f"Quantity: {self.quantity}, {promotion_info}")
 
+    def price_for(self, quantity: int) -> float:
+        """
+        Prices a specified quantity, applying the promotion if any, without touching stock.
+
+        Args:
+            quantity (int): Quantity to price.
+
+        Returns:
+            float: Total price after promotion.
+
+        Raises:
+            ValueError: If quantity is not greater than zero.
+        """
+        if quantity <= 0:
+            raise ValueError("Quantity to buy should be greater than zero.")
+
+        # Apply promotion if any, otherwise calculate regular price
+        if not self.promotion:
+            return self.price * quantity
+
+        registry = metrics.REGISTRY
+        if registry is None:
+            return PRICE_CACHE.price(self.promotion, self, quantity)
+        started = perf_counter()
+        total_price = PRICE_CACHE.price(self.promotion, self, quantity)
+        registry.observe('apply_promotion', perf_counter() - started)
+        registry.inc('promotion_applications_total', promotion=str(self.promotion))
+        return total_price
+
     def buy(self, quantity: int) -> float:
         """
         Buys a specified quantity, applying the promotion if any.
@@ -79,9 +201,7 @@ class Product:
         if quantity > self.quantity:
             raise ValueError("Not enough quantity available.")
 
-        # Apply promotion if any, otherwise calculate regular price
-        total_price = self.promotion.apply_promotion(self, quantity) \
-            if self.promotion else self.price * quantity
+        total_price = self.price_for(quantity)
 
         # Decrement stock and deactivate if stock hits zero
         self.set_quantity(self.quantity - quantity)
@@ -95,12 +215,13 @@ class NonStockedProduct(Product):
     """
     Represents a product with zero quantity that cannot be tracked.
     """
+    __slots__ = ()
 
     def __init__(self, name: str, price: float):
         """
         Initializes a NonStockedProduct with name and price.
         """
-        super().__init__(name, price, quantity=float('inf'))
+        super().__init__(name, price, quantity=UNLIMITED)
 
     def set_quantity(self, quantity: int):
         """
@@ -119,17 +240,11 @@ class NonStockedProduct(Product):
         Raises:
             ValueError: If the quantity is less than or equal to zero.
         """
-        if quantity <= 0:
-            raise ValueError("Quantity to buy should be greater than zero.")
+        return self.price_for(quantity)
 
-        total_price = self.promotion.apply_promotion(self, quantity) \
-            if self.promotion else self.price * quantity
-
-        return total_price
-
-    def show(self) -> str:
-        """Returns a string representation of the non-stocked product."""
-        base_info = super().show()
+    def _render(self) -> str:
+        """Builds the string representation of the non-stocked product."""
+        base_info = super()._render()
         return f"{base_info}, Unlimited stock"
 
 
@@ -137,6 +252,7 @@ class LimitedProduct(Product):
     """
     Represents a product with a maximum purchase limit.
     """
+    __slots__ = ('maximum',)
 
     def __init__(self, name: str, price: float, quantity: int, maximum: int):
         """
@@ -156,6 +272,17 @@ class LimitedProduct(Product):
             raise ValueError("Maximum purchase limit must be greater than zero.")
         self.maximum = maximum
 
+    def price_for(self, quantity: int) -> float:
+        """
+        Prices a specified quantity, respecting the max limit.
+
+        Raises:
+            ValueError: If quantity exceeds the maximum limit.
+        """
+        if quantity > self.maximum:
+            raise ValueError("Cannot purchase more than the maximum allowed quantity.")
+        return super().price_for(quantity)
+
     def buy(self, quantity: int) -> float:
         """
         Buys a specified quantity, respecting the max limit.
@@ -170,7 +297,7 @@ class LimitedProduct(Product):
             raise ValueError("Cannot purchase more than the maximum allowed quantity.")
         return super().buy(quantity)
 
-    def show(self) -> str:
-        """Returns a string representation of the limited product."""
-        base_info = super().show()
+    def _render(self) -> str:
+        """Builds the string representation of the limited product."""
+        base_info = super()._render()
         return f"{base_info}, Max purchase limit: {self.maximum}"
@@ -0,0 +1,233 @@
+"""
+Time-windowed promotions, switched on and off by a timer heap.
+
+A PromotionScheduler holds promotions scheduled for a product between a
+start and an optional end time. Each window adds at most two transitions
+to a min-heap keyed on time: the start, and then the end once the window
+has started. Applying the transitions that are due pops them off the heap,
+so each activation or expiry costs O(log n) in the number of scheduled
+windows. Nothing is scanned per tick or per purchase.
+
+Transitions call Product.set_promotion, so stores, caches and change
+feeds see them like any other promotion change. When windows overlap on
+one product, the most recently started one wins. When it ends, the
+product falls back to the next active window, or else to the promotion
+it had before its first window started. A promotion set by hand while a
+window is active becomes that fallback.
+
+Time comes from an injectable clock, time.time by default, so tests can
+drive the scheduler with a fake one. Call run_pending from an existing
+loop, or start() a background thread that sleeps until the next
+transition is due.
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+
+from products import Product
+
+# Window states.
+PENDING = 'pending'
+ACTIVE = 'active'
+ENDED = 'ended'
+CANCELLED = 'cancelled'
+
+
+class ScheduledPromotion:
+    """A promotion scheduled for one product; returned by PromotionScheduler.schedule."""
+    __slots__ = ('product', 'promotion', 'start', 'end', 'state')
+
+    def __init__(self, product: Product, promotion: 'Promotion', start: float, end: Optional[float]):
+        self.product = product
+        self.promotion = promotion
+        self.start = start
+        self.end = end
+        self.state = PENDING
+
+    def __repr__(self) -> str:
+        return (f"ScheduledPromotion({self.product.name!r}, {str(self.promotion)!r}, "
+                f"start={self.start}, end={self.end}, state={self.state!r})")
+
+
+class _ProductWindows:
+    """The active windows of one product, and what it falls back to once they end."""
+    __slots__ = ('fallback', 'active', 'applied')
+
+    def __init__(self, fallback: Optional['Promotion']):
+        self.fallback = fallback
+        self.active: list[ScheduledPromotion] = []
+        # The promotion the scheduler last set, to notice changes made by hand
+        self.applied = fallback
+
+
+class PromotionScheduler:
+    """Applies and expires scheduled promotions as their times come due."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Initializes an empty scheduler.
+
+        Args:
+            clock: Returns the current time, in seconds, on the same scale as
+                the scheduled start and end times.
+        """
+        self.clock = clock
+        self._condition = threading.Condition()
+        # (time, sequence, window, starting); entries of cancelled windows are
+        # skipped when they reach the top.
+        self._heap: list[tuple[float, int, ScheduledPromotion, bool]] = []
+        self._sequence = itertools.count()
+        self._products: dict[int, _ProductWindows] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def schedule(self, product: Product, promotion: 'Promotion', start: float,
+                 end: Optional[float] = None) -> ScheduledPromotion:
+        """
+        Schedules a promotion for a product.
+
+        Args:
+            product (Product): The product to promote.
+            promotion (Promotion): The promotion to apply while the window is open.
+            start (float): When the promotion starts.
+            end (Optional[float]): When it ends; never when None.
+
+        Returns:
+            ScheduledPromotion: A handle for cancel.
+
+        Raises:
+            ValueError: If the end is not after the start.
+        """
+        if end is not None and end <= start:
+            raise ValueError("Promotion end must be after its start.")
+        window = ScheduledPromotion(product, promotion, start, end)
+        with self._condition:
+            self._push(start, window, True)
+        return window
+
+    def cancel(self, window: ScheduledPromotion) -> None:
+        """Cancels a window; an active one ends immediately."""
+        with self._condition:
+            if window.state == PENDING:
+                window.state = CANCELLED
+            elif window.state == ACTIVE:
+                self._end(window)
+                window.state = CANCELLED
+
+    def next_transition(self) -> Optional[float]:
+        """Returns the time of the next start or end, or None if nothing is scheduled."""
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def run_pending(self) -> int:
+        """
+        Applies every transition due by the clock's current time, in time order.
+
+        Returns:
+            int: The number of windows started or ended.
+        """
+        with self._condition:
+            now = self.clock()
+            applied = 0
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                _, _, window, starting = heapq.heappop(heap)
+                if starting and window.state == PENDING:
+                    if window.end is not None and window.end <= now:
+                        # The whole window has passed; never apply it
+                        window.state = ENDED
+                        continue
+                    self._start(window)
+                    applied += 1
+                elif not starting and window.state == ACTIVE:
+                    self._end(window)
+                    applied += 1
+            return applied
+
+    def _push(self, when: float, window: ScheduledPromotion, starting: bool) -> None:
+        """Adds a transition; the caller holds the condition."""
+        heapq.heappush(self._heap, (when, next(self._sequence), window, starting))
+        if self._heap[0][2] is window:
+            # Earlier than whatever the worker is sleeping towards
+            self._condition.notify()
+
+    def _discard_stale(self) -> None:
+        """Pops transitions of cancelled windows off the top of the heap."""
+        heap = self._heap
+        while heap and heap[0][2].state == CANCELLED:
+            heapq.heappop(heap)
+
+    def _windows(self, product: Product) -> _ProductWindows:
+        """Returns the state of a product, treating a promotion set by hand as its new fallback."""
+        windows = self._products.get(id(product))
+        if windows is None:
+            windows = self._products[id(product)] = _ProductWindows(product.promotion)
+        elif product.promotion is not windows.applied:
+            windows.fallback = product.promotion
+        return windows
+
+    def _start(self, window: ScheduledPromotion) -> None:
+        windows = self._windows(window.product)
+        windows.active.append(window)
+        window.state = ACTIVE
+        if window.end is not None:
+            self._push(window.end, window, False)
+        self._apply(window.product, windows)
+
+    def _end(self, window: ScheduledPromotion) -> None:
+        windows = self._windows(window.product)
+        windows.active.remove(window)
+        window.state = ENDED
+        self._apply(window.product, windows)
+
+    def _apply(self, product: Product, windows: _ProductWindows) -> None:
+        """Gives a product the promotion of its latest active window, or its fallback."""
+        promotion = windows.active[-1].promotion if windows.active else windows.fallback
+        if product.promotion is not promotion:
+            product.set_promotion(promotion)
+        windows.applied = promotion
+        if not windows.active:
+            del self._products[id(product)]
+
+    def start(self) -> None:
+        """Starts a background thread that runs transitions as they come due."""
+        with self._condition:
+            if self._worker is not None:
+                raise RuntimeError("The promotion scheduler is already running.")
+            self._stopping = False
+            self._worker = threading.Thread(target=self._run, name="promotion-scheduler", daemon=True)
+            self._worker.start()
+
+    def stop(self) -> None:
+        """Stops the background thread, if running."""
+        with self._condition:
+            worker = self._worker
+            self._stopping = True
+            self._condition.notify()
+        if worker is not None:
+            worker.join()
+            self._worker = None
+
+    def __enter__(self) -> 'PromotionScheduler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        """Worker loop: sleep until the next transition, apply what is due, repeat."""
+        while True:
+            self.run_pending()
+            with self._condition:
+                if self._stopping:
+                    return
+                self._discard_stale()
+                timeout = self._heap[0][0] - self.clock() if self._heap else None
+                if timeout is None or timeout > 0:
+                    self._condition.wait(timeout)
+                if self._stopping:
+                    return
@@ -1,21 +1,91 @@
 from abc import ABC, abstractmethod
+from operator import mul
+from typing import Sequence
+
 from products import Product
 
 
+class _PricedItem:
+    """Minimal stand-in for a Product, carrying only the price a promotion reads."""
+    __slots__ = ('price',)
+
+    def __init__(self, price: float):
+        self.price = price
+
+
+def _check_batch(prices: Sequence[float], quantities: Sequence[int]) -> None:
+    """Validates a batch of prices and quantities before pricing it."""
+    if len(prices) != len(quantities):
+        raise ValueError("Prices and quantities must have the same length.")
+    if quantities and min(quantities) <= 0:
+        raise ValueError("Quantity must be greater than zero.")
+
+
+# Instances handed out by Promotion.shared, keyed on class and arguments.
+_SHARED_PROMOTIONS: dict[tuple, 'Promotion'] = {}
+
+
 class Promotion(ABC):
     """
     Abstract base class for promotions.
     Each promotion must implement the apply_promotion method.
     """
+    __slots__ = ('name',)
+
+    # Whether prices depend only on unit price and quantity, so they may be
+    # served from the price cache.
+    cacheable = False
+
     def __init__(self, name: str):
         """Initializes the promotion with a name."""
         self.name = name
 
+    def parameters(self) -> tuple:
+        """Returns the values that determine this promotion's prices; part of the price cache key."""
+        return ()
+
+    @classmethod
+    def shared(cls, *args, **kwargs) -> 'Promotion':
+        """
+        Returns a process-wide shared instance for the given arguments,
+        creating it on first use. Promotions are immutable, so one instance
+        can be assigned to any number of products.
+        """
+        key = (cls, args, tuple(sorted(kwargs.items())))
+        promotion = _SHARED_PROMOTIONS.get(key)
+        if promotion is None:
+            promotion = _SHARED_PROMOTIONS.setdefault(key, cls(*args, **kwargs))
+        return promotion
+
     @abstractmethod
     def apply_promotion(self, product: Product, quantity: int) -> float:
         """Apply the promotion and return the discounted total price."""
         pass
 
+    def apply_promotion_batch(self, prices: Sequence[float], quantities: Sequence[int]) -> list[float]:
+        """
+        Prices many (unit price, quantity) pairs at once.
+
+        Subclasses override this with a closed-form implementation; the
+        default falls back to apply_promotion row by row. The overrides are
+        plain Python: they save the per-row method call and Product lookup,
+        which makes them roughly 1.5x faster than calling apply_promotion in
+        a loop (see benchmarks/bench_batch_pricing.py), not vectorized.
+
+        Args:
+            prices (Sequence[float]): Unit prices.
+            quantities (Sequence[int]): Quantities, one per price.
+
+        Returns:
+            list[float]: Totals identical to the scalar apply_promotion results.
+
+        Raises:
+            ValueError: If the lengths differ or any quantity is not greater than zero.
+        """
+        _check_batch(prices, quantities)
+        return [self.apply_promotion(_PricedItem(price), quantity)
+                for price, quantity in zip(prices, quantities)]
+
     def __str__(self) -> str:
         """Returns the name of the promotion."""
         return self.name
@@ -25,6 +95,10 @@ class PercentageDiscount(Promotion):
     """
     Applies a percentage discount to the total price of a product.
     """
+    __slots__ = ('percent',)
+
+    cacheable = True
+
     def __init__(self, name: str, percent: float):
         """
         Initializes a PercentageDiscount with a name and discount percentage.
@@ -36,6 +110,10 @@ class PercentageDiscount(Promotion):
         super().__init__(name)
         self.percent = percent
 
+    def parameters(self) -> tuple:
+        """Returns the discount percentage."""
+        return (self.percent,)
+
     def apply_promotion(self, product: Product, quantity: int) -> float:
         """
         Applies a percentage discount to the total price.
@@ -56,11 +134,22 @@ class PercentageDiscount(Promotion):
         discount = total_price * (self.percent / 100)
         return total_price - discount
 
+    def apply_promotion_batch(self, prices: Sequence[float], quantities: Sequence[int]) -> list[float]:
+        """Applies the percentage discount to every (price, quantity) pair."""
+        _check_batch(prices, quantities)
+        rate = self.percent / 100
+        # Same operation order as apply_promotion, so results are bit-identical.
+        return [total - total * rate for total in map(mul, prices, quantities)]
+
 
 class SecondItemHalfPrice(Promotion):
     """
     Applies a promotion where every second item is sold at half price.
     """
+    __slots__ = ()
+
+    cacheable = True
+
     def __init__(self, name: str):
         """
         Initializes a SecondItemHalfPrice promotion.
@@ -93,12 +182,23 @@ class SecondItemHalfPrice(Promotion):
         full_price_items = quantity - half_price_items
         return (full_price_items * product.price) + (half_price_items * (product.price / 2))
 
+    def apply_promotion_batch(self, prices: Sequence[float], quantities: Sequence[int]) -> list[float]:
+        """Applies the second-item-half-price promotion to every (price, quantity) pair."""
+        _check_batch(prices, quantities)
+        return [price * quantity if quantity < 2
+                else ((quantity - quantity // 2) * price) + ((quantity // 2) * (price / 2))
+                for price, quantity in zip(prices, quantities)]
+
 
 class Buy2Get1Free(Promotion):
     """
     Applies a buy-2-get-1-free promotion to the total price.
     For every 2 items, 1 item is free.
     """
+    __slots__ = ()
+
+    cacheable = True
+
     def __init__(self, name: str):
         """
         Initializes a Buy2Get1Free promotion.
@@ -129,4 +229,11 @@ class Buy2Get1Free(Promotion):
         # Calculate the number of full-price items
         full_price_items = (2 * (quantity // 3)) + (quantity % 3)
 
-        return full_price_items * product.price
\ No newline at end of file
+        return full_price_items * product.price
+
+    def apply_promotion_batch(self, prices: Sequence[float], quantities: Sequence[int]) -> list[float]:
+        """Applies the buy-2-get-1-free promotion to every (price, quantity) pair."""
+        _check_batch(prices, quantities)
+        # Quantities repeat, so work out the paid units once per distinct quantity
+        paid_units = {quantity: (2 * (quantity // 3)) + (quantity % 3) for quantity in set(quantities)}
+        return list(map(mul, map(paid_units.__getitem__, quantities), prices))
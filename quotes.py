@@ -0,0 +1,123 @@
+"""
+Read-only price quotes for shopping lists, and a cache to reuse them.
+
+A quote prices a shopping list exactly as Store.place_order would, with
+the same per-line errors, but leaves stock untouched. It also records
+what it was computed from:
+
+* the product each name resolved to, and that product's version;
+* the cart promotion engine and its version.
+
+A cached quote stays valid while none of those has changed. A storefront
+can therefore re-price the same cart cheaply, and Store.checkout can
+commit a valid quote without pricing the cart again.
+"""
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from products import Product
+
+# Default number of quotes kept by a QuoteCache.
+MAX_QUOTES = 1024
+
+
+class QuoteLine(NamedTuple):
+    """One priced line: the price is 0.0 and error says why when the line cannot be sold."""
+    name: str
+    quantity: int
+    price: float
+    error: Optional[str]
+
+    @property
+    def available(self) -> bool:
+        """Whether the line can be sold as quoted."""
+        return self.error is None
+
+
+class Quote(NamedTuple):
+    """
+    A priced shopping list.
+
+    Attributes:
+        lines: One QuoteLine per shopping list line, in order.
+        total: Total of the sellable lines, after cart promotions.
+        basis: (name, product or None, product version) for every line, as read when pricing.
+        rules: (cart promotion engine or None, its version) as read when pricing.
+    """
+    lines: tuple[QuoteLine, ...]
+    total: float
+    basis: tuple[tuple[str, Optional[Product], int], ...]
+    rules: tuple[object, int]
+
+    @property
+    def errors(self) -> list[str]:
+        """Returns the messages of the lines that cannot be sold."""
+        return [line.error for line in self.lines if line.error is not None]
+
+
+class QuoteCache:
+    """
+    Bounded LRU cache of quotes keyed on shopping list contents.
+
+    The cache does not judge validity; Store.quote checks a cached quote
+    against the current products before using it.
+    """
+
+    def __init__(self, max_entries: int = MAX_QUOTES):
+        """
+        Initializes an empty cache.
+
+        Raises:
+            ValueError: If max_entries is not positive.
+        """
+        if max_entries <= 0:
+            raise ValueError("Cache size must be greater than zero.")
+        self._lock = threading.Lock()
+        self._quotes: OrderedDict[tuple, Quote] = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Quote]:
+        """Returns the quote cached under a key, if any."""
+        with self._lock:
+            quote = self._quotes.get(key)
+            if quote is not None:
+                self._quotes.move_to_end(key)
+            return quote
+
+    def put(self, key: tuple, quote: Quote) -> None:
+        """Caches a quote, evicting the least recently used one when full."""
+        with self._lock:
+            self._quotes[key] = quote
+            self._quotes.move_to_end(key)
+            if len(self._quotes) > self.max_entries:
+                self._quotes.popitem(last=False)
+
+    def record(self, hit: bool) -> None:
+        """Counts a lookup that found a valid quote (hit) or had to price the cart (miss)."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        """Drops every quote and resets the counters."""
+        with self._lock:
+            self._quotes.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counters and the current number of entries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._quotes),
+                'max_entries': self.max_entries,
+            }
@@ -0,0 +1,122 @@
+"""
+Compact binary product records and the binary catalog file format.
+
+A product record is a fixed struct (kind, price, quantity, maximum,
+active, name length) followed by the UTF-8 name. A catalog file is a
+header (magic, sequence number, record count) followed by records; the
+same format serves as the persistence snapshot and as a bulk-load feed.
+Promotions are not part of a record.
+"""
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator
+
+from products import Product, NonStockedProduct, LimitedProduct
+
+# Values of the record ``kind`` field.
+STOCKED, NON_STOCKED, LIMITED = 0, 1, 2
+
+_MAGIC = b"BBSNAP1\0"
+_HEADER = struct.Struct("<8sQQ")
+_PRODUCT = struct.Struct("<BdqqBH")
+_UNLIMITED = -1
+
+# A decoded record: (kind, name, price, quantity, maximum, active).
+ProductRow = tuple[int, str, float, int, int, bool]
+
+
+def row_of(product: Product) -> ProductRow:
+    """Returns the record fields of a product."""
+    if isinstance(product, NonStockedProduct):
+        return NON_STOCKED, product.name, product.price, _UNLIMITED, 0, product.is_active()
+    if isinstance(product, LimitedProduct):
+        return LIMITED, product.name, product.price, product.quantity, product.maximum, product.is_active()
+    return STOCKED, product.name, product.price, product.quantity, 0, product.is_active()
+
+
+def build_product(row: ProductRow) -> Product:
+    """Builds a product from record fields."""
+    kind, name, price, quantity, maximum, active = row
+    if kind == NON_STOCKED:
+        product = NonStockedProduct(name, price)
+    elif kind == LIMITED:
+        product = LimitedProduct(name, price, quantity, maximum)
+    else:
+        product = Product(name, price, quantity)
+    product.active = bool(active)
+    return product
+
+
+def encode_row(row: ProductRow) -> bytes:
+    """Encodes record fields as bytes."""
+    kind, name, price, quantity, maximum, active = row
+    encoded_name = name.encode("utf-8")
+    return _PRODUCT.pack(kind, price, quantity, maximum, active, len(encoded_name)) + encoded_name
+
+
+def decode_row(buffer, offset: int = 0) -> tuple[ProductRow, int]:
+    """
+    Decodes record fields.
+
+    Returns:
+        The fields and the offset just past the record.
+    """
+    kind, price, quantity, maximum, active, name_length = _PRODUCT.unpack_from(buffer, offset)
+    offset += _PRODUCT.size
+    name = bytes(buffer[offset:offset + name_length]).decode("utf-8")
+    return (kind, name, price, quantity, maximum, bool(active)), offset + name_length
+
+
+def encode_product(product: Product) -> bytes:
+    """Encodes a product (without its promotion) as a compact binary record."""
+    return encode_row(row_of(product))
+
+
+def decode_product(buffer, offset: int = 0) -> tuple[Product, int]:
+    """
+    Decodes a product record.
+
+    Returns:
+        The product and the offset just past its record.
+    """
+    row, offset = decode_row(buffer, offset)
+    return build_product(row), offset
+
+
+def write_catalog(path: str, products: Iterable[Product], sequence: int = 0) -> None:
+    """Atomically writes a binary catalog of the given products."""
+    records = [encode_product(product) for product in products]
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, sequence, len(records)))
+        file.writelines(records)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def catalog_sequence(path: str) -> int:
+    """Returns the sequence number stored in a binary catalog header."""
+    with open(path, "rb") as file:
+        magic, sequence, _ = _HEADER.unpack(file.read(_HEADER.size))
+    if magic != _MAGIC:
+        raise ValueError(f"{path} is not a binary catalog.")
+    return sequence
+
+
+def iter_catalog_rows(path: str) -> Iterator[ProductRow]:
+    """
+    Yields the record fields of a binary catalog, read through a memory map.
+
+    Raises:
+        ValueError: If the file is not a binary catalog.
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        magic, _, count = _HEADER.unpack_from(view, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a binary catalog.")
+        offset = _HEADER.size
+        for _ in range(count):
+            row, offset = decode_row(view, offset)
+            yield row
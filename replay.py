@@ -0,0 +1,167 @@
+"""
+Streaming replay of order logs through Store.place_order.
+
+Orders are read, priced and written one at a time through a generator
+pipeline, so memory use does not depend on the size of the log.
+
+Input formats:
+
+* JSONL -- one order per line:
+  ``{"order_id": "A1", "lines": [{"product": "Google Pixel 7", "quantity": 2}]}``
+* CSV -- a header of ``order_id,product,quantity``; consecutive rows that
+  share an order_id form one order.
+
+Results are written as JSONL, one ``{"order_id", "total", "errors"}``
+object per order, in input order.
+"""
+import csv
+import json
+import sys
+import time
+from itertools import groupby
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, TextIO
+
+from store import Store
+
+# Bytes read from the input file per chunk.
+CHUNK_SIZE = 1 << 20
+
+# Columns a CSV order log must have.
+_CSV_COLUMNS = ("order_id", "product", "quantity")
+
+
+class ProductRef(NamedTuple):
+    """Refers to a store product by name, which is all Store.place_order looks at."""
+    name: str
+
+
+class Order(NamedTuple):
+    """One order read from a log."""
+    order_id: str
+    lines: list[tuple[ProductRef, int]]
+
+
+def _detect_format(path: str) -> str:
+    """Guesses the input format from the file extension."""
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_jsonl(file: TextIO) -> Iterator[Order]:
+    """Yields orders from a JSONL stream, skipping blank lines."""
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            lines = [(ProductRef(item["product"]), int(item["quantity"])) for item in record["lines"]]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid order on line {number}: {e}") from e
+        yield Order(str(record.get("order_id", number)), lines)
+
+
+def read_csv(file: TextIO) -> Iterator[Order]:
+    """
+    Yields orders from a CSV stream, grouping consecutive rows by order_id.
+
+    Raises:
+        ValueError: If the header lacks a column or a row is malformed.
+    """
+    rows = csv.DictReader(file)
+    missing = [column for column in _CSV_COLUMNS if column not in (rows.fieldnames or _CSV_COLUMNS)]
+    if missing:
+        raise ValueError(f"Order log is missing column(s): {', '.join(missing)}")
+    for order_id, group in groupby(rows, key=lambda row: row["order_id"]):
+        try:
+            lines = [(ProductRef(row["product"]), int(row["quantity"])) for row in group]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid order {order_id}: {e}") from e
+        yield Order(order_id, lines)
+
+
+def read_orders(path: str, fmt: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[Order]:
+    """
+    Streams orders from a JSONL or CSV file.
+
+    Args:
+        path: Input file.
+        fmt: "jsonl" or "csv"; guessed from the extension when omitted.
+        chunk_size: Read buffer size in bytes.
+
+    Raises:
+        ValueError: If the format is unknown or a record is malformed.
+    """
+    fmt = fmt or _detect_format(path)
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError(f"Unknown order log format: {fmt}")
+    with open(path, newline="", encoding="utf-8", buffering=chunk_size) as file:
+        yield from (read_csv(file) if fmt == "csv" else read_jsonl(file))
+
+
+def replay(store: Store, orders: Iterable[Order]) -> Iterator[dict]:
+    """Places each order against the store and yields its result."""
+    for order in orders:
+        result = store.place_order(order.lines)
+        yield {"order_id": order.order_id, "total": result.total, "errors": result.errors}
+
+
+def report_progress(items: Iterable, every: int = 10_000,
+                    report: Optional[Callable[[int, float], None]] = None) -> Iterator:
+    """
+    Passes items through unchanged, calling report(count, rate) every ``every`` items
+    and once at the end. By default progress goes to stderr; an ``every`` of 0
+    reports nothing.
+
+    Raises:
+        ValueError: If every is negative.
+    """
+    if every < 0:
+        raise ValueError("Progress interval cannot be negative.")
+    if every == 0:
+        return iter(items)
+    return _reported(items, every, report)
+
+
+def _reported(items: Iterable, every: int, report: Optional[Callable[[int, float], None]]) -> Iterator:
+    """Generator behind report_progress."""
+    if report is None:
+        def report(count, rate):
+            print(f"{count} orders replayed ({rate:.0f}/s)", file=sys.stderr)
+
+    started = time.perf_counter()
+    count = 0
+    for count, item in enumerate(items, start=1):
+        yield item
+        if count % every == 0:
+            report(count, count / (time.perf_counter() - started))
+    if count % every:
+        report(count, count / max(time.perf_counter() - started, 1e-9))
+
+
+def write_results(results: Iterable[dict], file: TextIO) -> dict:
+    """
+    Writes results as JSONL and returns a summary of the replay.
+
+    Returns:
+        dict: Number of orders, revenue and number of rejected lines.
+    """
+    summary = {"orders": 0, "revenue": 0.0, "rejected_lines": 0}
+    for result in results:
+        file.write(json.dumps(result) + "\n")
+        summary["orders"] += 1
+        summary["revenue"] += result["total"]
+        summary["rejected_lines"] += len(result["errors"])
+    return summary
+
+
+def replay_file(store: Store, orders_path: str, results_path: str, fmt: Optional[str] = None,
+                progress_every: int = 10_000, report: Optional[Callable[[int, float], None]] = None) -> dict:
+    """
+    Replays an order log file through the store and writes the per-order results.
+
+    Returns:
+        dict: Summary from write_results.
+    """
+    orders = read_orders(orders_path, fmt)
+    results = report_progress(replay(store, orders), progress_every, report)
+    with open(results_path, "w", encoding="utf-8") as file:
+        return write_results(results, file)
@@ -0,0 +1,212 @@
+"""
+Name search for the store: a token inverted index plus a sorted token
+table for prefix lookups.
+
+Product names are split into lowercase alphanumeric tokens. Each token
+maps to the products whose names contain it; a sorted list of all tokens
+plays the role of a prefix trie, since every token starting with a prefix
+lies in one contiguous range found by binary search. New tokens are
+buffered and merged into the sorted list by the next lookup, so adding a
+product never re-sorts the whole table.
+
+A query matches a product when every query term is a prefix of one of the
+product's name tokens, so "pix 7" finds "Google Pixel 7" while it is being
+typed.
+"""
+import re
+from bisect import bisect_left, insort
+from typing import Callable, Iterator
+
+from products import Product
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+# Tokens sampled to estimate how many products a prefix matches.
+_ESTIMATE_SAMPLE = 64
+
+# Widest prefix range checked through postings instead of by re-tokenizing names.
+_MEMBERSHIP_TOKENS = 16
+
+# Largest code point, used as an upper bound for prefix ranges.
+_MAX_CHAR = "\U0010ffff"
+
+# Most buffered tokens inserted one by one; more are merged by a single sort.
+_INSORT_LIMIT = 64
+
+
+def tokenize(text: str) -> list[str]:
+    """Returns the lowercase alphanumeric tokens of a name or query, in order."""
+    return _TOKEN.findall(text.lower())
+
+
+def _bounds(tokens: list[str], prefix: str) -> tuple[list[str], int, int]:
+    """Returns a sorted token list with the slice bounds of its tokens starting with prefix."""
+    start = bisect_left(tokens, prefix)
+    return tokens, start, bisect_left(tokens, prefix + _MAX_CHAR, start)
+
+
+class _TokenTable:
+    """
+    A sorted token list that takes single additions and removals cheaply.
+
+    Added tokens wait in a buffer until the next lookup. A few are inserted
+    in place; many are sorted and appended, and the list's sort merges the
+    two sorted runs in linear time.
+    """
+    __slots__ = ('_sorted', '_pending')
+
+    def __init__(self):
+        self._sorted: list[str] = []
+        self._pending: set[str] = set()
+
+    def add(self, token: str) -> None:
+        """Adds a token that is not in the table."""
+        self._pending.add(token)
+
+    def discard(self, token: str) -> None:
+        """Removes a token if the table holds it."""
+        if token in self._pending:
+            self._pending.discard(token)
+            return
+        index = bisect_left(self._sorted, token)
+        if index < len(self._sorted) and self._sorted[index] == token:
+            del self._sorted[index]
+
+    def tokens(self) -> list[str]:
+        """Returns every token in sorted order, merging the buffered ones first."""
+        if self._pending:
+            if len(self._pending) <= _INSORT_LIMIT:
+                for token in self._pending:
+                    insort(self._sorted, token)
+            else:
+                self._sorted.extend(sorted(self._pending))
+                self._sorted.sort()
+            self._pending.clear()
+        return self._sorted
+
+
+class SearchIndex:
+    """
+    Inverted index from name tokens to products.
+
+    Postings keep insertion order. A token held by a single product maps
+    straight to it, which keeps the index small for catalogs where most
+    tokens (SKU numbers, model codes) are unique.
+    """
+    __slots__ = ('_postings', '_sorted_tokens', '_sorted_shared')
+
+    def __init__(self):
+        self._postings: dict[str, Product | dict[int, Product]] = {}
+        # Every indexed token, for prefix ranges
+        self._sorted_tokens = _TokenTable()
+        # Tokens held by several products, for query planning
+        self._sorted_shared = _TokenTable()
+
+    def __len__(self) -> int:
+        """Returns the number of distinct tokens."""
+        return len(self._postings)
+
+    def add(self, product: Product) -> None:
+        """Indexes a product under each token of its name."""
+        for token in set(tokenize(product.name)):
+            posting = self._postings.get(token)
+            if posting is None:
+                self._postings[token] = product
+                self._sorted_tokens.add(token)
+            elif isinstance(posting, dict):
+                posting[id(product)] = product
+            elif posting is not product:
+                self._postings[token] = {id(posting): posting, id(product): product}
+                self._sorted_shared.add(token)
+
+    def remove(self, product: Product) -> None:
+        """Removes a product from the index."""
+        for token in set(tokenize(product.name)):
+            posting = self._postings.get(token)
+            if posting is product:
+                del self._postings[token]
+                self._sorted_tokens.discard(token)
+            elif isinstance(posting, dict):
+                posting.pop(id(product), None)
+                if len(posting) == 1:
+                    self._postings[token] = next(iter(posting.values()))
+                    self._sorted_shared.discard(token)
+
+    def _products_for(self, token: str) -> Iterator[Product]:
+        """Yields the products holding an exact token."""
+        posting = self._postings.get(token)
+        if isinstance(posting, dict):
+            yield from posting.values()
+        elif posting is not None:
+            yield posting
+
+    def _prefix_range(self, prefix: str) -> tuple[list[str], int, int]:
+        """Returns the sorted token list and the slice bounds of the tokens starting with a prefix."""
+        return _bounds(self._sorted_tokens.tokens(), prefix)
+
+    def tokens_with_prefix(self, prefix: str) -> list[str]:
+        """Returns the indexed tokens starting with a prefix, in sorted order."""
+        tokens, start, end = self._prefix_range(prefix)
+        return tokens[start:end]
+
+    def _estimate(self, prefix: str, tokens: list[str], start: int, end: int) -> float:
+        """
+        Estimates how many products hold a token starting with prefix.
+
+        Every token in the range counts once, plus the extra products of the
+        shared tokens in it, measured on an even sample when there are many.
+        """
+        shared, shared_start, shared_end = _bounds(self._sorted_shared.tokens(), prefix)
+        sample = range(shared_start, shared_end, max(1, (shared_end - shared_start) // _ESTIMATE_SAMPLE))
+        extra = 0
+        for index in sample:
+            posting = self._postings.get(shared[index])
+            if isinstance(posting, dict):
+                extra += len(posting) - 1
+        return end - start + extra * (shared_end - shared_start) / max(1, len(sample))
+
+    def _matcher(self, term: str, tokens: list[str], start: int, end: int) -> Callable[[Product], bool]:
+        """
+        Returns a check for whether a product has a name token starting with term.
+
+        A term covering a few tokens is checked against their postings;
+        a wider one against the product's own name tokens.
+        """
+        if end - start > _MEMBERSHIP_TOKENS:
+            # The term at the start of a name or right after a non-alphanumeric character
+            at_token_start = re.compile(r"(?<![^\W_])" + re.escape(term))
+            return lambda product: at_token_start.search(product.name.lower()) is not None
+        postings = [self._postings.get(tokens[index]) for index in range(start, end)]
+        dicts = [posting for posting in postings if isinstance(posting, dict)]
+        singles = {id(posting) for posting in postings if posting is not None and not isinstance(posting, dict)}
+        return lambda product: id(product) in singles or any(id(product) in posting for posting in dicts)
+
+    def search(self, query: str) -> Iterator[Product]:
+        """
+        Lazily yields the products matching every term of a query, each once.
+
+        The term expected to match the fewest products drives the scan; the
+        other terms are checked per candidate, so a caller that stops after a
+        few results never builds the full result set.
+
+        Results are grouped by matching token in sorted order, then by the
+        order products were indexed. The token tables are edited in place, so
+        the index must not change until the results are consumed; Store.search
+        consumes them under the store's lock.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return
+        ranges = [(term,) + self._prefix_range(term) for term in set(terms)]
+        ranges.sort(key=lambda r: self._estimate(*r))
+        _, tokens, start, end = ranges[0]
+        matchers = [self._matcher(*r) for r in ranges[1:]]
+
+        seen = set()
+        for index in range(start, end):
+            for product in self._products_for(tokens[index]):
+                if id(product) in seen:
+                    continue
+                seen.add(id(product))
+                if all(matches(product) for matches in matchers):
+                    yield product
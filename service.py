@@ -0,0 +1,258 @@
+"""
+asyncio order service: the store over a local TCP socket.
+
+The protocol is newline-delimited JSON. Each request is one line:
+
+    {"id": 1, "op": "list", "page": 0, "page_size": 20}
+    {"id": 2, "op": "quote", "lines": [{"product": "Google Pixel 7", "quantity": 2}]}
+    {"id": 3, "op": "order", "lines": [{"product": "Google Pixel 7", "quantity": 2}]}
+    {"id": 4, "op": "total"}
+
+Each response is one line, ``{"id", "ok": true, "result"}`` or
+``{"id", "ok": false, "error"}``.
+
+Clients may pipeline requests, sending more before earlier responses
+arrive. A connection's requests run one after another, as in HTTP/1.1
+pipelining, so a client always sees its own orders. Connections run
+concurrently. Up to ``pipeline_depth`` requests are read ahead per
+connection; after that the service stops reading from the connection
+until the oldest one is answered. Writes also wait while the client is
+not reading. A slow or greedy client is therefore held back by TCP flow
+control instead of growing buffers in the service.
+
+list and total read the current snapshot on the event loop. quote and
+order price the cart, which can take a while with promotions, so they
+run on a small thread pool. A service-wide semaphore bounds the work
+handed to the pool.
+
+Run it with ``python main.py --serve``. benchmarks/bench_service.py is a
+load-test client.
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from products import NonStockedProduct
+from replay import ProductRef
+from store import Store
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Requests read ahead per connection before reading from it pauses.
+PIPELINE_DEPTH = 64
+
+# Threads pricing quotes and orders.
+MAX_WORKERS = 4
+
+# Longest request line accepted, in bytes.
+MAX_REQUEST_BYTES = 1 << 16
+
+# Largest page a list request may ask for.
+MAX_PAGE_SIZE = 1000
+
+_END = None
+
+
+def parse_lines(request: dict) -> list[tuple[ProductRef, int]]:
+    """
+    Reads a shopping list from a request, in the replay log's line format.
+
+    Raises:
+        ValueError: If the lines are missing or malformed.
+    """
+    try:
+        return [(ProductRef(str(item["product"])), int(item["quantity"])) for item in request["lines"]]
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid lines: {e}") from e
+
+
+class OrderService:
+    """Serves list, quote, order and total requests for a store."""
+
+    def __init__(self, store: Store, max_workers: int = MAX_WORKERS, pipeline_depth: int = PIPELINE_DEPTH,
+                 max_request_bytes: int = MAX_REQUEST_BYTES):
+        """
+        Initializes the service; call start to listen.
+
+        Args:
+            store (Store): The store to serve.
+            max_workers (int): Threads pricing quotes and orders.
+            pipeline_depth (int): Requests read ahead per connection before reading pauses.
+            max_request_bytes (int): Longest request line accepted.
+
+        Raises:
+            ValueError: If a limit is not positive.
+        """
+        if max_workers <= 0 or pipeline_depth <= 0 or max_request_bytes <= 0:
+            raise ValueError("Service limits must be greater than zero.")
+        self.store = store
+        self.max_workers = max_workers
+        self.pipeline_depth = pipeline_depth
+        self.max_request_bytes = max_request_bytes
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="order-service")
+        self._workers: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.Server] = None
+        self._handlers = {
+            'list': self._list,
+            'quote': self._quote,
+            'order': self._order,
+            'total': self._total,
+        }
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> tuple[str, int]:
+        """
+        Starts listening.
+
+        Returns:
+            The address bound, useful with port 0.
+        """
+        self._workers = asyncio.Semaphore(self.max_workers)
+        self._server = await asyncio.start_server(self._serve, host, port, limit=self.max_request_bytes)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        """
+        Serves until cancelled.
+
+        Raises:
+            RuntimeError: If the service has not been started.
+        """
+        if self._server is None:
+            raise RuntimeError("The order service has not been started.")
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stops listening and shuts the worker pool down once its calls finish."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Waiting for the pool blocks, so do it off the event loop
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Connection handler: reads requests ahead and queues them for the responder."""
+        # Bounded, so a full pipeline stops us reading from the socket
+        pending: asyncio.Queue = asyncio.Queue(self.pipeline_depth)
+        responder = asyncio.create_task(self._respond(pending, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await pending.put({'ok': False, 'error': "Request too long."})
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(line)
+        finally:
+            await pending.put(_END)
+            await responder
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, pending: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        """Runs the queued requests in order and writes their responses."""
+        connected = True
+        while True:
+            request = await pending.get()
+            if request is _END:
+                return
+            if not connected:
+                continue
+            # A dict is a response the reader already made
+            response = request if isinstance(request, dict) else await self._dispatch(request)
+            try:
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                # Waits only while the client is not keeping up
+                await writer.drain()
+            except ConnectionError:
+                # Keep draining the queue so the reader never blocks on it
+                connected = False
+
+    async def _dispatch(self, line: bytes) -> dict:
+        """Runs one request and returns its response."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object.")
+            request_id = request.get('id')
+            handler = self._handlers.get(request.get('op'))
+            if handler is None:
+                raise ValueError(f"Unknown op: {request.get('op')}")
+            return {'id': request_id, 'ok': True, 'result': await handler(request)}
+        except ValueError as e:
+            return {'id': request_id, 'ok': False, 'error': str(e)}
+        except Exception as e:  # Answer every request, so responses stay matched to requests
+            return {'id': request_id, 'ok': False, 'error': f"Internal error: {e}"}
+
+    async def _offload(self, function, *args):
+        """Runs a call on the worker pool, waiting for a free worker first."""
+        async with self._workers:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _list(self, request: dict) -> dict:
+        try:
+            page = int(request.get('page', 0))
+            page_size = int(request.get('page_size', 20))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid page: {e}") from e
+        if page < 0 or not 0 < page_size <= MAX_PAGE_SIZE:
+            raise ValueError("Invalid page.")
+        snapshot = self.store.snapshot()
+        states = snapshot.page(page * page_size, page_size)
+        return {
+            'count': len(snapshot),
+            'products': [{
+                'name': state.name,
+                'price': state.price,
+                'quantity': None if isinstance(state.product, NonStockedProduct) else state.quantity,
+                'active': state.active,
+                'promotion': str(state.promotion) if state.promotion is not None else None,
+            } for state in states],
+        }
+
+    async def _quote(self, request: dict) -> dict:
+        quote = await self._offload(self.store.quote, parse_lines(request))
+        return {
+            'total': quote.total,
+            'lines': [{'product': line.name, 'quantity': line.quantity, 'price': line.price, 'error': line.error}
+                      for line in quote.lines],
+        }
+
+    async def _order(self, request: dict) -> dict:
+        result = await self._offload(self.store.checkout, parse_lines(request))
+        return {'total': result.total, 'errors': result.errors}
+
+    async def _total(self, request: dict) -> dict:
+        return {'total_quantity': self.store.get_total_quantity()}
+
+
+async def serve(store: Store, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **limits) -> None:
+    """Serves a store until cancelled; keyword arguments are passed on to OrderService."""
+    service = OrderService(store, **limits)
+    address = await service.start(host, port)
+    print(f"Serving on {address[0]}:{address[1]}")
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the service's command-line options to a parser."""
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to serve on (default: %(default)s).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to serve on (default: %(default)s).")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="Threads pricing quotes and orders (default: %(default)s).")
+    parser.add_argument("--pipeline-depth", type=int, default=PIPELINE_DEPTH,
+                        help="Requests in flight per connection (default: %(default)s).")
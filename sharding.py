@@ -0,0 +1,287 @@
+"""
+Multi-process sharded store.
+
+The catalog is partitioned by a stable hash of the product name across
+worker processes, each owning an ordinary Store. The router splits each
+shopping list by shard and sends the parts to their workers in parallel.
+
+Orders use reserve-then-commit: each worker buys its lines under a
+reservation token and keeps enough to undo them. The router commits only
+once every shard has answered; if any shard fails, every reservation
+already taken is aborted and its stock restored, so a partial failure
+never leaves stock decremented. Line-level rejections (unknown product,
+not enough stock, ...) are not failures: as with Store.order, those lines
+are skipped and reported.
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import zlib
+from typing import Iterable, Optional
+
+from records import encode_product, decode_product
+from products import Product
+from store import Store, OrderResult
+
+
+def shard_of(name: str, shards: int) -> int:
+    """Returns the shard owning a product name; stable across processes, unlike hash()."""
+    return zlib.crc32(name.encode("utf-8")) % shards
+
+
+class ShardError(RuntimeError):
+    """Raised when a shard worker fails or dies while serving a request."""
+
+
+def _serve(connection, records: list[tuple[bytes, Optional['Promotion']]]) -> None:
+    """Worker process main loop: owns one Store and answers router requests."""
+    products = []
+    for record, promotion in records:
+        product, _ = decode_product(record)
+        product.set_promotion(promotion)
+        products.append(product)
+    store = Store(products)
+    reservations: dict[int, list[tuple[Product, int]]] = {}
+
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        op = request[0]
+        try:
+            if op == "reserve":
+                _, token, lines = request
+                reply = _reserve(store, reservations, token, lines)
+            elif op == "commit":
+                reservations.pop(request[1], None)
+                reply = None
+            elif op == "abort":
+                _abort(store, reservations.pop(request[1], []))
+                reply = None
+            elif op == "total_quantity":
+                reply = store.get_total_quantity()
+            elif op == "product":
+                product = store.get_product(request[1])
+                reply = None if product is None else (encode_product(product), product.promotion)
+            elif op == "products":
+                reply = [(encode_product(p), p.promotion) for p in store.get_all_products()]
+            elif op == "stop":
+                connection.send(("ok", None))
+                return
+            else:
+                raise ValueError(f"Unknown shard request: {op}")
+        except Exception as e:
+            connection.send(("error", repr(e)))
+        else:
+            connection.send(("ok", reply))
+
+
+def _reserve(store: Store, reservations: dict, token: int, lines: list[tuple[int, str, int]]) -> list:
+    """Buys the given lines under a reservation token; returns (index, price, error) per line."""
+    taken = reservations.setdefault(token, [])
+    replies = []
+    with store.lock_products([name for _, name, _ in lines]):
+        for index, name, quantity in lines:
+            product = store.get_product(name)
+            if product is None:
+                replies.append((index, 0.0, f"Product {name} is not available."))
+                continue
+            if quantity <= 0:
+                replies.append((index, 0.0, f"Invalid quantity for {name}."))
+                continue
+            try:
+                price = product.buy(quantity)
+            except ValueError as e:
+                replies.append((index, 0.0, f"Error with product {name}: {e}"))
+                continue
+            taken.append((product, quantity))
+            replies.append((index, price, None))
+    return replies
+
+
+def _abort(store: Store, taken: list[tuple[Product, int]]) -> None:
+    """Returns reserved stock, reactivating products the reservation sold out."""
+    with store.lock_products([product.name for product, _ in taken]):
+        for product, quantity in reversed(taken):
+            # Reserved products were active, since only active ones can be bought
+            product.set_quantity(product.get_quantity() + quantity)
+            product.activate()
+
+
+def _copy_product(record: bytes, promotion: Optional['Promotion']) -> Product:
+    """Rebuilds a product copy from a shard reply."""
+    product, _ = decode_product(record)
+    product.promotion = promotion
+    return product
+
+
+class ShardedStore:
+    """
+    Router over a set of shard worker processes exposing the Store API.
+
+    Products handed out by get_product and get_all_products are copies;
+    the live objects belong to the workers.
+    """
+
+    def __init__(self, product_list: Iterable[Product], shards: Optional[int] = None, context=None):
+        """
+        Partitions the products and starts one worker process per shard.
+
+        Args:
+            product_list: Products to distribute; they are copied into the workers.
+            shards: Number of worker processes; defaults to the CPU count.
+            context: multiprocessing context to start workers with.
+        """
+        self.shards = shards or os.cpu_count() or 1
+        context = context or multiprocessing.get_context()
+        partitions = [[] for _ in range(self.shards)]
+        for product in product_list:
+            partitions[shard_of(product.name, self.shards)].append((encode_product(product), product.promotion))
+
+        self._connections = []
+        self._locks = []
+        self._processes = []
+        for partition in partitions:
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve, args=(child, partition), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._locks.append(threading.Lock())
+            self._processes.append(process)
+        self._tokens = itertools.count(1)
+
+    def _send(self, shard: int, request: tuple) -> None:
+        try:
+            self._connections[shard].send(request)
+        except (OSError, ValueError) as e:
+            raise ShardError(f"Shard {shard} is unavailable: {e}") from e
+
+    def _receive(self, shard: int):
+        try:
+            status, reply = self._connections[shard].recv()
+        except (EOFError, OSError) as e:
+            raise ShardError(f"Shard {shard} is unavailable: {e}") from e
+        if status != "ok":
+            raise ShardError(f"Shard {shard} failed: {reply}")
+        return reply
+
+    def _broadcast(self, request: tuple) -> list:
+        """Sends a request to every shard and returns their replies in shard order."""
+        shards = range(self.shards)
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            for shard in shards:
+                self._send(shard, request)
+            return [self._receive(shard) for shard in shards]
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+
+    def place_order(self, shopping_list: list[tuple[Product, int]]) -> OrderResult:
+        """
+        Processes an order across shards atomically and returns its OrderResult.
+
+        Raises:
+            ShardError: If a shard fails; every reservation is rolled back first.
+        """
+        parts: dict[int, list[tuple[int, str, int]]] = {}
+        for index, (requested_product, quantity) in enumerate(shopping_list):
+            name = requested_product.name
+            parts.setdefault(shard_of(name, self.shards), []).append((index, name, quantity))
+        token = next(self._tokens)
+        shards = sorted(parts)
+
+        # Shard locks are taken in ascending order, so concurrent orders cannot deadlock.
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            sent, replies, failure = [], [], None
+            for shard in shards:
+                try:
+                    self._send(shard, ("reserve", token, parts[shard]))
+                    sent.append(shard)
+                except ShardError as e:
+                    failure = failure or e
+            for shard in sent:
+                try:
+                    replies.extend(self._receive(shard))
+                except ShardError as e:
+                    failure = failure or e
+
+            outcome = "abort" if failure else "commit"
+            for shard in sent:
+                try:
+                    self._send(shard, (outcome, token))
+                    self._receive(shard)
+                except ShardError:
+                    pass  # A dead shard lost its reservations along with its stock
+            if failure:
+                raise failure
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+
+        replies.sort()
+        total_price = 0.0
+        errors = []
+        for _, price, error in replies:
+            if error is None:
+                total_price += price
+            else:
+                errors.append(error)
+        return OrderResult(total_price, errors)
+
+    def order(self, shopping_list: list[tuple[Product, int]]) -> float:
+        """Processes an order and returns the total price, printing rejected lines like Store.order."""
+        result = self.place_order(shopping_list)
+        for error in result.errors:
+            print(error)
+        return result.total
+
+    def get_product(self, name: str) -> Optional[Product]:
+        """Returns a copy of the active product with the given name, or None."""
+        shard = shard_of(name, self.shards)
+        with self._locks[shard]:
+            self._send(shard, ("product", name))
+            reply = self._receive(shard)
+        return None if reply is None else _copy_product(*reply)
+
+    def get_total_quantity(self) -> int:
+        """Returns the total quantity of all active stockable products across shards."""
+        return sum(self._broadcast(("total_quantity",)))
+
+    def get_all_products(self) -> list[Product]:
+        """Returns copies of all products, grouped by shard."""
+        products = []
+        for shard_products in self._broadcast(("products",)):
+            products.extend(_copy_product(record, promotion) for record, promotion in shard_products)
+        return products
+
+    def get_all_active_products(self) -> list[Product]:
+        """Returns copies of all active products, grouped by shard."""
+        return [product for product in self.get_all_products() if product.is_active()]
+
+    def close(self) -> None:
+        """Stops every worker process."""
+        for shard, process in enumerate(self._processes):
+            if process.is_alive():
+                try:
+                    with self._locks[shard]:
+                        self._send(shard, ("stop",))
+                        self._receive(shard)
+                except ShardError:
+                    pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            self._connections[shard].close()
+
+    def __enter__(self) -> 'ShardedStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
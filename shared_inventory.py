@@ -0,0 +1,308 @@
+"""
+Inventory levels mirrored into shared memory for reader processes.
+
+A SharedInventory attaches to a Store and keeps one row per product in a
+multiprocessing.shared_memory block. Each row holds the quantity, price,
+active flag and a sequence counter. Any process can open the block by
+name with an InventoryReader and read current levels straight from it,
+without copying and without asking the store process anything.
+
+The store process is the only writer. Rows are updated from store
+notifications, so every Product.buy, set_quantity, activate, deactivate,
+set_price and Store.bulk_update is mirrored as it happens. Notifications
+are delivered under the store's state lock, which serializes writers.
+
+Each row is guarded by a seqlock. The writer makes the row's counter odd,
+writes the fields, then makes the counter even again. A reader that sees
+an odd counter, or a counter that changed while it read, retries. So a
+read never mixes fields from two updates. This relies on aligned 8-byte
+stores and loads landing whole and in program order, which is how CPython
+behaves on x86-64.
+
+Block layout, all little-endian and 8-byte aligned:
+
+    header   magic, capacity, rows used, name area size, name bytes used
+    seqs     uint64[capacity]
+    qty      int64[capacity]     (-1 for non-stocked products)
+    prices   float64[capacity]
+    flags    uint8[capacity]     (ACTIVE, REMOVED, NON_STOCKED bits)
+    names    a length-prefixed UTF-8 name per row, in row order
+"""
+import struct
+from multiprocessing import shared_memory
+from typing import Iterator, NamedTuple, Optional
+
+from products import Product, NonStockedProduct
+
+_MAGIC = b"BBSHM01\0"
+_HEADER = struct.Struct("<8sQQQQ")
+_HEADER_SIZE = 64
+_NAME_LENGTH = struct.Struct("<H")
+
+# Row flag bits.
+ACTIVE = 1
+REMOVED = 2
+NON_STOCKED = 4
+
+# Quantity stored for non-stocked products.
+_UNTRACKED = -1
+
+# Default name area bytes reserved per row.
+NAME_BYTES_PER_ROW = 48
+
+
+class StockLevel(NamedTuple):
+    """A consistent reading of one row; quantity is None for non-stocked products."""
+    name: str
+    quantity: Optional[int]
+    price: float
+    active: bool
+
+
+def _layout(capacity: int) -> tuple[int, int, int, int, int]:
+    """Returns the offsets of the seq, quantity, price, flag and name areas."""
+    seqs = _HEADER_SIZE
+    quantities = seqs + 8 * capacity
+    prices = quantities + 8 * capacity
+    flags = prices + 8 * capacity
+    names = flags + capacity
+    return seqs, quantities, prices, flags, names
+
+
+class _Block:
+    """Typed, zero-copy views over the areas of an inventory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        magic, capacity, _, name_capacity, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{shm.name} is not a shared inventory block.")
+        self.capacity = capacity
+        self.name_capacity = name_capacity
+        seqs, quantities, prices, flags, names = _layout(capacity)
+        buf = shm.buf
+        self.header = buf[:_HEADER_SIZE]
+        self.seqs = buf[seqs:quantities].cast('Q')
+        self.quantities = buf[quantities:prices].cast('q')
+        self.prices = buf[prices:flags].cast('d')
+        self.flags = buf[flags:names]
+        self.names = buf[names:names + name_capacity]
+
+    def counts(self) -> tuple[int, int]:
+        """Returns the rows used and the name bytes used, as published by the writer."""
+        _, _, rows, _, name_bytes = _HEADER.unpack_from(self.header, 0)
+        return rows, name_bytes
+
+    def release(self) -> None:
+        """Releases the views so the block can be closed."""
+        for view in (self.seqs, self.quantities, self.prices, self.flags, self.names, self.header):
+            view.release()
+
+
+class SharedInventory:
+    """
+    Mirrors a store's stock levels, prices and active flags into shared memory.
+
+    The block has a fixed capacity. Products added once it is full are not
+    mirrored; ``overflowed`` is set and readers will not see them.
+    """
+
+    def __init__(self, store: 'Store', capacity: Optional[int] = None, name: Optional[str] = None,
+                 name_bytes_per_row: int = NAME_BYTES_PER_ROW):
+        """
+        Creates the block and starts mirroring the store.
+
+        Args:
+            store: The store to mirror.
+            capacity: Most rows the block holds; twice the current product count by default.
+            name: Shared memory name; generated when omitted.
+            name_bytes_per_row: Space reserved for each product's encoded name.
+        """
+        self.store = store
+        self.overflowed = False
+        self._rows: dict[int, int] = {}
+        with store.inventory_lock():
+            products = store.get_all_products()
+            capacity = capacity or max(1024, 2 * len(products))
+            name_capacity = capacity * name_bytes_per_row
+            size = _layout(capacity)[4] + name_capacity
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            _HEADER.pack_into(self._shm.buf, 0, _MAGIC, capacity, 0, name_capacity, 0)
+            self._block = _Block(self._shm)
+            self._row_count = 0
+            self._name_bytes = 0
+            for product in products:
+                self._append(product)
+            store.subscribe(self._on_change)
+
+    @property
+    def name(self) -> str:
+        """The shared memory name readers open."""
+        return self._shm.name
+
+    def _append(self, product: Product) -> None:
+        """Gives a product the next free row, then publishes the new row count."""
+        encoded = product.name.encode("utf-8")
+        block = self._block
+        row = self._row_count
+        if row >= block.capacity or self._name_bytes + _NAME_LENGTH.size + len(encoded) > block.name_capacity:
+            self.overflowed = True
+            return
+        _NAME_LENGTH.pack_into(block.names, self._name_bytes, len(encoded))
+        start = self._name_bytes + _NAME_LENGTH.size
+        block.names[start:start + len(encoded)] = encoded
+        self._name_bytes = start + len(encoded)
+        self._rows[id(product)] = row
+        self._write(row, product)
+        # Readers only look at rows below the published count
+        self._row_count = row + 1
+        _HEADER.pack_into(block.header, 0, _MAGIC, block.capacity, self._row_count,
+                          block.name_capacity, self._name_bytes)
+
+    def _write(self, row: int, product: Product, removed: bool = False) -> None:
+        """Updates one row under its seqlock."""
+        block = self._block
+        non_stocked = isinstance(product, NonStockedProduct)
+        flags = (ACTIVE if product.is_active() and not removed else 0) | (REMOVED if removed else 0) \
+            | (NON_STOCKED if non_stocked else 0)
+        block.seqs[row] += 1
+        block.quantities[row] = _UNTRACKED if non_stocked else product.get_quantity()
+        block.prices[row] = product.price
+        block.flags[row] = flags
+        block.seqs[row] += 1
+
+    def _on_change(self, event: str, product: Product) -> None:
+        """Store subscriber; runs under the store's state lock, which serializes writers."""
+        if event == 'bulk':
+            for changed in product:
+                row = self._rows.get(id(changed))
+                if row is not None:
+                    self._write(row, changed)
+            return
+        key = id(product)
+        if event == 'add':
+            self._append(product)
+            return
+        row = self._rows.get(key)
+        if row is None:
+            return
+        if event == 'remove':
+            self._write(row, product, removed=True)
+            del self._rows[key]
+        elif event in ('quantity', 'active', 'price'):
+            self._write(row, product)
+
+    def close(self) -> None:
+        """Stops mirroring and destroys the block; open readers keep their mapping until they close."""
+        self.store.unsubscribe(self._on_change)
+        self._block.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> 'SharedInventory':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class InventoryReader:
+    """
+    Reads stock levels from a SharedInventory block, in any process.
+
+    Start reader processes with multiprocessing from the store process, so
+    they share its resource tracker. Python 3.11 registers every opened
+    block with the tracker, and a process with a tracker of its own would
+    have the block unlinked when it exits.
+    """
+
+    def __init__(self, name: str):
+        """
+        Opens a block by its shared memory name.
+
+        Raises:
+            FileNotFoundError: If no block has that name.
+            ValueError: If the block is not a shared inventory.
+        """
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._block = _Block(self._shm)
+        self._rows: dict[str, int] = {}
+        self._names: list[str] = []
+        self._name_offset = 0
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Learns the names of rows added since the last call."""
+        block = self._block
+        rows, _ = block.counts()
+        offset = self._name_offset
+        for row in range(len(self._names), rows):
+            (length,) = _NAME_LENGTH.unpack_from(block.names, offset)
+            offset += _NAME_LENGTH.size
+            name = bytes(block.names[offset:offset + length]).decode("utf-8")
+            offset += length
+            self._names.append(name)
+            # A re-added name maps to its newest row
+            self._rows[name] = row
+        self._name_offset = offset
+
+    def _row(self, name: str) -> Optional[int]:
+        row = self._rows.get(name)
+        if row is None:
+            self._refresh()
+            row = self._rows.get(name)
+        return row
+
+    def _read(self, row: int) -> tuple[int, float, int]:
+        """Returns a consistent (quantity, price, flags) for a row."""
+        block = self._block
+        seqs = block.seqs
+        while True:
+            seq = seqs[row]
+            if seq & 1:
+                continue
+            quantity = block.quantities[row]
+            price = block.prices[row]
+            flags = block.flags[row]
+            if seqs[row] == seq:
+                return quantity, price, flags
+
+    def get(self, name: str) -> Optional[StockLevel]:
+        """Returns the stock level of a product, or None if it is unknown or removed."""
+        row = self._row(name)
+        if row is None:
+            return None
+        quantity, price, flags = self._read(row)
+        if flags & REMOVED:
+            return None
+        return StockLevel(name, None if flags & NON_STOCKED else quantity, price, bool(flags & ACTIVE))
+
+    def quantity(self, name: str) -> Optional[int]:
+        """Returns the stock of an active stocked product; 0 if inactive, None if unknown or not stocked."""
+        level = self.get(name)
+        if level is None or level.quantity is None:
+            return None
+        return level.quantity if level.active else 0
+
+    def levels(self) -> Iterator[StockLevel]:
+        """Yields the level of every product not removed, in row order."""
+        self._refresh()
+        for row, name in enumerate(self._names):
+            quantity, price, flags = self._read(row)
+            if not flags & REMOVED:
+                yield StockLevel(name, None if flags & NON_STOCKED else quantity, price, bool(flags & ACTIVE))
+
+    def total_quantity(self) -> int:
+        """Returns the total quantity of all active stocked products, like Store.get_total_quantity."""
+        return sum(level.quantity for level in self.levels() if level.active and level.quantity is not None)
+
+    def close(self) -> None:
+        """Unmaps the block."""
+        self._block.release()
+        self._shm.close()
+
+    def __enter__(self) -> 'InventoryReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,331 @@
+"""
+Immutable, versioned views of a store's inventory.
+
+A snapshot records the state of every product (price, quantity, active,
+promotion) as of one version, along with the total stock at that point.
+The store publishes a new snapshot after every change, and a whole order
+counts as one change. Readers take the current snapshot with a single
+attribute read. From then on they see one consistent state, without
+locking, however the store changes afterwards.
+
+Product states are stored in fixed-size chunks, the leaves of a tree
+with a fixed fan-out. A new version copies only the chunks it changes and
+the nodes above them, and shares everything else with the previous
+version. Every node keeps its live count and every chunk its active
+states, both updated from the changed states alone, so publishing a
+version costs a few small copies however large the catalog grows.
+
+Every product keeps its position for as long as it is in the store. A
+removal leaves a tombstone (None) at that position rather than shifting
+later products, so it costs one chunk copy like any other change.
+Sequence access skips tombstones. Once tombstones outnumber live states,
+the store compacts the snapshot and renumbers positions.
+"""
+from bisect import bisect_left
+from collections.abc import Sequence
+from itertools import chain, islice
+from operator import attrgetter
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from products import Product, NonStockedProduct
+
+# Product states per chunk; a version copies one chunk per changed product.
+CHUNK_SIZE = 128
+
+# Children per tree node; a version copies one node per level above a changed chunk.
+FANOUT = 32
+
+
+class ProductState(NamedTuple):
+    """The state of one product as of a snapshot."""
+    product: Product
+    name: str
+    price: float
+    quantity: int
+    active: bool
+    promotion: Optional['Promotion']
+
+    @classmethod
+    def of(cls, product: Product) -> 'ProductState':
+        """Captures the current state of a product."""
+        return cls(product, product.name, product.price, product.get_quantity(),
+                   product.is_active(), product.promotion)
+
+    def stock(self) -> int:
+        """Returns what the product adds to the store's total quantity."""
+        if not self.active or isinstance(self.product, NonStockedProduct):
+            return 0
+        return self.quantity
+
+
+class _Chunk(NamedTuple):
+    """Up to CHUNK_SIZE consecutive positions, with their live count and active states."""
+    states: tuple[Optional[ProductState], ...]
+    live: int
+    # Offsets of the active states within the chunk, ascending, and the states themselves
+    active_offsets: tuple[int, ...]
+    active: tuple[ProductState, ...]
+
+    @classmethod
+    def of(cls, states: tuple[Optional[ProductState], ...]) -> '_Chunk':
+        """Builds a chunk from scratch; evolve edits existing chunks instead."""
+        offsets = tuple(offset for offset, state in enumerate(states) if state is not None and state.active)
+        return cls(states, len(states) - states.count(None), offsets, tuple(states[offset] for offset in offsets))
+
+    def edit(self, edits: dict[int, Optional[ProductState]],
+             appended: list[ProductState] = ()) -> tuple['_Chunk', int]:
+        """
+        Returns the chunk with the states at some offsets replaced (None removes
+        one) and states appended, and the change in stock. Only the edited
+        offsets are visited.
+        """
+        states = list(self.states)
+        # Offsets only change when a state turns active or inactive, so copy them lazily
+        offsets = self.active_offsets
+        active = list(self.active)
+        live = self.live
+        stock = 0
+        for offset, state in edits.items():
+            previous = states[offset]
+            states[offset] = state
+            was_active = is_active = False
+            if previous is not None:
+                live -= 1
+                stock -= previous.stock()
+                was_active = previous.active
+            if state is not None:
+                live += 1
+                stock += state.stock()
+                is_active = state.active
+            if was_active or is_active:
+                rank = bisect_left(offsets, offset)
+                if was_active and is_active:
+                    active[rank] = state
+                    continue
+                if isinstance(offsets, tuple):
+                    offsets = list(offsets)
+                if was_active:
+                    del offsets[rank], active[rank]
+                else:
+                    offsets.insert(rank, offset)
+                    active.insert(rank, state)
+        if appended:
+            # Appended offsets follow every existing one
+            added = _Chunk.of(tuple(appended))
+            offsets = tuple(offsets) + tuple(offset + len(states) for offset in added.active_offsets)
+            active.extend(added.active)
+            states.extend(appended)
+            live += added.live
+            stock += sum(state.stock() for state in appended)
+        return _Chunk(tuple(states), live, tuple(offsets), tuple(active)), stock
+
+
+class _Node(NamedTuple):
+    """An inner tree node: up to FANOUT subtrees and their total live count."""
+    children: tuple
+    live: int
+
+    @classmethod
+    def of(cls, children: list) -> '_Node':
+        """Builds a node from scratch; evolve edits existing nodes instead."""
+        return cls(tuple(children), sum(child.live for child in children))
+
+
+def _replaced(root, height: int, chunk_index: int, chunk: _Chunk):
+    """Returns a tree with the chunk at an index replaced, or appended, copying only the nodes above it."""
+    path = []
+    node = root
+    for level in range(height - 1, -1, -1):
+        child_index = chunk_index // FANOUT ** level % FANOUT
+        path.append((node, child_index))
+        node = node.children[child_index] if node is not None and child_index < len(node.children) else None
+    live_change = chunk.live - (node.live if node is not None else 0)
+    subtree = chunk
+    for parent, child_index in reversed(path):
+        if parent is None:
+            # The first chunk of a new subtree
+            subtree = _Node((subtree,), subtree.live)
+            continue
+        children = list(parent.children)
+        if child_index == len(children):
+            children.append(subtree)
+        else:
+            children[child_index] = subtree
+        subtree = _Node(tuple(children), parent.live + live_change)
+    return subtree
+
+
+def _leaves(node, height: int, first: int = 0) -> Iterator[_Chunk]:
+    """Yields the chunks of a subtree from a chunk index onwards."""
+    if height == 0:
+        yield node
+        return
+    span = FANOUT ** (height - 1)
+    child_index, first = divmod(first, span)
+    for child in islice(node.children, child_index, None):
+        yield from _leaves(child, height - 1, first)
+        first = 0
+
+
+_chunk_states = attrgetter('states')
+_chunk_active = attrgetter('active')
+
+
+class InventorySnapshot(Sequence):
+    """
+    One immutable version of the inventory: a sequence of ProductState in
+    store order.
+
+    Indexing, iteration and paging skip removed products. Positions passed
+    to evolve are chunk positions, which still count removed products
+    until the snapshot is compacted.
+
+    Attributes:
+        version: Increases by one with every published change.
+        total_quantity: Total quantity of active stockable products.
+    """
+    __slots__ = ('version', 'total_quantity', '_root', '_height', '_chunk_count')
+
+    def __init__(self, version: int = 0, root=None, height: int = 0, chunk_count: int = 0,
+                 total_quantity: int = 0):
+        self.version = version
+        self.total_quantity = total_quantity
+        # A _Node, a single _Chunk (height 0), or None when empty
+        self._root = root
+        self._height = height
+        self._chunk_count = chunk_count
+
+    @classmethod
+    def of(cls, states: list[ProductState], version: int = 0) -> 'InventorySnapshot':
+        """Builds a snapshot from product states in store order."""
+        level = [_Chunk.of(tuple(states[i:i + CHUNK_SIZE])) for i in range(0, len(states), CHUNK_SIZE)]
+        chunk_count, height = len(level), 0
+        while len(level) > 1:
+            level = [_Node.of(level[i:i + FANOUT]) for i in range(0, len(level), FANOUT)]
+            height += 1
+        return cls(version, level[0] if level else None, height, chunk_count,
+                   sum(state.stock() for state in states))
+
+    @property
+    def span(self) -> int:
+        """Number of positions in use, tombstones included; the next added product goes here."""
+        if not self._chunk_count:
+            return 0
+        return (self._chunk_count - 1) * CHUNK_SIZE + len(self._chunk(self._chunk_count - 1).states)
+
+    @property
+    def tombstones(self) -> int:
+        """Number of positions left by removed products."""
+        return self.span - len(self)
+
+    def __len__(self) -> int:
+        return self._root.live if self._root is not None else 0
+
+    def _chunk(self, chunk_index: int) -> _Chunk:
+        """Returns the chunk at a chunk index."""
+        node = self._root
+        for level in range(self._height - 1, -1, -1):
+            node = node.children[chunk_index // FANOUT ** level % FANOUT]
+        return node
+
+    def _chunks(self, chunk_index: int = 0) -> Iterator[_Chunk]:
+        """Yields the chunks from a chunk index onwards."""
+        if self._root is None:
+            return iter(())
+        return _leaves(self._root, self._height, chunk_index)
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """Returns the chunk holding a live index and the index's rank among that chunk's live states."""
+        node, chunk_index = self._root, 0
+        for height in range(self._height, 0, -1):
+            for child_index, child in enumerate(node.children):
+                if index < child.live:
+                    break
+                index -= child.live
+            chunk_index += child_index * FANOUT ** (height - 1)
+            node = child
+        return chunk_index, index
+
+    def _live(self, chunk_index: int) -> Iterator[ProductState]:
+        """Yields the live states from a chunk onwards."""
+        states = chain.from_iterable(map(_chunk_states, self._chunks(chunk_index)))
+        if self.tombstones:
+            states = (state for state in states if state is not None)
+        return states
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("snapshot index out of range")
+        chunk_index, rank = self._locate(index)
+        chunk = self._chunk(chunk_index)
+        if chunk.live == len(chunk.states):
+            return chunk.states[rank]
+        return next(islice((state for state in chunk.states if state is not None), rank, None))
+
+    def __iter__(self) -> Iterator[ProductState]:
+        return self._live(0)
+
+    def page(self, start: int, count: int) -> list[ProductState]:
+        """Returns up to count states from a 0-based position."""
+        if start >= len(self):
+            return []
+        chunk_index, rank = self._locate(start)
+        return list(islice(self._live(chunk_index), rank, rank + count))
+
+    def active(self) -> tuple[ProductState, ...]:
+        """Returns the states of the active products, in store order."""
+        return tuple(chain.from_iterable(map(_chunk_active, self._chunks())))
+
+    def products(self) -> list[Product]:
+        """Returns the products of this snapshot, in store order."""
+        return [state.product for state in self]
+
+    def evolve(self, changes: dict[int, ProductState], added: list[ProductState],
+               removed: Iterable[int] = ()) -> 'InventorySnapshot':
+        """
+        Returns the next version, with the states at some positions replaced,
+        the states at others removed and new states appended. Untouched chunks
+        and nodes are shared with this version.
+        """
+        edits: dict[int, dict[int, Optional[ProductState]]] = {}
+        for position, state in changes.items():
+            edits.setdefault(position // CHUNK_SIZE, {})[position % CHUNK_SIZE] = state
+        for position in removed:
+            edits.setdefault(position // CHUNK_SIZE, {})[position % CHUNK_SIZE] = None
+
+        chunk_count = self._chunk_count
+        total_quantity = self.total_quantity
+        # Top up the last, partly filled chunk before starting new ones
+        room = CHUNK_SIZE - len(self._chunk(chunk_count - 1).states) if chunk_count else 0
+        if added and room:
+            edits.setdefault(chunk_count - 1, {})
+        updates = []
+        for chunk_index in sorted(edits):
+            appended = added[:room] if chunk_index == chunk_count - 1 else ()
+            chunk, stock = self._chunk(chunk_index).edit(edits[chunk_index], appended)
+            total_quantity += stock
+            updates.append((chunk_index, chunk))
+        for i in range(room, len(added), CHUNK_SIZE):
+            chunk = _Chunk.of(tuple(added[i:i + CHUNK_SIZE]))
+            total_quantity += sum(state.stock() for state in chunk.states)
+            updates.append((chunk_count, chunk))
+            chunk_count += 1
+        if not updates:
+            return InventorySnapshot(self.version + 1, self._root, self._height, chunk_count, total_quantity)
+
+        root, height = self._root, self._height
+        # Grow the tree by a level whenever the chunks outgrow it
+        while chunk_count > FANOUT ** height:
+            root = _Node((root,), root.live) if root is not None else None
+            height += 1
+        for chunk_index, chunk in updates:
+            root = _replaced(root, height, chunk_index, chunk)
+        return InventorySnapshot(self.version + 1, root, height, chunk_count, total_quantity)
+
+    def compacted(self) -> 'InventorySnapshot':
+        """Returns the same version with the tombstones dropped and positions renumbered."""
+        return InventorySnapshot.of(list(self), self.version)
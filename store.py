@@ -1,63 +1,682 @@
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Iterable, NamedTuple, Optional
+
+import loader
+import metrics
+from cart_promotions import CartPromotionEngine
+from price_cache import PRICE_CACHE
 from products import Product, NonStockedProduct, LimitedProduct
+from quotes import Quote, QuoteCache, QuoteLine
+from search import SearchIndex
+from snapshot import CHUNK_SIZE, InventorySnapshot, ProductState
+
+
+# Number of striped stock locks per store; lines hash onto these by product name.
+LOCK_STRIPES = 64
+
+# Metric labels for the ValueError messages raised by Product.buy.
+_REJECTION_REASONS = {
+    "Not enough quantity available.": "insufficient_stock",
+    "Cannot purchase more than the maximum allowed quantity.": "over_limit",
+}
+
+
+def _record_line(registry: metrics.Registry, line: QuoteLine, seconds: float) -> None:
+    """Records one settled order line: its buy latency and sale, or why it was rejected."""
+    if line.error is None:
+        registry.observe('buy', seconds)
+        registry.sold(line.name, line.quantity)
+    elif line.error == f"Product {line.name} is not available.":
+        registry.inc('rejections_total', reason='not_available')
+    elif line.error == f"Invalid quantity for {line.name}.":
+        registry.inc('rejections_total', reason='invalid_quantity')
+    else:
+        detail = line.error.removeprefix(f"Error with product {line.name}: ")
+        registry.inc('rejections_total', reason=_REJECTION_REASONS.get(detail, 'invalid'))
+
+
+class OrderResult(NamedTuple):
+    """Outcome of an order: the total price and one message per rejected line."""
+    total: float
+    errors: list[str]
+
+
+class _Unchanged:
+    """Sentinel type for a StockUpdate field left as it is."""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return 'UNCHANGED'
+
+
+# Leaves a product's promotion as it is; None removes the promotion.
+UNCHANGED = _Unchanged()
+
+
+class StockUpdate(NamedTuple):
+    """
+    One line of a bulk update.
+
+    Attributes:
+        name: The product to update.
+        quantity_delta: Units added (positive) or taken away (negative).
+        price: The new unit price, or None to keep the current one.
+        promotion: The new promotion, None to remove it, or UNCHANGED.
+    """
+    name: str
+    quantity_delta: int = 0
+    price: Optional[float] = None
+    promotion: object = UNCHANGED
 
 
 class Store:
-    def __init__(self, product_list: list[Product]):
-        """Initializes a Store object with a list of products."""
-        self.products = product_list
+    def __init__(self, product_list: list[Product], lock_stripes: int = LOCK_STRIPES,
+                 cart_promotions: Optional[CartPromotionEngine] = None):
+        """
+        Initializes a Store object with a list of products.
+
+        Args:
+            product_list: Initial products.
+            lock_stripes: Number of striped locks guarding product stock.
+            cart_promotions: Cart-wide rules applied to every order, if any.
+        """
+        self.cart_promotions = cart_promotions
+        self.quotes = QuoteCache()
+        # Stock is guarded by striped locks, taken in ascending stripe order
+        # so multi-line orders cannot deadlock. The state lock guards the
+        # indexes and aggregates below and is always taken last.
+        self._stripes = [threading.Lock() for _ in range(lock_stripes)]
+        self._state_lock = threading.RLock()
+        # Products keyed by identity keep insertion order and allow O(1) removal.
+        self._products: dict[int, Product] = {}
+        # Name index; a name maps to every product registered under it, in insertion order.
+        self._by_name: dict[str, list[Product]] = {}
+        # Token and prefix index over names, for search().
+        self._search_index = SearchIndex()
+        # Current immutable inventory version, replaced (never mutated) under
+        # the state lock, and each product's position in it. Positions stay
+        # put when other products are removed, until the snapshot is compacted.
+        self._snapshot = InventorySnapshot()
+        self._slots: dict[int, int] = {}
+        # Changes a thread has made inside a batch (see _batched), keyed by
+        # product identity; None marks a removal.
+        self._local = threading.local()
+        self._subscribers: list[Callable[[str, Product], None]] = []
+        # Called after each order, outside the locks, before it returns (see acknowledge)
+        self._ack_hooks: tuple[Callable[[], None], ...] = ()
+        # Chunks of a bulk-loaded feed not yet turned into store products.
+        self._pending = None
+        # Bound once, so every product shares one listener object
+        self._listener = self._on_product_changed
+        with self._batched():
+            for product in product_list:
+                self.add_product(product)
+
+    @classmethod
+    def from_csv(cls, path: str, chunk_size: int = loader.CHUNK_SIZE, validate_first: bool = True) -> 'Store':
+        """Creates a store that loads its products lazily from a CSV feed (see loader.py)."""
+        return cls._from_feed(path, "csv", chunk_size, validate_first)
+
+    @classmethod
+    def from_jsonl(cls, path: str, chunk_size: int = loader.CHUNK_SIZE, validate_first: bool = True) -> 'Store':
+        """Creates a store that loads its products lazily from a JSONL feed (see loader.py)."""
+        return cls._from_feed(path, "jsonl", chunk_size, validate_first)
+
+    @classmethod
+    def from_binary(cls, path: str, chunk_size: int = loader.CHUNK_SIZE, validate_first: bool = True) -> 'Store':
+        """Creates a store that loads its products lazily from a binary catalog (see records.py)."""
+        return cls._from_feed(path, "binary", chunk_size, validate_first)
+
+    @classmethod
+    def _from_feed(cls, path: str, fmt: str, chunk_size: int, validate_first: bool) -> 'Store':
+        """
+        Creates an empty store backed by a feed. Products are built a chunk at
+        a time, only when a lookup misses or a query needs the whole catalog.
+        """
+        store = cls([])
+        store._pending = loader.load_chunks(path, fmt, chunk_size, validate_first)
+        return store
+
+    def _materialize_next(self) -> bool:
+        """Adds the next pending feed chunk to the store; returns False once the feed is exhausted."""
+        with self._state_lock:
+            if self._pending is None:
+                return False
+            chunk = next(self._pending, None)
+            if chunk is None:
+                self._pending = None
+                return False
+            with self._batched():
+                for product in chunk:
+                    self.add_product(product)
+            return True
+
+    def materialize_all(self) -> None:
+        """Builds every pending product of a bulk-loaded feed."""
+        while self._materialize_next():
+            pass
 
     def add_product(self, product: Product):
         """Adds a product to the store's inventory."""
-        self.products.append(product)
+        with self._state_lock:
+            if id(product) in self._products:
+                return
+            self._products[id(product)] = product
+            self._by_name.setdefault(product.name, []).append(product)
+            self._search_index.add(product)
+            product.add_listener(self._listener)
+            self._record(id(product), product)
+            self._publish('add', product)
 
     def remove_product(self, product: Product):
         """Removes a product from the store's inventory."""
-        if product in self.products:
-            self.products.remove(product)
+        with self._state_lock:
+            if self._products.pop(id(product), None) is None:
+                return
+            same_name = self._by_name[product.name]
+            same_name.remove(product)
+            if not same_name:
+                del self._by_name[product.name]
+            self._search_index.remove(product)
+            product.remove_listener(self._listener)
+            self._record(id(product), None)
+            self._publish('remove', product)
+
+    def subscribe(self, subscriber: Callable[[str, Product], None]) -> None:
+        """
+        Registers a callback invoked as subscriber(event, product) for every
+        inventory change: 'add' and 'remove', plus the product attribute
+        events 'quantity', 'active', 'promotion' and 'price'. A bulk_update
+        is delivered as a single 'bulk' event whose second argument is the
+        tuple of changed products. See changefeed.py for a queued stream
+        built on top of this.
+
+        Subscribers run under the store's state lock, so they see changes in
+        a single global order and must be quick.
+        """
+        with self._state_lock:
+            self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Callable[[str, Product], None]) -> None:
+        """Unregisters a callback previously passed to subscribe."""
+        with self._state_lock:
+            self._subscribers.remove(subscriber)
+
+    def add_ack_hook(self, hook: Callable[[], None]) -> None:
+        """
+        Registers a callback that place_order, checkout and bulk_update call
+        after releasing the store's locks and before returning. The journal
+        uses it to hold an order back until its log records are on disk.
+        """
+        with self._state_lock:
+            self._ack_hooks = self._ack_hooks + (hook,)
+
+    def remove_ack_hook(self, hook: Callable[[], None]) -> None:
+        """Unregisters a callback previously passed to add_ack_hook."""
+        with self._state_lock:
+            self._ack_hooks = tuple(h for h in self._ack_hooks if h is not hook)
+
+    def acknowledge(self) -> None:
+        """Runs the ack hooks for the changes the calling thread has just made; call without holding store locks."""
+        for hook in self._ack_hooks:
+            hook()
+
+    def inventory_lock(self) -> threading.RLock:
+        """
+        Returns the lock that orders inventory changes. Holding it gives a
+        consistent view of the catalogue and blocks subscriber notifications.
+        """
+        return self._state_lock
+
+    def _publish(self, event: str, product: Product) -> None:
+        """Forwards an inventory change to every subscriber."""
+        for subscriber in self._subscribers:
+            subscriber(event, product)
+
+    def _on_product_changed(self, product: Product, attribute: str) -> None:
+        """Product listener that records the change for the next snapshot."""
+        with self._state_lock:
+            self._record(id(product), product)
+            self._publish(attribute, product)
+
+    @contextmanager
+    def _batched(self):
+        """
+        Defers snapshot publication for the current thread's changes until the
+        outermost batch exits, so they appear in a single new version.
+        """
+        local = self._local
+        depth = getattr(local, 'depth', 0)
+        if depth == 0:
+            local.changes = {}
+        local.depth = depth + 1
+        try:
+            yield
+        finally:
+            local.depth = depth
+            if depth == 0:
+                changes, local.changes = local.changes, None
+                if changes:
+                    self._commit(changes)
+
+    def _record(self, key: int, product: Optional[Product]) -> None:
+        """Records a changed (or, with None, removed) product, publishing at once outside a batch."""
+        if getattr(self._local, 'depth', 0):
+            self._local.changes[key] = product
+        else:
+            self._commit({key: product})
+
+    def _commit(self, changes: dict[int, Optional[Product]]) -> None:
+        """Publishes the next snapshot with the current state of the changed products."""
+        with self._state_lock:
+            snapshot = self._snapshot
+            replaced: dict[int, ProductState] = {}
+            added: list[ProductState] = []
+            removed = []
+            for key, product in changes.items():
+                if product is None:
+                    if key in self._slots:
+                        removed.append(self._slots.pop(key))
+                elif key in self._products:
+                    position = self._slots.get(key)
+                    if position is None:
+                        self._slots[key] = snapshot.span + len(added)
+                        added.append(ProductState.of(product))
+                    else:
+                        replaced[position] = ProductState.of(product)
+            if replaced or added or removed:
+                snapshot = snapshot.evolve(replaced, added, removed)
+            if snapshot.tombstones > max(CHUNK_SIZE, len(snapshot)):
+                # Renumbering is O(n), but only after as many removals as live products
+                snapshot = snapshot.compacted()
+                self._slots = {id(state.product): index for index, state in enumerate(snapshot)}
+            self._snapshot = snapshot
+
+    def snapshot(self) -> InventorySnapshot:
+        """
+        Returns the current inventory version (see snapshot.py).
+
+        The snapshot never changes, so it can be read without locking while
+        orders continue; an order's changes appear together in one version.
+        """
+        if self._pending is not None:
+            self.materialize_all()
+        return self._snapshot
+
+    def get_product(self, name: str) -> Optional[Product]:
+        """Returns the first active product with the given name, or None."""
+        with self._state_lock:
+            while True:
+                for product in self._by_name.get(name, ()):
+                    if product.is_active():
+                        return product
+                if not self._materialize_next():
+                    return None
+
+    def search(self, query: str, limit: Optional[int] = 10, active_only: bool = True) -> list[Product]:
+        """
+        Finds products whose name tokens start with every term of the query (see search.py).
+
+        Args:
+            query: Words or word prefixes, e.g. "pix 7" for "Google Pixel 7".
+            limit: Most products returned; None for all matches.
+            active_only: Whether to skip inactive products.
+
+        Returns:
+            Matching products, grouped by matching name token in sorted order.
+        """
+        with self._state_lock:
+            self.materialize_all()
+            matches = self._search_index.search(query)
+            if active_only:
+                matches = (product for product in matches if product.is_active())
+            return list(islice(matches, limit))
 
     def get_total_quantity(self) -> int:
-        """Calculates and returns the total quantity of all stockable products."""
-        total_quantity = sum(
-            product.get_quantity() for product in self.products
-            if product.is_active() and not isinstance(product, NonStockedProduct)
-        )
-        return total_quantity
+        """Returns the total quantity of all active stockable products, as of the current snapshot."""
+        return self.snapshot().total_quantity
 
     def get_all_active_products(self) -> list[Product]:
-        """Returns a copy of the list of all active products in the store."""
-        return [product for product in self.products if product.is_active()]
+        """Returns a list of all active products in the store, as of the current snapshot."""
+        return [state.product for state in self.snapshot().active()]
 
     def get_all_products(self) -> list[Product]:
         """Returns a list of all products, active or inactive, in the store."""
-        return self.products
+        return self.snapshot().products()
 
-    def order(self, shopping_list: list[tuple[Product, int]]) -> float:
-        """Processes an order and returns the total price.
+    def get_product_count(self) -> int:
+        """Returns the number of products, active or inactive, in the store."""
+        return len(self.snapshot())
+
+    def get_product_at(self, index: int) -> Optional[Product]:
+        """Returns the product at a 0-based position in store order, or None if out of range."""
+        snapshot = self.snapshot()
+        return snapshot[index].product if 0 <= index < len(snapshot) else None
+
+    def get_products_page(self, page: int, page_size: int) -> list[Product]:
+        """Returns one 0-based page of products in store order."""
+        return [state.product for state in self.snapshot().page(page * page_size, page_size)]
+
+    def cart_total(self, lines: list[tuple[Product, int]], line_total: float) -> float:
+        """
+        Applies the store's cart promotions to lines already priced one by one.
+
+        Args:
+            lines: The (product, quantity) lines that were sold.
+            line_total: Their total with product promotions only.
+
+        Returns:
+            The cheaper of line_total and the cart price (see cart_promotions.py).
+        """
+        engine = self.cart_promotions
+        if engine is None or not lines:
+            return line_total
+        return min(line_total, engine.price(lines).total)
+
+    def quote(self, shopping_list: list[tuple[Product, int]]) -> Quote:
+        """
+        Prices a shopping list like place_order, without touching stock (see quotes.py).
+
+        A cached quote for the same lines is returned while the products and
+        cart promotions it was computed from are unchanged.
 
         Args:
             shopping_list: A list of tuples, where each tuple contains a product and its quantity.
 
         Returns:
-            The total price of the order.
+            The per-line prices and errors and the total.
         """
-        total_price = 0.0
+        key = tuple((requested_product.name, quantity) for requested_product, quantity in shopping_list)
+        quote = self.quotes.get(key)
+        if quote is not None and self._is_current(quote):
+            self.quotes.record(hit=True)
+            return quote
+        self.quotes.record(hit=False)
+        quote = self._price(shopping_list)
+        self.quotes.put(key, quote)
+        return quote
+
+    def _is_current(self, quote: Quote) -> bool:
+        """Returns whether nothing a quote was computed from has changed."""
+        engine, version = quote.rules
+        if engine is not self.cart_promotions or (engine is not None and engine.version != version):
+            return False
+        for name, product, product_version in quote.basis:
+            if self.get_product(name) is not product or (product is not None and product.version != product_version):
+                return False
+        return True
+
+    def _price(self, shopping_list: list[tuple[Product, int]]) -> Quote:
+        """Computes a fresh quote, with the same line checks and messages as place_order."""
+        engine = self.cart_promotions
+        rules = (engine, engine.version if engine is not None else 0)
+        lines, basis, sold = self.allocate(shopping_list, {})
+        line_total = sum(line.price for line in lines)
+        return Quote(tuple(lines), self.cart_total(sold, line_total), tuple(basis), rules)
+
+    def allocate(self, shopping_list: list[tuple[Product, int]], remaining: dict[Product, int]) \
+            -> tuple[list[QuoteLine], list[tuple[str, Optional[Product], int]], list[tuple[Product, int]]]:
+        """
+        Prices a shopping list line by line against stock, without touching it.
+
+        This is the pricing path shared by quotes and OrderBatcher; its checks
+        and messages match place_order.
+
+        Args:
+            shopping_list: A list of tuples, where each tuple contains a product and its quantity.
+            remaining: Stock left per product by lines allocated earlier, updated
+                in place. A product missing from it has its current quantity.
+
+        Returns:
+            One QuoteLine per line; the (name, product or None, product version)
+            each line was priced from; and the (product, quantity) lines sold.
+        """
+        lines = []
+        basis = []
+        sold = []
         for requested_product, quantity in shopping_list:
-            # Find the product in the store
-            product = next(
-                (p for p in self.products if p.name == requested_product.name and p.is_active()), None
-            )
+            name = requested_product.name
+            product = self.get_product(name)
+            # Versions are read before anything they guard, so a change made
+            # while pricing leaves a quote stale rather than wrong.
+            basis.append((name, product, product.version if product is not None else 0))
+            stocked = product is not None and not isinstance(product, NonStockedProduct)
+            available = remaining.get(product, product.quantity) if stocked else None
 
-            if product is None:
-                print(f"Product {requested_product.name} is not available.")
+            # An earlier line sells out the product, as it would in place_order
+            if product is None or available == 0:
+                lines.append(QuoteLine(name, quantity, 0.0, f"Product {name} is not available."))
                 continue
-
             if quantity <= 0:
-                print(f"Invalid quantity for {requested_product.name}.")
+                lines.append(QuoteLine(name, quantity, 0.0, f"Invalid quantity for {name}."))
                 continue
-
             try:
-                total_price += product.buy(quantity)
+                if stocked and quantity > available:
+                    # Limits are checked before stock, as in LimitedProduct.buy
+                    product.price_for(quantity)
+                    raise ValueError("Not enough quantity available.")
+                price = product.price_for(quantity)
             except ValueError as e:
-                print(f"Error with product {requested_product.name}: {e}")
+                lines.append(QuoteLine(name, quantity, 0.0, f"Error with product {name}: {e}"))
+                continue
+
+            if stocked:
+                remaining[product] = available - quantity
+            lines.append(QuoteLine(name, quantity, price, None))
+            sold.append((product, quantity))
+        return lines, basis, sold
+
+    def checkout(self, shopping_list: list[tuple[Product, int]]) -> OrderResult:
+        """
+        Places an order from its quote, reusing a cached one when it is still valid.
+
+        The quote is validated under the order's stock locks, so it cannot go
+        stale before the stock it priced is taken. The result matches what
+        place_order would return.
+
+        Args:
+            shopping_list: A list of tuples, where each tuple contains a product and its quantity.
+
+        Returns:
+            The total price of the order and the messages for rejected lines.
+        """
+        registry = metrics.REGISTRY
+        started = perf_counter() if registry is not None else 0.0
+        with self.lock_products([requested_product.name for requested_product, _ in shopping_list]), \
+                self._batched():
+            quote = self.quote(shopping_list)
+            sold: dict[int, list] = {}
+            for (name, product, _), line in zip(quote.basis, quote.lines):
+                if line.error is None and not isinstance(product, NonStockedProduct):
+                    sold.setdefault(id(product), [product, 0])[1] += line.quantity
+            for product, quantity in sold.values():
+                product.set_quantity(product.quantity - quantity)
+            # Lines are priced and sold together, so each gets an even share of the time
+            settled = perf_counter() if registry is not None else 0.0
+        self.acknowledge()
+
+        if registry is not None:
+            per_line = (settled - started) / max(1, len(quote.lines))
+            for line in quote.lines:
+                _record_line(registry, line, per_line)
+            registry.inc('orders_total')
+            registry.inc('order_lines_total', len(shopping_list))
+            registry.observe('order', perf_counter() - started)
+        return OrderResult(quote.total, quote.errors)
+
+    def bulk_update(self, updates: Iterable[tuple]) -> int:
+        """
+        Applies many stock, price and promotion changes at once, all or nothing.
+
+        Every update is validated before anything changes. The changes are
+        then written in one pass, with price cache invalidation, snapshot
+        publication and subscriber notification done once for the batch:
+        subscribers get one 'bulk' event with the changed products instead
+        of per-product events. A product whose stock changes is active when
+        it has stock left and inactive otherwise. Orders wait while the
+        update runs.
+
+        Args:
+            updates: StockUpdate or (name, quantity_delta, price, promotion)
+                tuples; trailing fields may be left out. Several updates to
+                one product are applied in order.
+
+        Returns:
+            int: The number of products changed.
+
+        Raises:
+            ValueError: If an update names an unknown product, changes the
+                stock of a non-stocked product, takes stock below zero or
+                sets a negative price. Nothing is applied.
+        """
+        with _StripeGuard(self._stripes), self._state_lock:
+            self.materialize_all()
+            # Product identity -> [product, quantity, price, promotion] after the updates so far
+            planned: dict[int, list] = {}
+            for index, update in enumerate(updates):
+                name, delta, price, promotion = StockUpdate(*update)
+                product = self._updatable(name)
+                if product is None:
+                    raise ValueError(f"Update {index}: product {name} is not in the store.")
+                entry = planned.get(id(product))
+                if entry is None:
+                    entry = planned[id(product)] = [product, product.quantity, product.price, product.promotion]
+                if delta:
+                    if isinstance(product, NonStockedProduct):
+                        raise ValueError(f"Update {index}: {name} is not stocked.")
+                    if entry[1] + delta < 0:
+                        raise ValueError(f"Update {index}: not enough quantity of {name}.")
+                    entry[1] += delta
+                if price is not None:
+                    if price < 0:
+                        raise ValueError(f"Update {index}: price of {name} cannot be negative.")
+                    entry[2] = price
+                if promotion is not UNCHANGED:
+                    entry[3] = promotion
+
+            changed = []
+            discarded = set()
+            with self._batched():
+                for product, quantity, price, promotion in planned.values():
+                    if quantity == product.quantity and price == product.price and promotion is product.promotion:
+                        continue
+                    if price != product.price or promotion is not product.promotion:
+                        discarded.add((product.promotion, product.price))
+                    product._apply_update(quantity, price, promotion)
+                    self._record(id(product), product)
+                    changed.append(product)
+            PRICE_CACHE.discard_many(discarded)
+            if changed:
+                self._publish('bulk', tuple(changed))
+        self.acknowledge()
+        return len(changed)
+
+    def _updatable(self, name: str) -> Optional[Product]:
+        """Returns the product a bulk update of a name applies to: the first active one, else the first."""
+        same_name = self._by_name.get(name)
+        if not same_name:
+            return None
+        for product in same_name:
+            if product.is_active():
+                return product
+        return same_name[0]
+
+    def _stripes_for(self, names) -> list[threading.Lock]:
+        """Returns the stock locks covering the given product names, in acquisition order."""
+        stripe_count = len(self._stripes)
+        return [self._stripes[i] for i in sorted({hash(name) % stripe_count for name in names})]
+
+    def lock_products(self, names):
+        """
+        Returns a context manager holding the stock locks for the given product names.
+
+        Locks are taken in a global order, so callers holding several of
+        them never deadlock with one another.
+        """
+        return _StripeGuard(self._stripes_for(names))
+
+    def order(self, shopping_list: list[tuple[Product, int]]) -> float:
+        """Processes an order and returns the total price.
+
+        Args:
+            shopping_list: A list of tuples, where each tuple contains a product and its quantity.
+
+        Returns:
+            The total price of the order.
+        """
+        result = self.place_order(shopping_list)
+        for error in result.errors:
+            print(error)
+        return result.total
+
+    def place_order(self, shopping_list: list[tuple[Product, int]]) -> OrderResult:
+        """Processes an order like order(), but returns line errors instead of printing them.
+
+        Args:
+            shopping_list: A list of tuples, where each tuple contains a product and its quantity.
+
+        Returns:
+            The total price of the order and the messages for rejected lines.
+        """
+        registry = metrics.REGISTRY
+        started = perf_counter() if registry is not None else 0.0
+        total_price = 0.0
+        errors = []
+        bought = []
+        # The order's changes are published as one snapshot before its locks are released
+        with self.lock_products([requested_product.name for requested_product, _ in shopping_list]), \
+                self._batched():
+            for requested_product, quantity in shopping_list:
+                name = requested_product.name
+                # Find the product in the store
+                product = self.get_product(name)
+                line_started = perf_counter() if registry is not None else 0.0
+                price = 0.0
+                error = None
+
+                if product is None:
+                    error = f"Product {name} is not available."
+                elif quantity <= 0:
+                    error = f"Invalid quantity for {name}."
+                else:
+                    try:
+                        price = product.buy(quantity)
+                    except ValueError as e:
+                        error = f"Error with product {name}: {e}"
+
+                if registry is not None:
+                    _record_line(registry, QuoteLine(name, quantity, price, error), perf_counter() - line_started)
+                if error is not None:
+                    errors.append(error)
+                    continue
+                total_price += price
+                bought.append((product, quantity))
+        self.acknowledge()
+
+        total_price = self.cart_total(bought, total_price)
+
+        if registry is not None:
+            registry.inc('orders_total')
+            registry.inc('order_lines_total', len(shopping_list))
+            registry.observe('order', perf_counter() - started)
+        return OrderResult(total_price, errors)
+
+
+class _StripeGuard:
+    """Context manager that holds a sorted list of locks."""
+    __slots__ = ('_locks',)
+
+    def __init__(self, locks: list[threading.Lock]):
+        self._locks = locks
+
+    def __enter__(self):
+        for lock in self._locks:
+            lock.acquire()
+        return self
 
-        return total_price
+    def __exit__(self, *exc_info):
+        for lock in reversed(self._locks):
+            lock.release()
@@ -0,0 +1,98 @@
+import pytest
+from cart_promotions import Bundle, BuyXGetY, CartPromotionEngine, SpendAndSave
+from products import Product
+from promotions import Buy2Get1Free
+from store import Store
+
+
+def make_products():
+    return {
+        "laptop": Product("Laptop", price=1000, quantity=10),
+        "mouse": Product("Mouse", price=50, quantity=100),
+        "bag": Product("Bag", price=80, quantity=100),
+        "cable": Product("Cable", price=10, quantity=100, promotion=Buy2Get1Free("Buy 2, get 1 free")),
+    }
+
+
+def test_bundle_and_buy_x_get_y():
+    """Test that bundles and cross-product rules price the units they take."""
+    p = make_products()
+    engine = CartPromotionEngine([
+        Bundle("Laptop kit", {"Laptop": 1, "Bag": 1}, price=1030),
+        BuyXGetY("Free mouse with a laptop", buy="Laptop", get="Mouse"),
+    ])
+    price = engine.price([(p["laptop"], 2), (p["bag"], 1), (p["mouse"], 1)])
+    # One laptop with the bag as a kit, the other with a free mouse
+    assert price.total == 1030 + 1000
+    assert sorted(price.applied) == [("Free mouse with a laptop", 1), ("Laptop kit", 1)]
+
+
+def test_overlapping_rules_pick_cheapest_combination():
+    """Test that a unit is used by one rule only, and the cheaper combination wins."""
+    p = make_products()
+    engine = CartPromotionEngine([
+        Bundle("Mouse and bag", {"Mouse": 1, "Bag": 1}, price=100),
+        BuyXGetY("Half-price bag with a laptop", buy="Laptop", get="Bag", percent=50),
+    ])
+    price = engine.price([(p["laptop"], 1), (p["mouse"], 1), (p["bag"], 1)])
+    # Bundle saves 30, half-price bag saves 40; they compete for the single bag
+    assert price.total == 1000 + 40 + 50
+    assert price.applied == [("Half-price bag with a laptop", 1)]
+
+
+def test_product_promotions_price_leftover_units():
+    """Test that units no rule takes keep their product promotion, which competes with the rules."""
+    p = make_products()
+    engine = CartPromotionEngine([Bundle("Cable pair", {"Cable": 2}, price=19)])
+    # Buy 2, get 1 free prices 3 cables at 20; the pair bundle would cost 19 + 10
+    assert engine.price([(p["cable"], 3)]).total == 20
+    assert engine.price([(p["cable"], 2)]).total == 19
+
+
+def test_only_indexed_candidates_are_checked():
+    """Test that rules whose products are not all in the cart are not candidates."""
+    engine = CartPromotionEngine([Bundle("Kit", {"Laptop": 1, "Bag": 1}, price=1),
+                                  BuyXGetY("Mouse deal", buy="Mouse", get="Cable")])
+    assert engine.candidates({"Laptop": 1}) == []
+    assert [rule.name for rule in engine.candidates({"Mouse": 2, "Cable": 1})] == ["Mouse deal"]
+
+
+def test_spend_and_save_uses_best_threshold():
+    """Test that the best saving whose threshold the subtotal reaches is applied once."""
+    p = make_products()
+    engine = CartPromotionEngine([SpendAndSave("Save 10", 100, 10), SpendAndSave("Save 50", 500, 50),
+                                  SpendAndSave("Save 5", 200, 5)])
+    assert engine.price([(p["mouse"], 3)]).total == 140
+    assert engine.price([(p["laptop"], 1)]).total == 950
+    assert engine.price([(p["mouse"], 1)]).applied == []
+
+
+def test_greedy_fallback_for_large_carts(monkeypatch):
+    """Test that carts beyond the exhaustive search limit are still priced sensibly."""
+    import cart_promotions
+    monkeypatch.setattr(cart_promotions, "MAX_COMBINATIONS", 1)
+    p = make_products()
+    engine = CartPromotionEngine([BuyXGetY("Free mouse with a laptop", buy="Laptop", get="Mouse")])
+    assert engine.price([(p["laptop"], 3), (p["mouse"], 2)]).total == 3000
+
+
+def test_store_orders_apply_cart_rules(catalog):
+    """Test that Store.order applies cart rules to the lines it sold and never charges more."""
+    p = make_products()
+    shipping, = catalog("Shipping")
+    engine = CartPromotionEngine([BuyXGetY("Free mouse with a laptop", buy="Laptop", get="Mouse")])
+    store = Store(list(p.values()) + [shipping], cart_promotions=engine)
+    result = store.place_order([(p["laptop"], 1), (p["mouse"], 1), (shipping, 1), (shipping, 1)])
+    # Each shipping line is within its limit; combining them for cart pricing is fine
+    assert result == (1000 + 10 + 10, [])
+    assert p["mouse"].get_quantity() == 99
+
+
+def test_invalid_rules_are_rejected():
+    """Test that rule constructors validate their details."""
+    with pytest.raises(ValueError):
+        Bundle("Empty", {}, price=1)
+    with pytest.raises(ValueError):
+        BuyXGetY("Self", buy="Mouse", get="Mouse")
+    with pytest.raises(ValueError):
+        SpendAndSave("Too much", threshold=10, saving=20)
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+
+import pytest
+from changefeed import ChangeFeed
+from products import Product
+from promotions import PercentageDiscount
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store("MacBook Air M2", "Google Pixel 7", quantities={"MacBook Air M2": 10})
+
+
+def kinds(events):
+    return [(event.kind, event.name, event.delta, event.value) for event in events]
+
+
+def test_feed_publishes_every_kind_of_change(store):
+    """Test that orders, activity, promotions, prices and add/remove become change events."""
+    feed = ChangeFeed(store)
+    subscription = feed.subscribe()
+    macbook = store.get_product("MacBook Air M2")
+
+    store.order([(macbook, 10)])
+    macbook.set_quantity(5)
+    macbook.activate()
+    macbook.set_promotion(PercentageDiscount("30% off", percent=30))
+    macbook.set_price(1400)
+    shipping = Product("Shipping", price=10, quantity=100)
+    store.add_product(shipping)
+    store.remove_product(shipping)
+
+    assert kinds(subscription.get_batch(max_items=100, timeout=0)) == [
+        ("quantity", "MacBook Air M2", -10, 0),
+        ("deactivate", "MacBook Air M2", 0, None),
+        ("quantity", "MacBook Air M2", 5, 5),
+        ("activate", "MacBook Air M2", 0, None),
+        ("promotion", "MacBook Air M2", 0, "30% off"),
+        ("price", "MacBook Air M2", 0, 1400),
+        ("add", "Shipping", 0, 100),
+        ("remove", "Shipping", 0, None),
+    ]
+
+
+def test_low_stock_triggers_once_per_crossing(store):
+    """Test that low_stock fires when the quantity falls below the threshold, not on every sale."""
+    feed = ChangeFeed(store, low_stock_threshold=100)
+    feed.set_low_stock_threshold("MacBook Air M2", 3)
+    subscription = feed.subscribe(kinds=["low_stock"])
+    pixel = store.get_product("Google Pixel 7")
+
+    store.order([(pixel, 100)])
+    store.order([(pixel, 100)])
+    store.order([(pixel, 10), (store.get_product("MacBook Air M2"), 8)])
+    assert kinds(subscription.get_batch(timeout=0)) == [
+        ("low_stock", "Google Pixel 7", 0, 50),
+        ("low_stock", "MacBook Air M2", 0, 2),
+    ]
+
+
+def test_bounded_queue_drops_oldest_and_batches(store):
+    """Test that a full queue keeps the newest events and counts what it dropped."""
+    subscription = ChangeFeed(store).subscribe(max_queued=3)
+    pixel = store.get_product("Google Pixel 7")
+    for _ in range(5):
+        store.order([(pixel, 1)])
+
+    assert subscription.dropped == 2
+    assert [event.value for event in subscription.get_batch(max_items=2, timeout=0)] == [247, 246]
+    assert [event.value for event in subscription.get_batch(timeout=0)] == [245]
+    assert subscription.get_batch(timeout=0) == []
+
+
+def test_threaded_consumer_waits_for_events(store):
+    """Test that a consumer thread blocked in get_batch is woken by a change and by close."""
+    feed = ChangeFeed(store)
+    subscription = feed.subscribe()
+    received = []
+
+    def consume():
+        while batch := subscription.get_batch(timeout=5):
+            received.extend(batch)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    store.order([(store.get_product("Google Pixel 7"), 1)])
+    feed.close()
+    consumer.join(timeout=5)
+    assert not consumer.is_alive()
+    assert kinds(received) == [("quantity", "Google Pixel 7", -1, 249)]
+
+
+def test_async_consumer(store):
+    """Test that an asyncio consumer receives events published from another thread."""
+    feed = ChangeFeed(store)
+    subscription = feed.subscribe(kinds=["quantity"])
+
+    async def main():
+        received = []
+
+        async def consume():
+            async for batch in subscription:
+                received.extend(batch)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        pixel = store.get_product("Google Pixel 7")
+        await asyncio.to_thread(lambda: [store.order([(pixel, 1)]) for _ in range(3)])
+        while len(received) < 3:
+            await asyncio.sleep(0.01)
+        subscription.close()
+        await asyncio.wait_for(task, timeout=5)
+        return received
+
+    received = asyncio.run(main())
+    assert [event.value for event in received] == [249, 248, 247]
+    assert [event.sequence for event in received] == sorted(event.sequence for event in received)
+
+
+def test_bulk_update_is_one_event(store):
+    """Test that a bulk update is published as one event with per-product changes, plus low-stock crossings."""
+    feed = ChangeFeed(store, low_stock_threshold=5)
+    subscription = feed.subscribe()
+    store.bulk_update([("MacBook Air M2", -8), ("Google Pixel 7", 50, 450.0)])
+
+    bulk, low_stock = subscription.get_batch(timeout=1)
+    assert (bulk.kind, bulk.delta) == ("bulk", 42)
+    assert bulk.value == (("MacBook Air M2", -8, 2, True, 1450, None), ("Google Pixel 7", 50, 300, True, 450.0, None))
+    assert (low_stock.kind, low_stock.name, low_stock.value) == ("low_stock", "MacBook Air M2", 2)
+
+
+def test_bulk_update_reports_activation(store):
+    """Test that a bulk update that empties or restocks a product reports its new active flag."""
+    feed = ChangeFeed(store)
+    subscription = feed.subscribe()
+    store.bulk_update([("MacBook Air M2", -10)])
+    store.bulk_update([("MacBook Air M2", 3), ("Google Pixel 7", 0, 450.0)])
+
+    emptied, restocked = subscription.get_batch(timeout=1)
+    assert emptied.value == (("MacBook Air M2", -10, 0, False, 1450, None),)
+    assert restocked.value == (("MacBook Air M2", 3, 3, True, 1450, None), ("Google Pixel 7", 0, 250, True, 450.0, None))
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from products import Product, NonStockedProduct, LimitedProduct, UNLIMITED
+from records import write_catalog
+from store import Store
+
+
+def write_csv(path, count):
+    lines = ["name,price,quantity,kind,maximum"]
+    lines += [f"SKU-{i},{i + 1},{i % 5},stocked," for i in range(count)]
+    lines += ["Windows License,125,,non_stocked,", "Shipping,10,250,limited,1"]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_csv_store_materializes_lazily(tmp_path):
+    """Test that a CSV-backed store serves early products before later chunks are built."""
+    feed = tmp_path / "catalog.csv"
+    write_csv(feed, 95)
+    store = Store.from_csv(str(feed), chunk_size=10)
+
+    assert store.get_product("SKU-1").price == 2
+    assert len(store._products) == 10  # Only the first chunk exists so far
+
+    assert isinstance(store.get_product("Shipping"), LimitedProduct)
+    assert store.get_product("Windows License").get_quantity() == UNLIMITED
+    assert store.get_product("SKU-0") is None  # Quantity 0 means inactive, as in Product.__init__
+    assert store.get_total_quantity() == sum(i % 5 for i in range(95)) + 250
+    assert len(store.get_all_products()) == 97
+
+
+def test_jsonl_store_orders(tmp_path):
+    """Test that a JSONL-backed store takes orders like any other."""
+    feed = tmp_path / "catalog.jsonl"
+    feed.write_text("\n".join(json.dumps(row) for row in [
+        {"name": "MacBook Air M2", "price": 1450, "quantity": 100},
+        {"name": "Shipping", "price": 10, "quantity": 250, "kind": "limited", "maximum": 1},
+    ]) + "\n")
+    store = Store.from_jsonl(str(feed))
+    assert store.order([(Product("MacBook Air M2", 1, 1), 2), (Product("Shipping", 1, 1), 1)]) == 2910
+
+
+def test_invalid_rows_are_reported_in_bulk(tmp_path):
+    """Test that every invalid row is reported before any product is built."""
+    feed = tmp_path / "catalog.csv"
+    feed.write_text("name,price,quantity,kind,maximum\n"
+                    "A,1,1,,\n,1,1,,\nB,-1,1,,\nC,1,1,limited,0\n")
+    with pytest.raises(ValueError, match="rows 1, 2, 3"):
+        Store.from_csv(str(feed))
+
+
+def test_jsonl_non_object_line_is_rejected(tmp_path):
+    """Test that a valid JSON line that is not an object raises ValueError with its line number."""
+    feed = tmp_path / "catalog.jsonl"
+    feed.write_text('{"name": "MacBook Air M2", "price": 1450, "quantity": 100}\n[1, 2]\n')
+    with pytest.raises(ValueError, match="line 2"):
+        Store.from_jsonl(str(feed))
+
+
+def test_binary_catalog_round_trip(tmp_path):
+    """Test that a binary catalog reloads to the same products."""
+    # Records store prices as doubles
+    products = [Product("MacBook Air M2", price=1450.0, quantity=100),
+                NonStockedProduct("Windows License", price=125.0),
+                LimitedProduct("Shipping", price=10.0, quantity=250, maximum=1)]
+    path = tmp_path / "catalog.bin"
+    write_catalog(str(path), products)
+    store = Store.from_binary(str(path), chunk_size=2)
+    assert [p.show() for p in store.get_all_products()] == [p.show() for p in products]
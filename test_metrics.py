@@ -0,0 +1,83 @@
+import pytest
+import metrics
+from products import Product
+from promotions import PercentageDiscount
+
+
+@pytest.fixture
+def registry():
+    yield metrics.enable()
+    metrics.disable()
+
+
+@pytest.fixture
+def make_store(make_store):
+    return lambda: make_store("MacBook Air M2", "Shipping", quantities={"MacBook Air M2": 3},
+                              promotions={"MacBook Air M2": PercentageDiscount("30% off", percent=30)})
+
+
+def test_disabled_by_default(make_store):
+    """Test that nothing is recorded while instrumentation is off."""
+    assert metrics.REGISTRY is None
+    make_store().order([(Product("MacBook Air M2", 1, 1), 1)])
+    assert metrics.REGISTRY is None
+
+
+def test_order_metrics(registry, make_store):
+    """Test that orders, lines, rejections, promotions, latencies and hot items are recorded."""
+    store = make_store()
+    macbook, shipping = store.get_all_products()
+    store.place_order([(macbook, 2), (shipping, 2), (Product("Unknown", 1, 1), 1), (shipping, 0)])
+    store.place_order([(macbook, 5), (shipping, 1)])
+
+    counters = registry.snapshot()['counters']
+    assert counters['orders_total'] == 2
+    assert counters['order_lines_total'] == 6
+    assert counters['rejections_total{reason="over_limit"}'] == 1
+    assert counters['rejections_total{reason="not_available"}'] == 1
+    assert counters['rejections_total{reason="invalid_quantity"}'] == 1
+    assert counters['rejections_total{reason="insufficient_stock"}'] == 1
+    assert counters['promotion_applications_total{promotion="30% off"}'] == 1
+    snapshot = registry.snapshot()
+    assert snapshot['latency']['order']['count'] == 2
+    assert snapshot['latency']['buy']['count'] == 2
+    assert snapshot['hot_items'] == [("MacBook Air M2", 2), ("Shipping", 1)]
+
+
+def test_checkout_metrics_match_place_order(registry, make_store):
+    """Test that checkout records the same rejections, latencies and sales as place_order."""
+    store = make_store()
+    macbook, shipping = store.get_all_products()
+    store.checkout([(macbook, 2), (shipping, 2), (Product("Unknown", 1, 1), 1), (shipping, 0)])
+
+    snapshot = registry.snapshot()
+    counters = snapshot['counters']
+    assert counters['orders_total'] == 1
+    assert counters['rejections_total{reason="over_limit"}'] == 1
+    assert counters['rejections_total{reason="not_available"}'] == 1
+    assert counters['rejections_total{reason="invalid_quantity"}'] == 1
+    assert snapshot['latency']['order']['count'] == 1
+    assert snapshot['latency']['buy']['count'] == 1
+    assert snapshot['hot_items'] == [("MacBook Air M2", 2)]
+
+
+def test_prometheus_export(registry, tmp_path, make_store):
+    """Test that the Prometheus text export contains counters and histograms."""
+    store = make_store()
+    store.place_order([(store.get_all_products()[1], 1)])
+    path = tmp_path / "store.prom"
+    registry.write_prometheus(str(path))
+    text = path.read_text()
+    assert "bestbuy_orders_total 1" in text
+    assert 'bestbuy_operation_seconds_count{operation="order"} 1' in text
+    assert 'bestbuy_hot_item_units{sku="Shipping"} 1' in text
+
+
+def test_hot_items_are_bounded():
+    """Test that the hot-item sketch keeps at most its capacity and retains heavy hitters."""
+    hot = metrics.HotItems(capacity=3)
+    for i in range(100):
+        hot.add(f"SKU-{i}")
+        hot.add("HOT", 5)
+    assert len(hot.counts) == 3
+    assert hot.top(1)[0][0] == "HOT"
@@ -0,0 +1,96 @@
+import random
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from products import Product
+from promotions import SecondItemHalfPrice
+from order_batcher import OrderBatcher
+from store import Store
+
+
+@pytest.fixture
+def make_store(make_store):
+    # Little stock, so random orders sell products out
+    return lambda: make_store(quantities={"MacBook Air M2": 10, "Bose QuietComfort Earbuds": 5, "Shipping": 8},
+                              promotions={"MacBook Air M2": SecondItemHalfPrice("Second item at half price")})
+
+
+def make_orders(store, count=200):
+    rng = random.Random(7)
+    names = [p.name for p in store.get_all_products()] + ["Unknown"]
+    return [[(Product(rng.choice(names), 1, 1), rng.randint(-1, 3)) for _ in range(rng.randint(1, 3))]
+            for _ in range(count)]
+
+
+def test_batched_results_match_sequential_orders(make_store):
+    """Test that batched settlement gives every order the same result as sequential place_order calls."""
+    sequential_store, batched_store = make_store(), make_store()
+    orders = make_orders(sequential_store)
+    expected = [sequential_store.place_order(shopping_list) for shopping_list in orders]
+
+    with OrderBatcher(batched_store, max_batch=16, max_wait=0.01) as batcher:
+        futures = [batcher.submit(shopping_list) for shopping_list in orders]
+    assert [future.result() for future in futures] == expected
+    assert [(p.get_quantity(), p.is_active()) for p in batched_store.get_all_products()] == \
+        [(p.get_quantity(), p.is_active()) for p in sequential_store.get_all_products()]
+    assert batched_store.get_total_quantity() == sequential_store.get_total_quantity()
+
+
+def test_batcher_never_oversells_under_concurrency():
+    """Test that concurrent callers going through the batcher never oversell."""
+    product = Product("Flash Sale", price=10, quantity=500)
+    store = Store([product])
+    revenue = []
+
+    with OrderBatcher(store) as batcher:
+        def buyer():
+            for _ in range(100):
+                revenue.append(batcher.submit([(product, 1)]).result().total)
+
+        threads = [threading.Thread(target=buyer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert sum(revenue) == 500 * 10
+    assert product.get_quantity() == 0 and not product.is_active()
+
+
+def test_submit_racing_close_never_hangs(make_store):
+    """Test that every submitted order resolves, and submits after close are refused."""
+    store = make_store()
+    batcher = OrderBatcher(store)
+    futures = []
+    refused = []
+
+    def submitter():
+        for _ in range(200):
+            try:
+                futures.append(batcher.submit([(Product("Windows License", 1, 1), 1)]))
+            except RuntimeError:
+                refused.append(True)
+
+    threads = [threading.Thread(target=submitter) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    batcher.close()
+    for thread in threads:
+        thread.join()
+
+    for future in futures:
+        assert future.result(timeout=5).total == 125
+    assert len(futures) + len(refused) == 800
+
+
+def test_orders_left_behind_stop_are_failed(make_store):
+    """Test that orders still queued when the worker stops fail instead of hanging."""
+    batcher = OrderBatcher(make_store())
+    batcher.close()
+    future = Future()
+    batcher._queue.put(([], future))
+    batcher._fail_leftovers()
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1)
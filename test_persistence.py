@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+
+import pytest
+from products import Product
+import persistence
+
+
+@pytest.fixture
+def products(catalog):
+    # Few earbuds, so an order can sell them out
+    return catalog(quantities={"Bose QuietComfort Earbuds": 5})
+
+
+def state(store):
+    return [(p.name, p.price, p.get_quantity(), p.is_active(), type(p)) for p in store.get_all_products()]
+
+
+def test_restart_replays_log_tail(tmp_path, products):
+    """Test that changes after the snapshot survive a restart through the log."""
+    store, journal = persistence.open_store(str(tmp_path), products, fsync=persistence.FSYNC_ALWAYS)
+    store.order([(store.get_product("MacBook Air M2"), 3), (store.get_product("Bose QuietComfort Earbuds"), 5)])
+    store.add_product(Product("Google Pixel 7", price=500, quantity=250))
+    store.remove_product(store.get_product("Shipping"))
+    store.get_product("Windows License").set_price(99.5)
+    expected = state(store)
+    journal.close()
+
+    restored, journal = persistence.open_store(str(tmp_path))
+    journal.close()
+    assert state(restored) == expected
+    assert restored.get_total_quantity() == 97 + 250
+    assert not restored.get_all_products()[1].is_active()
+
+
+def test_snapshot_truncates_log(tmp_path, products):
+    """Test that a snapshot captures the store and empties the log."""
+    store, journal = persistence.open_store(str(tmp_path), products, snapshot_every=3)
+    product = store.get_product("MacBook Air M2")
+    for _ in range(3):
+        product.buy(1)
+    journal.close()
+    assert os.path.getsize(tmp_path / persistence.WAL_FILE) == 0
+
+    products, sequence = persistence.read_snapshot(str(tmp_path / persistence.SNAPSHOT_FILE))
+    assert sequence == 3
+    assert products[0].get_quantity() == 97
+
+
+def test_torn_log_tail_is_ignored(tmp_path, products):
+    """Test that a partially written final record is discarded on replay."""
+    store, journal = persistence.open_store(str(tmp_path), products, fsync=persistence.FSYNC_ALWAYS)
+    store.get_product("MacBook Air M2").buy(1)
+    journal.close()
+    with open(tmp_path / persistence.WAL_FILE, "ab") as file:
+        file.write(b"\x10\x00\x00\x00garbage")
+
+    restored, journal = persistence.open_store(str(tmp_path))
+    journal.close()
+    assert restored.get_product("MacBook Air M2").get_quantity() == 99
+
+
+def test_bulk_update_survives_restart(tmp_path, products):
+    """Test that a bulk update is journalled and replayed."""
+    store, journal = persistence.open_store(str(tmp_path), products, fsync=persistence.FSYNC_ALWAYS)
+    store.bulk_update([("MacBook Air M2", -100), ("Bose QuietComfort Earbuds", 5, 199.0), ("Windows License", 0, 99.0)])
+    expected = state(store)
+    journal.close()
+
+    restored, journal = persistence.open_store(str(tmp_path))
+    journal.close()
+    assert state(restored) == expected
+
+
+def test_always_policy_syncs_outside_the_state_lock(tmp_path, products, monkeypatch):
+    """Test that an order waits for its fsync without holding the store's lock, and is logged on return."""
+    store, journal = persistence.open_store(str(tmp_path), products, fsync=persistence.FSYNC_ALWAYS)
+    release = threading.Event()
+    fsyncing = threading.Event()
+    real_fsync = os.fsync
+
+    def slow_fsync(fd):
+        fsyncing.set()
+        release.wait(5)
+        real_fsync(fd)
+
+    monkeypatch.setattr(persistence.os, "fsync", slow_fsync)
+    macbook = store.get_product("MacBook Air M2")
+    order = threading.Thread(target=store.order, args=([(macbook, 2)],))
+    order.start()
+    assert fsyncing.wait(5)
+    # The order is still waiting for its fsync, but the store is not locked
+    assert store.inventory_lock().acquire(timeout=1)
+    store.inventory_lock().release()
+    assert order.is_alive()
+    release.set()
+    order.join(5)
+    assert not order.is_alive()
+    records = list(persistence.read_log(str(tmp_path / persistence.WAL_FILE)))
+    assert records and records[-1][1] == persistence._OP_QUANTITY
+    journal.close()
+
+
+def test_concurrent_orders_share_fsyncs(tmp_path, products, monkeypatch):
+    """Test that orders waiting on the always policy are group-committed."""
+    store, journal = persistence.open_store(str(tmp_path), products, fsync=persistence.FSYNC_ALWAYS)
+    calls = []
+    real_fsync = os.fsync
+
+    def counting_fsync(fd):
+        calls.append(fd)
+        time.sleep(0.005)
+        real_fsync(fd)
+
+    monkeypatch.setattr(persistence.os, "fsync", counting_fsync)
+    macbook = store.get_product("MacBook Air M2")
+    threads = [threading.Thread(target=store.order, args=([(macbook, 1)],)) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.close()
+
+    assert 0 < len(calls) < 40
+    restored, journal = persistence.open_store(str(tmp_path))
+    journal.close()
+    assert restored.get_product("MacBook Air M2").get_quantity() == 60
+
+
+def test_orders_run_while_a_snapshot_is_written(tmp_path, products, monkeypatch):
+    """Test that a snapshot writes without the state lock and keeps the records logged meanwhile."""
+    store, journal = persistence.open_store(str(tmp_path), products, fsync=persistence.FSYNC_ALWAYS)
+    macbook = store.get_product("MacBook Air M2")
+    writing = threading.Event()
+    release = threading.Event()
+    real_write_snapshot = persistence.write_snapshot
+
+    def slow_write_snapshot(path, products, sequence):
+        real_write_snapshot(path, products, sequence)
+        writing.set()
+        release.wait(5)
+
+    monkeypatch.setattr(persistence, "write_snapshot", slow_write_snapshot)
+    snapshot = threading.Thread(target=journal.snapshot)
+    snapshot.start()
+    assert writing.wait(5)
+    # Orders neither wait for the snapshot nor lose their records to it
+    started = time.monotonic()
+    store.order([(store.get_product("Bose QuietComfort Earbuds"), 2)])
+    assert time.monotonic() - started < 1
+    release.set()
+    snapshot.join(5)
+    store.order([(macbook, 1)])
+    journal.close()
+
+    restored, journal = persistence.open_store(str(tmp_path))
+    journal.close()
+    assert restored.get_product("Bose QuietComfort Earbuds").get_quantity() == 3
+    assert restored.get_product("MacBook Air M2").get_quantity() == 99
@@ -0,0 +1,58 @@
+import pytest
+from products import Product
+from promotions import Promotion, PercentageDiscount, SecondItemHalfPrice
+from price_cache import PriceCache, PRICE_CACHE
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    PRICE_CACHE.clear()
+    yield
+    PRICE_CACHE.configure(4096, 16)
+
+
+def test_cached_prices_match_apply_promotion():
+    """Test that cached prices are exactly the apply_promotion results, including beyond the table."""
+    cache = PriceCache(max_entries=8, table_size=4)
+    promotion = PercentageDiscount("12.5% off", percent=12.5)
+    product = Product("Item", price=19.99, quantity=100)
+    for quantity in (1, 2, 3, 4, 5, 40, 2, 3):
+        assert cache.price(promotion, product, quantity) == promotion.apply_promotion(product, quantity)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (5, 3, 1)
+
+
+def test_cache_is_bounded():
+    """Test that the least recently used table is evicted once the cache is full."""
+    cache = PriceCache(max_entries=2, table_size=2)
+    promotion = SecondItemHalfPrice("Second item at half price")
+    for price in (10, 20, 10, 30):
+        cache.price(promotion, Product("Item", price=price, quantity=1), 1)
+    cache.price(promotion, Product("Item", price=10, quantity=1), 2)
+    assert cache.stats()['entries'] == 2
+    assert cache.hits == 2  # Second lookup of price 10, and price 10 after 20 was evicted
+
+
+def test_price_and_promotion_changes_invalidate():
+    """Test that changing a product's price or promotion drops its cached table and reprices."""
+    promotion = PercentageDiscount("30% off", percent=30)
+    product = Product("Item", price=100, quantity=100, promotion=promotion)
+    assert product.buy(2) == 140
+    assert PRICE_CACHE.stats()['entries'] == 1
+    product.set_price(50)
+    assert PRICE_CACHE.stats()['entries'] == 0
+    assert product.buy(2) == 70
+    product.set_promotion(None)
+    assert PRICE_CACHE.stats()['entries'] == 0
+    assert product.buy(2) == 100
+
+
+def test_custom_promotions_bypass_cache():
+    """Test that promotions not marked cacheable are always priced directly."""
+    class FlatFee(Promotion):
+        def apply_promotion(self, product, quantity):
+            return product.price * quantity + 5
+
+    product = Product("Item", price=10, quantity=10, promotion=FlatFee("Fee"))
+    assert product.buy(1) == 15
+    assert PRICE_CACHE.stats()['misses'] == 0
@@ -1,5 +1,6 @@
 import pytest
 from products import Product
+from promotions import PercentageDiscount
 
 
 def test_create_normal_product():
@@ -42,3 +43,24 @@ def test_buying_larger_quantity_than_exists_raises_exception():
     product = Product("MacBook Air M2", price=1450, quantity=10)
     with pytest.raises(ValueError):
         product.buy(20)  # Trying to buy more than available should raise ValueError
+
+
+def test_products_are_slotted():
+    """Test that products carry no per-instance __dict__."""
+    product = Product("MacBook Air M2", price=1450, quantity=100)
+    assert not hasattr(product, "__dict__")
+    with pytest.raises(AttributeError):
+        product.colour = "silver"
+
+
+def test_show_is_refreshed_after_changes():
+    """Test that the cached show() line follows quantity, price and promotion changes."""
+    product = Product("MacBook Air M2", price=1450, quantity=100)
+    assert product.show() == "MacBook Air M2, Price: 1450, Quantity: 100, No promotion"
+    assert product.show() is product.show()
+    product.buy(10)
+    assert "Quantity: 90" in product.show()
+    product.set_price(1400)
+    assert "Price: 1400" in product.show()
+    product.set_promotion(PercentageDiscount("30% off", percent=30))
+    assert product.show().endswith("Promotion: 30% off")
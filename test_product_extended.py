@@ -1,13 +1,13 @@
 import pytest
-from products import NonStockedProduct, LimitedProduct
+from products import NonStockedProduct, LimitedProduct, UNLIMITED
 
 
 def test_non_stocked_product():
     """Test that NonStockedProduct behaves correctly."""
     product = NonStockedProduct("Windows License", price=125)
 
-    # Non-stocked products have an "infinite" quantity
-    assert product.get_quantity() == float('inf')  # Should return infinite quantity
+    # Non-stocked products have an "unlimited" quantity
+    assert product.get_quantity() == UNLIMITED  # Should return the unlimited sentinel
     assert product.is_active() is True  # Non-stocked products should always be active
 
     # Invalid purchase request should raise ValueError
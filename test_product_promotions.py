@@ -52,3 +52,32 @@ def test_limited_product(setup_products):
     assert product.buy(1) == 10.0
     with pytest.raises(ValueError):
         product.buy(2)  # Exceeds maximum purchase limit
+
+
+@pytest.mark.parametrize("promotion", [
+    PercentageDiscount("30% off", percent=30),
+    PercentageDiscount("12.5% off", percent=12.5),
+    SecondItemHalfPrice("Second item at half price"),
+    Buy2Get1Free("Buy 2, get 1 free"),
+])
+def test_batch_pricing_matches_scalar(promotion):
+    """Test that batch pricing returns exactly the scalar apply_promotion results."""
+    prices = [1450, 250, 0.1, 19.99, 125, 7]
+    quantities = [1, 2, 3, 4, 5, 1001]
+    expected = [promotion.apply_promotion(Product("Item", price=price, quantity=quantity), quantity)
+                for price, quantity in zip(prices, quantities)]
+    assert promotion.apply_promotion_batch(prices, quantities) == expected
+
+
+def test_batch_pricing_rejects_invalid_quantity():
+    """Test that batch pricing validates every quantity."""
+    with pytest.raises(ValueError):
+        Buy2Get1Free("Buy 2, get 1 free").apply_promotion_batch([10, 10], [1, 0])
+
+
+def test_shared_promotions_are_reused():
+    """Test that shared promotions with equal arguments are a single instance."""
+    first = PercentageDiscount.shared("30% off", percent=30)
+    assert PercentageDiscount.shared("30% off", percent=30) is first
+    assert PercentageDiscount.shared("20% off", percent=20) is not first
+    assert Buy2Get1Free.shared("30% off") is not first
@@ -0,0 +1,58 @@
+import pytest
+from products import Product, LimitedProduct, UNLIMITED
+from promotions import PercentageDiscount, SecondItemHalfPrice
+from product_table import TableStore
+from store import Store
+
+
+@pytest.fixture
+def make_products(catalog):
+    return lambda: catalog(promotions={"MacBook Air M2": SecondItemHalfPrice("Second item at half price"),
+                                       "Windows License": PercentageDiscount("30% off", percent=30)})
+
+
+def test_table_store_matches_object_store(make_products):
+    """Test that the columnar store prices orders and tracks stock like the object store."""
+    store, table_store = Store(make_products()), TableStore(make_products())
+    shopping_list = [(Product("MacBook Air M2", 1, 1), 3), (Product("Windows License", 1, 1), 2),
+                     (Product("Shipping", 1, 1), 2), (Product("Bose QuietComfort Earbuds", 1, 1), 500)]
+
+    assert table_store.order(shopping_list) == store.order(shopping_list)
+    assert table_store.get_total_quantity() == store.get_total_quantity()
+    assert [(p.name, p.price, p.get_quantity()) for p in table_store.get_all_active_products()] == \
+        [(p.name, p.price, p.get_quantity()) for p in store.get_all_active_products()]
+    assert [(p.name, p.get_quantity(), p.is_active()) for p in table_store.get_all_products()] == \
+        [(p.name, p.get_quantity(), p.is_active()) for p in store.get_all_products()]
+    assert [p.show() for p in table_store.get_all_products()] == [p.show() for p in store.get_all_products()]
+
+
+def test_product_view_reflects_table(make_products):
+    """Test that views read and write through to the table."""
+    table_store = TableStore(make_products())
+    view = table_store.get_product("Bose QuietComfort Earbuds")
+    assert view.buy(10) == 2500
+    assert view.get_quantity() == 490
+    view.set_quantity(0)
+    assert not view.is_active()
+    assert table_store.get_product("Bose QuietComfort Earbuds") is None
+    assert table_store.get_product("Windows License").get_quantity() == UNLIMITED
+
+
+def test_product_view_shows_prices_as_given():
+    """Test that a view renders an int price as an int and a float price as a float, like Product."""
+    products = [Product("Mug", price=12, quantity=3), Product("Cup", price=4.5, quantity=3),
+                LimitedProduct("Shipping", price=10.0, quantity=250, maximum=1)]
+    table_store = TableStore(products)
+    assert [view.show() for view in table_store.get_all_products()] == [p.show() for p in products]
+    assert table_store.get_product("Mug").show().startswith("Mug, Price: 12, ")
+
+
+def test_table_validation():
+    """Test that the table applies the same validation rules as the Product classes."""
+    table_store = TableStore()
+    with pytest.raises(ValueError):
+        table_store.table.append("", 10, 1)
+    with pytest.raises(ValueError):
+        table_store.table.append("A", -1, 1)
+    with pytest.raises(ValueError):
+        table_store.table.append("A", 1, 1, kind=2, maximum=0)
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from products import Product
+from promotion_scheduler import PromotionScheduler, ACTIVE, CANCELLED, ENDED
+from promotions import PercentageDiscount, SecondItemHalfPrice
+from store import Store
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_window_starts_and_expires(clock):
+    """Test that a promotion applies only between its start and end."""
+    product = Product("MacBook Air M2", price=1000, quantity=10)
+    scheduler = PromotionScheduler(clock)
+    sale = PercentageDiscount("10% off", percent=10)
+    window = scheduler.schedule(product, sale, start=10, end=20)
+
+    assert scheduler.run_pending() == 0
+    assert product.promotion is None
+    assert scheduler.next_transition() == 10
+
+    clock.now = 10
+    assert scheduler.run_pending() == 1
+    assert product.promotion is sale and window.state == ACTIVE
+    assert product.buy(1) == 900
+    assert scheduler.next_transition() == 20
+
+    clock.now = 25
+    assert scheduler.run_pending() == 1
+    assert product.promotion is None and window.state == ENDED
+    assert scheduler.next_transition() is None
+
+
+def test_overlapping_windows_fall_back_in_order(clock):
+    """Test that the latest window wins and ending it restores the previous one, then the original."""
+    original = SecondItemHalfPrice("Second Half price!")
+    product = Product("Bose QuietComfort Earbuds", price=250, quantity=500, promotion=original)
+    scheduler = PromotionScheduler(clock)
+    weekly = PercentageDiscount("Weekly", percent=10)
+    flash = PercentageDiscount("Flash", percent=50)
+    scheduler.schedule(product, weekly, start=0, end=100)
+    scheduler.schedule(product, flash, start=10, end=20)
+
+    scheduler.run_pending()
+    assert product.promotion is weekly
+    clock.now = 10
+    scheduler.run_pending()
+    assert product.promotion is flash
+    clock.now = 20
+    scheduler.run_pending()
+    assert product.promotion is weekly
+    clock.now = 100
+    scheduler.run_pending()
+    assert product.promotion is original
+
+
+def test_manual_change_becomes_the_fallback(clock):
+    """Test that a promotion set by hand during a window is kept once the window ends."""
+    product = Product("Google Pixel 7", price=500, quantity=250)
+    scheduler = PromotionScheduler(clock)
+    scheduler.schedule(product, PercentageDiscount("Flash", percent=50), start=0, end=10)
+    scheduler.run_pending()
+    manual = PercentageDiscount("Manual", percent=5)
+    product.set_promotion(manual)
+
+    clock.now = 10
+    scheduler.run_pending()
+    assert product.promotion is manual
+
+
+def test_past_windows_are_skipped_and_cancel_ends_early(clock):
+    """Test that elapsed windows never apply and that cancelling an active window restores the product."""
+    product = Product("MacBook Air M2", price=1000, quantity=10)
+    events = []
+    store = Store([product])
+    store.subscribe(lambda event, changed: events.append(event))
+    scheduler = PromotionScheduler(clock)
+    scheduler.schedule(product, PercentageDiscount("Missed", percent=10), start=1, end=2)
+    clock.now = 5
+    assert scheduler.run_pending() == 0
+    assert events == []
+
+    window = scheduler.schedule(product, PercentageDiscount("Sale", percent=10), start=5)
+    scheduler.run_pending()
+    scheduler.cancel(window)
+    assert product.promotion is None and window.state == CANCELLED
+    assert events == ['promotion', 'promotion']
+    assert scheduler.next_transition() is None
+
+
+def test_invalid_window(clock):
+    """Test that a window must end after it starts."""
+    product = Product("MacBook Air M2", price=1000, quantity=10)
+    with pytest.raises(ValueError):
+        PromotionScheduler(clock).schedule(product, PercentageDiscount("Sale", percent=10), start=5, end=5)
+
+
+def test_background_thread_applies_due_windows():
+    """Test that the worker thread wakes for a newly scheduled window."""
+    product = Product("MacBook Air M2", price=1000, quantity=10)
+    sale = PercentageDiscount("Sale", percent=10)
+    applied = threading.Event()
+    store = Store([product])
+    store.subscribe(lambda event, changed: applied.set())
+    with PromotionScheduler() as scheduler:
+        scheduler.schedule(product, sale, start=time.time() + 0.01)
+        assert applied.wait(5)
+    assert product.promotion is sale
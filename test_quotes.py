@@ -0,0 +1,84 @@
+import pytest
+from cart_promotions import BuyXGetY, CartPromotionEngine
+from order_batcher import OrderBatcher
+from products import Product
+from promotions import SecondItemHalfPrice
+
+
+@pytest.fixture
+def make_store(make_store):
+    # Three MacBooks, so a shopping list can run out of them
+    return lambda: make_store(quantities={"MacBook Air M2": 3},
+                              promotions={"MacBook Air M2": SecondItemHalfPrice("Second item at half price")})
+
+
+def ref(name):
+    return Product(name, price=1, quantity=1)
+
+
+SHOPPING_LIST = [
+    (ref("MacBook Air M2"), 2),
+    (ref("MacBook Air M2"), 2),  # Only one left after the first line
+    (ref("Windows License"), 4),
+    (ref("Shipping"), 2),
+    (ref("Unknown"), 1),
+    (ref("Bose QuietComfort Earbuds"), 0),
+]
+
+
+def test_quote_matches_order_without_touching_stock(make_store):
+    """Test that a quote prices lines and reports errors exactly like place_order, leaving stock alone."""
+    store = make_store()
+    quote = store.quote(SHOPPING_LIST)
+    assert store.get_product("MacBook Air M2").get_quantity() == 3
+
+    result = make_store().place_order(SHOPPING_LIST)
+    assert (quote.total, quote.errors) == tuple(result)
+    assert [line.available for line in quote.lines] == [True, False, True, False, False, False]
+    assert quote.lines[0].price == 1450 + 725
+
+
+def test_quote_is_cached_until_a_product_changes(make_store):
+    """Test that an unchanged cart is served from the cache and a product change invalidates it."""
+    store = make_store()
+    first = store.quote(SHOPPING_LIST)
+    assert store.quote(SHOPPING_LIST) is first
+    store.get_product("Windows License").set_price(100)
+    second = store.quote(SHOPPING_LIST)
+    assert second is not first and second.total == first.total - 4 * 25 * 1.0
+    assert store.quotes.stats()['hits'] == 1
+
+
+def test_quote_is_invalidated_by_cart_rules(make_store):
+    """Test that adding a cart rule makes cached quotes stale."""
+    engine = CartPromotionEngine()
+    store = make_store()
+    store.cart_promotions = engine
+    lines = [(ref("MacBook Air M2"), 1), (ref("Shipping"), 1)]
+    assert store.quote(lines).total == 1460
+    engine.add_rule(BuyXGetY("Free shipping", buy="MacBook Air M2", get="Shipping"))
+    assert store.quote(lines).total == 1450
+
+
+def test_checkout_reuses_quote_and_commits_stock(make_store):
+    """Test that checkout returns the quoted result, takes the stock, and matches place_order."""
+    store = make_store()
+    quote = store.quote(SHOPPING_LIST)
+    result = store.checkout(SHOPPING_LIST)
+    assert tuple(result) == (quote.total, quote.errors)
+    assert store.quotes.stats()['hits'] == 1
+
+    expected = make_store()
+    expected.place_order(SHOPPING_LIST)
+    assert [(p.get_quantity(), p.is_active()) for p in store.get_all_products()] == \
+        [(p.get_quantity(), p.is_active()) for p in expected.get_all_products()]
+    # The sale changed the products, so the old quote no longer applies
+    assert store.quote(SHOPPING_LIST) != quote
+
+
+def test_quote_matches_order_batcher(make_store):
+    """Test that quotes and the order batcher share one pricing path."""
+    quote = make_store().quote(SHOPPING_LIST)
+    with OrderBatcher(make_store()) as batcher:
+        result = batcher.submit(SHOPPING_LIST).result()
+    assert (quote.total, quote.errors) == tuple(result)
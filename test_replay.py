@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from promotions import SecondItemHalfPrice
+import replay
+
+
+@pytest.fixture
+def make_store(make_store):
+    return lambda: make_store("MacBook Air M2", "Shipping", quantities={"MacBook Air M2": 10},
+                              promotions={"MacBook Air M2": SecondItemHalfPrice("Second item at half price")})
+
+
+def test_replay_jsonl(tmp_path, make_store):
+    """Test that a JSONL log is replayed through the store with per-order results."""
+    orders = tmp_path / "orders.jsonl"
+    orders.write_text(
+        json.dumps({"order_id": "A1", "lines": [{"product": "MacBook Air M2", "quantity": 2},
+                                                {"product": "Shipping", "quantity": 1}]}) + "\n\n" +
+        json.dumps({"order_id": "A2", "lines": [{"product": "Shipping", "quantity": 2}]}) + "\n")
+    results = tmp_path / "results.jsonl"
+    progress = []
+
+    store = make_store()
+    summary = replay.replay_file(store, str(orders), str(results), report=lambda n, rate: progress.append(n))
+
+    assert summary == {"orders": 2, "revenue": 2185.0, "rejected_lines": 1}
+    lines = [json.loads(line) for line in results.read_text().splitlines()]
+    assert lines[0] == {"order_id": "A1", "total": 2185.0, "errors": []}
+    assert lines[1]["errors"] == ["Error with product Shipping: Cannot purchase more than the maximum allowed quantity."]
+    assert progress == [2]
+    assert store.get_total_quantity() == 8 + 249
+
+
+def test_replay_csv_groups_rows_by_order(tmp_path, make_store):
+    """Test that consecutive CSV rows with the same order_id form one order."""
+    orders = tmp_path / "orders.csv"
+    orders.write_text("order_id,product,quantity\n1,MacBook Air M2,1\n1,Shipping,1\n2,Unknown,1\n")
+    results = list(replay.replay(make_store(), replay.read_orders(str(orders))))
+    assert [r["order_id"] for r in results] == ["1", "2"]
+    assert results[0]["total"] == 1460
+    assert results[1]["errors"] == ["Product Unknown is not available."]
+
+
+def test_csv_without_order_id_column_is_rejected(tmp_path):
+    """Test that a CSV header missing a column raises ValueError, not KeyError."""
+    orders = tmp_path / "orders.csv"
+    orders.write_text("order,product,quantity\n1,MacBook Air M2,1\n")
+    with pytest.raises(ValueError, match="order_id"):
+        list(replay.read_orders(str(orders)))
+
+
+def test_read_orders_is_lazy(tmp_path):
+    """Test that orders are read one at a time rather than loaded up front."""
+    orders = tmp_path / "orders.jsonl"
+    orders.write_text('{"order_id": "1", "lines": []}\nnot json\n')
+    reader = replay.read_orders(str(orders))
+    assert next(reader).order_id == "1"  # The malformed second line has not been parsed yet
+
+
+def test_progress_every_zero_reports_nothing(tmp_path, make_store):
+    """Test that a progress interval of 0 turns progress reports off instead of dividing by zero."""
+    orders = tmp_path / "orders.jsonl"
+    orders.write_text('{"order_id": "1", "lines": [{"product": "Shipping", "quantity": 1}]}\n')
+    reports = []
+    summary = replay.replay_file(make_store(), str(orders), str(tmp_path / "results.jsonl"),
+                                 progress_every=0, report=lambda count, rate: reports.append(count))
+    assert summary["orders"] == 1
+    assert reports == []
+    assert list(replay.report_progress(range(5), 2, lambda count, rate: reports.append(count))) == list(range(5))
+    assert reports == [2, 4, 5]
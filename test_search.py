@@ -0,0 +1,84 @@
+import pytest
+from products import Product
+from search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def store(make_store):
+    store = make_store("MacBook Air M2", "Bose QuietComfort Earbuds", "Google Pixel 7", "Windows License")
+    # A second product sharing the "macbook" token
+    store.add_product(Product("MacBook Pro M3", price=2450, quantity=10))
+    return store
+
+
+def test_tokenize():
+    """Test that names split into lowercase alphanumeric tokens."""
+    assert tokenize("MacBook Air-M2 (2023)") == ["macbook", "air", "m2", "2023"]
+    assert tokenize("  ") == []
+
+
+def test_search_by_prefix_terms(store):
+    """Test that every query term must prefix some name token, in any order."""
+    assert [p.name for p in store.search("mac")] == ["MacBook Air M2", "MacBook Pro M3"]
+    assert [p.name for p in store.search("m3 MAC")] == ["MacBook Pro M3"]
+    assert [p.name for p in store.search("pix 7")] == ["Google Pixel 7"]
+    assert store.search("pixel 8") == []
+    assert store.search("") == []
+
+
+def test_search_limit_and_inactive(store):
+    """Test that results are limited and inactive products are skipped unless asked for."""
+    assert len(store.search("m", limit=1)) == 1
+    store.get_product("MacBook Air M2").deactivate()
+    assert [p.name for p in store.search("air")] == []
+    assert [p.name for p in store.search("air", active_only=False)] == ["MacBook Air M2"]
+
+
+def test_index_follows_add_and_remove(store):
+    """Test that the index is maintained by add_product and remove_product."""
+    assert store.search("pixel")
+    pixel = store.get_product("Google Pixel 7")
+    store.remove_product(pixel)
+    assert store.search("pixel") == []
+    store.add_product(Product("Google Pixel 8", price=700, quantity=5))
+    assert [p.name for p in store.search("pix")] == ["Google Pixel 8"]
+
+
+def test_shared_tokens_collapse_back():
+    """Test that postings shrink back to a single product and vanish when emptied."""
+    index = SearchIndex()
+    first, second = Product("Red Mug", price=5, quantity=1), Product("Red Cup", price=4, quantity=1)
+    index.add(first)
+    index.add(second)
+    assert list(index.search("red")) == [first, second]
+    index.remove(first)
+    assert list(index.search("red")) == [second]
+    index.remove(second)
+    assert list(index.search("red")) == []
+    assert index.tokens_with_prefix("") == []
+
+
+def test_token_table_stays_sorted_through_edits():
+    """Test that tokens added after a lookup are merged in order and emptied tokens are dropped."""
+    index = SearchIndex()
+    products = [Product(f"Item {code}", price=1, quantity=1) for code in ("k7", "b2", "x9")]
+    for product in products:
+        index.add(product)
+    assert index.tokens_with_prefix("") == ["b2", "item", "k7", "x9"]
+    # A few new tokens are inserted in place, many are merged in one sort
+    index.add(Product("Item a1", price=1, quantity=1))
+    assert index.tokens_with_prefix("") == ["a1", "b2", "item", "k7", "x9"]
+    many = [Product(f"Item c{i:03}", price=1, quantity=1) for i in range(100)]
+    for product in many:
+        index.add(product)
+    assert index.tokens_with_prefix("c") == [f"c{i:03}" for i in range(100)]
+    assert index.tokens_with_prefix("") == sorted(index.tokens_with_prefix(""))
+    index.remove(products[0])
+    index.remove(many[5])
+    assert "k7" not in index.tokens_with_prefix("") and "c005" not in index.tokens_with_prefix("c")
+    assert [p.name for p in index.search("item k")] == []
+    # A token added and removed between lookups never reaches the table
+    unsold = Product("Item z5", price=1, quantity=1)
+    index.add(unsold)
+    index.remove(unsold)
+    assert index.tokens_with_prefix("z") == []
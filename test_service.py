@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from promotions import PercentageDiscount
+from service import OrderService
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store("MacBook Air M2", "Google Pixel 7", "Windows License",
+                      promotions={"Google Pixel 7": PercentageDiscount("10% off", percent=10)})
+
+
+async def exchange(store, requests, **limits):
+    """Starts a service over a store, pipelines raw request lines over one connection and returns the responses."""
+    service = OrderService(store, **limits)
+    host, port = await service.start("127.0.0.1", 0)
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"".join(line if isinstance(line, bytes) else json.dumps(line).encode() + b"\n"
+                              for line in requests))
+        writer.write_eof()
+        responses = [json.loads(line) async for line in reader]
+        writer.close()
+        return responses
+    finally:
+        await service.close()
+
+
+def test_pipelined_requests_are_answered_in_order(store):
+    """Test that every endpoint answers, in request order, over one pipelined connection."""
+    pixel = [{"product": "Google Pixel 7", "quantity": 2}]
+    responses = asyncio.run(exchange(store, [
+        {"id": 1, "op": "total"},
+        {"id": 2, "op": "quote", "lines": pixel},
+        {"id": 3, "op": "order", "lines": pixel + [{"product": "Unknown", "quantity": 1}]},
+        {"id": 4, "op": "list", "page": 0, "page_size": 2},
+        {"id": 5, "op": "total"},
+    ], pipeline_depth=2))
+
+    assert [response["id"] for response in responses] == [1, 2, 3, 4, 5]
+    assert all(response["ok"] for response in responses)
+    assert responses[0]["result"] == {"total_quantity": 350}
+    assert responses[1]["result"]["total"] == 900
+    assert responses[2]["result"] == {"total": 900, "errors": ["Product Unknown is not available."]}
+    listing = responses[3]["result"]
+    assert listing["count"] == 3
+    assert [p["name"] for p in listing["products"]] == ["MacBook Air M2", "Google Pixel 7"]
+    assert listing["products"][1]["promotion"] == "10% off"
+    assert responses[4]["result"] == {"total_quantity": 348}
+    assert store.get_product("Google Pixel 7").quantity == 248
+
+
+def test_bad_requests_get_errors(store):
+    """Test that malformed requests are answered with errors without closing the connection."""
+    responses = asyncio.run(exchange(store, [
+        b"not json\n",
+        {"id": 2, "op": "refund"},
+        {"id": 3, "op": "order", "lines": [{"product": "MacBook Air M2"}]},
+        {"id": 4, "op": "list", "page_size": 0},
+        {"id": 5, "op": "total"},
+    ]))
+    assert [response["ok"] for response in responses] == [False, False, False, False, True]
+    assert responses[1] == {"id": 2, "ok": False, "error": "Unknown op: refund"}
+
+
+def test_oversized_request_closes_connection(store):
+    """Test that a request line over the limit is rejected and ends the connection."""
+    responses = asyncio.run(exchange(store, [b"x" * 200 + b"\n", {"id": 2, "op": "total"}], max_request_bytes=64))
+    assert responses == [{"ok": False, "error": "Request too long."}]
+
+
+def test_close_waits_for_workers_without_blocking_the_loop(store):
+    """Test that close lets the event loop keep running while pool calls finish."""
+    async def scenario():
+        service = OrderService(store, max_workers=1)
+        await service.start("127.0.0.1", 0)
+        release = threading.Event()
+        call = asyncio.ensure_future(service._offload(release.wait))
+        await asyncio.sleep(0)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        timer = threading.Timer(0.2, release.set)
+        timer.start()
+        # A blocking shutdown would stall the loop, and the ticker, until the call returned
+        await service.close()
+        ticker.cancel()
+        timer.join()
+        assert await call
+        assert ticks >= 5
+
+    asyncio.run(scenario())
+
+
+def test_serve_forever_needs_start(store):
+    """Test that serving before start raises a clear error."""
+    service = OrderService(store)
+    with pytest.raises(RuntimeError, match="not been started"):
+        asyncio.run(service.serve_forever())
+    asyncio.run(service.close())
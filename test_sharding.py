@@ -0,0 +1,55 @@
+import pytest
+
+from products import Product
+from promotions import SecondItemHalfPrice
+from sharding import ShardedStore, ShardError, shard_of
+from store import Store
+
+
+@pytest.fixture
+def make_products(catalog):
+    def make():
+        # Enough SKUs to spread over every shard
+        product_list = [Product(f"SKU-{i}", price=10 + i, quantity=5) for i in range(12)]
+        product_list += catalog("Windows License", "Shipping")
+        product_list[0].set_promotion(SecondItemHalfPrice("Second item at half price"))
+        return product_list
+    return make
+
+
+@pytest.fixture
+def sharded(make_products):
+    with ShardedStore(make_products(), shards=3) as store:
+        yield store
+
+
+def test_sharded_orders_match_single_store(sharded, make_products):
+    """Test that cross-shard orders price, reject and decrement exactly like a single store."""
+    single = Store(make_products())
+    orders = [
+        [(Product(f"SKU-{i}", 1, 1), 2) for i in range(12)] + [(Product("Windows License", 1, 1), 3)],
+        [(Product("SKU-0", 1, 1), 4), (Product("Shipping", 1, 1), 2), (Product("Unknown", 1, 1), 1)],
+        [(Product("SKU-3", 1, 1), 3), (Product("SKU-3", 1, 1), 1)],
+    ]
+    for shopping_list in orders:
+        assert sharded.place_order(shopping_list) == single.place_order(shopping_list)
+    assert sharded.get_total_quantity() == single.get_total_quantity()
+    assert sharded.get_product("SKU-3") is None  # Sold out, like in the single store
+    assert sorted((p.name, p.get_quantity(), p.is_active()) for p in sharded.get_all_products()) == \
+        sorted((p.name, p.get_quantity(), p.is_active()) for p in single.get_all_products())
+
+
+def test_failed_shard_rolls_back_other_reservations(sharded):
+    """Test that when one shard dies mid-order, stock reserved on the others is restored."""
+    names = [f"SKU-{i}" for i in range(12)]
+    dead = shard_of(names[0], sharded.shards)
+    survivor = next(name for name in names if shard_of(name, sharded.shards) != dead)
+    sharded._processes[dead].kill()
+    sharded._processes[dead].join()
+
+    with pytest.raises(ShardError):
+        sharded.order([(Product(survivor, 1, 1), 5), (Product(names[0], 1, 1), 1)])
+
+    product = sharded.get_product(survivor)
+    assert product.get_quantity() == 5
+    assert product.is_active()
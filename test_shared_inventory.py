@@ -0,0 +1,66 @@
+import multiprocessing
+
+import pytest
+from products import Product
+from shared_inventory import InventoryReader, SharedInventory
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store("MacBook Air M2", "Windows License")
+
+
+def test_reader_follows_store_changes(store):
+    """Test that orders, price changes, adds and removes show up in the shared block."""
+    with SharedInventory(store) as inventory, InventoryReader(inventory.name) as reader:
+        macbook = store.get_product("MacBook Air M2")
+        store.order([(macbook, 30)])
+        macbook.set_price(1400)
+        assert reader.get("MacBook Air M2") == ("MacBook Air M2", 70, 1400, True)
+        assert reader.get("Windows License").quantity is None
+        assert reader.quantity("Windows License") is None
+
+        pixel = Product("Google Pixel 7", price=500, quantity=250)
+        store.add_product(pixel)
+        assert reader.quantity("Google Pixel 7") == 250
+        assert reader.total_quantity() == store.get_total_quantity() == 320
+
+        macbook.set_quantity(0)
+        assert reader.quantity("MacBook Air M2") == 0
+        assert not reader.get("MacBook Air M2").active
+        store.remove_product(pixel)
+        assert reader.get("Google Pixel 7") is None
+        assert reader.get("Unknown") is None
+
+
+def test_bulk_update_is_mirrored(store):
+    """Test that every product changed by a bulk update is written to the block."""
+    with SharedInventory(store) as inventory, InventoryReader(inventory.name) as reader:
+        store.bulk_update([("MacBook Air M2", -100), ("Windows License", 0, 99.0)])
+        assert reader.get("MacBook Air M2") == ("MacBook Air M2", 0, 1450, False)
+        assert reader.get("Windows License").price == 99.0
+
+
+def test_capacity_overflow_is_flagged(store):
+    """Test that products beyond the block capacity are reported instead of failing the store."""
+    with SharedInventory(store, capacity=2) as inventory:
+        store.add_product(Product("Google Pixel 7", price=500, quantity=250))
+        assert inventory.overflowed
+        assert store.get_product("Google Pixel 7") is not None
+
+
+def _read_quantity(name, queue):
+    with InventoryReader(name) as reader:
+        queue.put(reader.quantity("MacBook Air M2"))
+
+
+def test_reader_in_another_process(store):
+    """Test that a separate process sees the current levels without going through the store."""
+    with SharedInventory(store) as inventory:
+        store.order([(store.get_product("MacBook Air M2"), 5)])
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_read_quantity, args=(inventory.name, queue))
+        process.start()
+        process.join(timeout=30)
+        assert queue.get(timeout=5) == 95
@@ -0,0 +1,185 @@
+import random
+import threading
+
+from products import Product
+from snapshot import CHUNK_SIZE, FANOUT, InventorySnapshot, ProductState
+from store import Store
+
+
+def test_snapshot_is_immutable_and_versioned(catalog):
+    """Test that an order publishes one new version and leaves older snapshots untouched."""
+    macbook, bose, windows = catalog("MacBook Air M2", "Bose QuietComfort Earbuds", "Windows License")
+    store = Store([macbook, bose, windows])
+    before = store.snapshot()
+
+    store.order([(macbook, 2), (bose, 5)])
+    after = store.snapshot()
+
+    assert after.version == before.version + 1
+    assert [state.quantity for state in before[:2]] == [100, 500]
+    assert [state.quantity for state in after[:2]] == [98, 495]
+    assert (before.total_quantity, after.total_quantity) == (600, 593)
+
+
+def test_snapshot_follows_add_remove_and_activity():
+    """Test that positions, the active list and the total follow every kind of change."""
+    store = Store([Product(f"SKU-{i}", price=1, quantity=1) for i in range(3)])
+    first, second, third = store.get_all_products()
+    second.deactivate()
+    store.remove_product(first)
+    fourth = Product("SKU-3", price=1, quantity=4)
+    store.add_product(fourth)
+
+    snapshot = store.snapshot()
+    assert [state.product for state in snapshot] == [second, third, fourth]
+    assert [state.product for state in snapshot.active()] == [third, fourth]
+    assert snapshot.total_quantity == 5
+    assert store.get_product_at(2) is fourth
+
+
+def test_new_version_shares_untouched_chunks():
+    """Test that a change copies only the chunk holding the changed product."""
+    catalog = [Product(f"SKU-{i}", price=1, quantity=10) for i in range(CHUNK_SIZE * 4)]
+    store = Store(catalog)
+    before = store.snapshot()
+    store.order([(catalog[CHUNK_SIZE + 1], 1)])
+    after = store.snapshot()
+
+    shared = [before._chunk(i) is after._chunk(i) for i in range(4)]
+    assert shared == [True, False, True, True]
+
+
+def test_evolve_appends_across_chunks():
+    """Test that appended states fill the last chunk before starting new ones."""
+    states = [ProductState.of(Product(f"SKU-{i}", price=1, quantity=1)) for i in range(CHUNK_SIZE + 10)]
+    snapshot = InventorySnapshot.of(states[:3]).evolve({}, states[3:])
+    assert list(snapshot) == states
+    assert snapshot.page(CHUNK_SIZE - 1, 3) == states[CHUNK_SIZE - 1:CHUNK_SIZE + 2]
+    assert snapshot.total_quantity == len(states)
+
+
+def test_readers_never_see_half_applied_orders():
+    """Test that concurrent readers always see both lines of every two-line order, or neither."""
+    left = Product("Left", price=1, quantity=20_000)
+    right = Product("Right", price=1, quantity=20_000)
+    store = Store([left, right])
+    done = threading.Event()
+    torn = []
+
+    def reader():
+        while not done.is_set():
+            left_state, right_state = store.snapshot()
+            if left_state.quantity != right_state.quantity:
+                torn.append((left_state.quantity, right_state.quantity))
+
+    def buyer():
+        for _ in range(2_000):
+            store.order([(left, 1), (right, 1)])
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    buyers = [threading.Thread(target=buyer) for _ in range(4)]
+    for thread in readers + buyers:
+        thread.start()
+    for thread in buyers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert torn == []
+    assert store.get_total_quantity() == 2 * (20_000 - 8_000)
+
+
+def test_removal_leaves_a_tombstone_in_one_chunk():
+    """Test that a removal copies only its chunk and keeps the positions of later products."""
+    catalog = [Product(f"SKU-{i}", price=1, quantity=10) for i in range(CHUNK_SIZE * 3)]
+    store = Store(catalog)
+    before = store.snapshot()
+    store.remove_product(catalog[1])
+    after = store.snapshot()
+
+    assert [before._chunk(i) is after._chunk(i) for i in range(3)] == [False, True, True]
+    assert (len(after), after.tombstones, after.total_quantity) == (len(catalog) - 1, 1, 10 * (len(catalog) - 1))
+    assert after[1].product is catalog[2]
+    assert after.page(CHUNK_SIZE - 2, 3) == [ProductState.of(p) for p in catalog[CHUNK_SIZE - 1:CHUNK_SIZE + 2]]
+    assert store._slots[id(catalog[-1])] == len(catalog) - 1
+    store.order([(catalog[-1], 1)])
+    assert store.snapshot()[-1].quantity == 9
+
+
+def test_compaction_after_many_removals():
+    """Test that the snapshot is compacted once tombstones outnumber live products."""
+    catalog = [Product(f"SKU-{i}", price=1, quantity=1) for i in range(CHUNK_SIZE * 4)]
+    store = Store(catalog)
+    for product in catalog[:CHUNK_SIZE * 2 + 1]:
+        store.remove_product(product)
+
+    snapshot = store.snapshot()
+    assert snapshot.tombstones == 0
+    assert snapshot.products() == catalog[CHUNK_SIZE * 2 + 1:]
+    added = Product("New", price=1, quantity=3)
+    store.add_product(added)
+    assert store.get_product_at(store.get_product_count() - 1) is added
+    assert store.get_total_quantity() == len(catalog) - (CHUNK_SIZE * 2 + 1) + 3
+
+
+def test_active_list_is_kept_per_chunk():
+    """Test that activity changes update the active states of their chunk in place."""
+    catalog = [Product(f"SKU-{i}", price=1, quantity=1) for i in range(CHUNK_SIZE * 2)]
+    store = Store(catalog)
+    before = store.snapshot()
+    catalog[CHUNK_SIZE + 3].deactivate()
+    catalog[CHUNK_SIZE + 1].deactivate()
+    catalog[CHUNK_SIZE + 3].activate()
+    catalog[CHUNK_SIZE + 5].set_price(2)
+    after = store.snapshot()
+
+    assert after._chunk(0) is before._chunk(0)
+    assert after.active() == tuple(ProductState.of(p) for p in catalog if p.is_active())
+    assert after._chunk(1).active_offsets == tuple(offset for offset in range(CHUNK_SIZE) if offset != 1)
+    assert catalog[CHUNK_SIZE + 1] not in store.get_all_active_products()
+
+
+def test_tree_shares_untouched_nodes():
+    """Test that a version copies only the nodes above a changed chunk, across several tree levels."""
+    states = [ProductState.of(Product(f"SKU-{i}", price=1, quantity=1)) for i in range(CHUNK_SIZE * FANOUT * 2 + 5)]
+    snapshot = InventorySnapshot.of(states[:7])
+    for i in range(7, len(states), 5000):
+        snapshot = snapshot.evolve({}, states[i:i + 5000])
+    assert list(snapshot) == states
+    changed = ProductState.of(Product("Changed", price=1, quantity=0))
+    after = snapshot.evolve({3: changed}, [], [len(states) - 1])
+
+    assert snapshot._height == 2
+    assert after._root.children[1] is snapshot._root.children[1]
+    assert after._chunk(1) is snapshot._chunk(1)
+    assert (after[3], after[-1]) == (changed, states[-2])
+    assert after.page(CHUNK_SIZE * FANOUT * 2 - 1, 10) == states[CHUNK_SIZE * FANOUT * 2 - 1:-1]
+    assert (len(after.active()), after.total_quantity) == (len(states) - 2, len(states) - 2)
+
+
+def test_evolve_matches_a_rebuilt_snapshot():
+    """Test that random changes, removals and additions give the same snapshot as building it afresh."""
+    rng = random.Random(7)
+    current = [ProductState.of(Product(f"SKU-{i}", price=1, quantity=rng.randint(0, 3))) for i in range(CHUNK_SIZE * 3)]
+    snapshot = InventorySnapshot.of(current)
+    for step in range(200):
+        live = [position for position, state in enumerate(current) if state is not None]
+        changes = {position: ProductState.of(Product(f"C-{step}", price=1, quantity=rng.randint(0, 3)))
+                   for position in rng.sample(live, 3)}
+        removed = [position for position in rng.sample(live, 2) if position not in changes]
+        added = [ProductState.of(Product(f"A-{step}-{i}", price=1, quantity=1)) for i in range(rng.randint(0, 40))]
+        snapshot = snapshot.evolve(changes, added, removed)
+        for position, state in changes.items():
+            current[position] = state
+        for position in removed:
+            current[position] = None
+        current.extend(added)
+
+        expected = [state for state in current if state is not None]
+        assert (snapshot.span, len(snapshot)) == (len(current), len(expected))
+        assert snapshot.active() == tuple(state for state in expected if state.active)
+        assert snapshot.total_quantity == sum(state.stock() for state in expected)
+        index = rng.randrange(len(expected))
+        assert snapshot[index] is expected[index]
+    assert list(snapshot) == expected
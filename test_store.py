@@ -0,0 +1,144 @@
+import pytest
+from products import Product, NonStockedProduct
+from promotions import PercentageDiscount
+from store import StockUpdate
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store()
+
+
+def test_get_product_by_name(store):
+    """Test that products are found by name through the index."""
+    assert store.get_product("MacBook Air M2").price == 1450
+    assert store.get_product("Unknown") is None
+
+
+def test_get_product_skips_inactive(store):
+    """Test that an inactive product is not returned, but is found again once reactivated."""
+    product = store.get_product("MacBook Air M2")
+    product.deactivate()
+    assert store.get_product("MacBook Air M2") is None
+    product.activate()
+    assert store.get_product("MacBook Air M2") is product
+
+
+def test_remove_product_updates_index(store):
+    """Test that a removed product can no longer be ordered."""
+    product = store.get_product("Bose QuietComfort Earbuds")
+    store.remove_product(product)
+    assert store.get_product("Bose QuietComfort Earbuds") is None
+    assert product not in store.get_all_products()
+    assert store.order([(product, 1)]) == 0.0
+
+
+def test_order_uses_index(store):
+    """Test that an order resolves each line by name and returns the total price."""
+    macbook = Product("MacBook Air M2", price=1, quantity=1)  # Only the name is used for lookup
+    total = store.order([(macbook, 2), (store.get_product("Shipping"), 1)])
+    assert total == 1450 * 2 + 10
+    assert store.get_product("MacBook Air M2").get_quantity() == 98
+
+
+def _scan_total(store):
+    return sum(p.get_quantity() for p in store.get_all_products()
+               if p.is_active() and not isinstance(p, NonStockedProduct))
+
+
+def test_aggregates_match_full_scan(store):
+    """Test that the running total and active list match a full scan after every kind of change."""
+    macbook = store.get_product("MacBook Air M2")
+    bose = store.get_product("Bose QuietComfort Earbuds")
+    store.order([(macbook, 3), (bose, 10)])
+    macbook.set_quantity(0)
+    bose.deactivate()
+    store.add_product(Product("Google Pixel 7", price=500, quantity=250))
+    macbook.set_quantity(7)
+    macbook.activate()  # Reactivated product must keep its place in store order
+    bose.activate()
+    store.remove_product(store.get_product("Shipping"))
+
+    assert store.get_total_quantity() == _scan_total(store) == 7 + 490 + 250
+    assert store.get_all_active_products() == [p for p in store.get_all_products() if p.is_active()]
+
+
+def test_non_stocked_product_not_counted(store):
+    """Test that non-stocked products never contribute to the total quantity."""
+    assert store.get_total_quantity() == 100 + 500 + 250
+
+
+def test_products_page_and_index(store):
+    """Test that paging and positional lookup follow the get_all_products order."""
+    everything = store.get_all_products()
+    assert store.get_product_count() == 4
+    assert store.get_products_page(0, 3) == everything[:3]
+    assert store.get_products_page(1, 3) == everything[3:]
+    assert store.get_products_page(2, 3) == []
+    assert store.get_product_at(1) is everything[1]
+    assert store.get_product_at(4) is None
+    assert store.get_product_at(-1) is None
+
+
+def test_listing_follows_add_and_remove(store):
+    """Test that the cached listing is refreshed when products are added or removed."""
+    pixel = Product("Google Pixel 7", price=500, quantity=250)
+    store.add_product(pixel)
+    assert store.get_product_at(4) is pixel
+    store.remove_product(pixel)
+    assert store.get_product_count() == 4
+    assert store.get_product_at(4) is None
+
+
+def test_products_share_one_listener(store):
+    """Test that the store registers one listener object with every product, and unregisters it."""
+    products = store.get_all_products()
+    listener = products[0]._listeners[0]
+    assert all(len(product._listeners) == 1 and product._listeners[0] is listener for product in products)
+    store.remove_product(products[0])
+    assert products[0]._listeners == ()
+
+
+def test_bulk_update_applies_in_one_version(store):
+    """Test that a bulk update changes stock, prices and promotions together and notifies once."""
+    events = []
+    store.subscribe(lambda event, products: events.append((event, products)))
+    macbook = store.get_product("MacBook Air M2")
+    earbuds = store.get_product("Bose QuietComfort Earbuds")
+    earbuds.set_quantity(0)
+    events.clear()
+    version = store.snapshot().version
+    sale = PercentageDiscount("10% off", percent=10)
+
+    changed = store.bulk_update([
+        StockUpdate("MacBook Air M2", -100),
+        ("Bose QuietComfort Earbuds", 40, 200.0),
+        ("Bose QuietComfort Earbuds", 10),
+        StockUpdate("Windows License", price=99, promotion=sale),
+        ("Shipping",),
+    ])
+
+    assert changed == 3
+    assert store.snapshot().version == version + 1
+    assert events == [('bulk', (macbook, earbuds, store.get_product("Windows License")))]
+    assert not macbook.is_active() and earbuds.is_active()
+    assert (earbuds.quantity, earbuds.price) == (50, 200.0)
+    assert store.get_product("Windows License").promotion is sale
+    assert store.get_total_quantity() == 50 + 250
+
+
+def test_bulk_update_is_all_or_nothing(store):
+    """Test that one invalid update leaves every product untouched."""
+    before = [(p.name, p.price, p.quantity, p.is_active()) for p in store.get_all_products()]
+    version = store.snapshot().version
+    invalid_batches = [
+        [("MacBook Air M2", 5), ("Unknown", 1)],
+        [("MacBook Air M2", -60), ("MacBook Air M2", -60)],
+        [("MacBook Air M2", 5, 10.0), ("Windows License", 1)],
+        [("Shipping", 1, -1.0)],
+    ]
+    for updates in invalid_batches:
+        with pytest.raises(ValueError):
+            store.bulk_update(updates)
+    assert [(p.name, p.price, p.quantity, p.is_active()) for p in store.get_all_products()] == before
+    assert store.snapshot().version == version
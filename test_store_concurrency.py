@@ -0,0 +1,51 @@
+import random
+import threading
+
+from products import Product, LimitedProduct
+from store import Store
+
+THREADS = 8
+
+
+def _run_threads(target, count=THREADS):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_orders_never_oversell():
+    """Test that concurrent single-unit orders sell exactly the available stock."""
+    product = Product("Flash Sale", price=10, quantity=1000)
+    store = Store([product])
+    revenue = [0.0] * THREADS
+
+    def buyer(index):
+        for _ in range(300):
+            revenue[index] += store.order([(product, 1)])
+
+    _run_threads(buyer)
+    assert product.get_quantity() == 0
+    assert not product.is_active()
+    assert sum(revenue) == 1000 * 10
+    assert store.get_total_quantity() == 0
+
+
+def test_concurrent_multi_line_orders_do_not_deadlock():
+    """Test that multi-line orders touching overlapping products in random order complete consistently."""
+    catalog = [Product(f"SKU-{i}", price=1, quantity=500) for i in range(20)]
+    catalog.append(LimitedProduct("Shipping", price=5, quantity=10 ** 6, maximum=1))
+    store = Store(catalog, lock_stripes=4)
+    sold = [0] * THREADS
+
+    def buyer(index):
+        rng = random.Random(index)
+        for _ in range(200):
+            lines = [(product, 1) for product in rng.sample(catalog[:-1], 4)]
+            sold[index] += int(store.order(lines))
+
+    _run_threads(buyer)
+    remaining = sum(product.get_quantity() for product in catalog[:-1])
+    assert sum(sold) == 20 * 500 - remaining
+    assert store.get_total_quantity() == remaining + 10 ** 6